@@ -0,0 +1,254 @@
+import os
+
+import numpy as np
+
+from instrumentation import MODES, Counters
+
+
+# Cartes agrégées sur un grand nombre d'essais, au lieu d'un tracé par trajet :
+#
+#   visits        : nombre de passages par case (tous essais confondus)
+#   first_passage : temps moyen du premier passage sur la case, parmi les
+#                   essais qui l'atteignent ; reach : fraction de ces essais
+#   occupancy     : passages par mode (search, upwind, casting) et par case
+#
+# Deux sources de points, accumulées par np.bincount sur les indices aplatis
+# y * domain_x + x (et mode * domain_y * domain_x + case) :
+#   - les moteurs batch : TrajectoryMaps est un Counters, passé en counters= ;
+#     le moteur lui donne à chaque pas les positions des sondes actives
+#     (record(..., at=(ids, x, y, it))), mises en tampon puis vidées par
+#     paquets de `buffer` points. Seule source qui connaisse les modes.
+#   - des trajets stockés : listes de tableaux (k, 2) (add_trajectories) ou
+#     trajets d'un ResultStore, lus en mémoire mappée (add_store).
+# Le point de départ (t = 0) n'est pas compté : t est le nombre de pas faits.
+# Premier passage : clé essai * (domain_y * domain_x) + case, np.unique
+# (return_index) garde la première occurrence dans l'ordre des temps. Les clés
+# déjà vues d'un appel sont des bits d'un tableau (sondes x cases) / 8 octets,
+# agrandi au besoin : un vidage coûte O(points), quelle que soit la longueur
+# de l'appel.
+#
+# plot_maps trace une seule figure : une ligne par jeu de cartes (stratégie),
+# une colonne par carte.
+
+
+class TrajectoryMaps(Counters):
+
+    def __init__(self, shape, first_passage=True, buffer=1 << 20):
+        super().__init__()
+        self.shape = tuple(shape)
+        self.first_passage = first_passage
+        self.buffer = buffer
+        taille = self.shape[0] * self.shape[1]
+        self.visits = np.zeros(taille, dtype=np.int64)
+        self.occupancy = np.zeros((len(MODES), taille), dtype=np.int64)
+        self.fp_sum = np.zeros(taille, dtype=np.float64)
+        self.fp_count = np.zeros(taille, dtype=np.int64)
+        self._tampon = []
+        self._points = 0
+        self._vus = np.zeros(0, dtype=np.uint8)   # bits des clés (sonde, case) vues dans l'appel en cours
+
+    # --- moteurs batch -----------------------------------------------------
+
+    def start(self):
+        # début d'un appel au moteur : les indices de sondes repartent de 0
+        self._vider()
+        self._vus = np.zeros(0, dtype=np.uint8)
+        super().start()
+
+    def record(self, modes, next_modes=None, odor=None, at=None):
+        super().record(modes, next_modes, odor)
+        if at is not None:
+            ids, x, y, it = at
+            modes = np.asarray(modes, dtype=np.int64)
+            domain_y, domain_x = self.shape
+            vu = (x >= 0) & (x < domain_x) & (y >= 0) & (y < domain_y)
+            if not vu.all():
+                # sonde hors de la fenêtre (boundary="open") : rien à compter
+                ids, x, y, it, modes = ids[vu], x[vu], y[vu], it[vu], modes[vu]
+            # copies : les moteurs modifient it (et parfois ids) sur place
+            self._tampon.append((ids.copy(), y * domain_x + x, it.copy(), modes))
+            self._points += ids.size
+            if self._points >= self.buffer:
+                self._vider()
+
+    def _vider(self):
+        if not self._tampon:
+            return
+        ids, cases, t, modes = (np.concatenate(c) for c in zip(*self._tampon))
+        self._tampon = []
+        self._points = 0
+        taille = self.visits.size
+        self._compter(cases, modes)
+        if self.first_passage:
+            cles, premier = np.unique(ids * taille + cases, return_index=True)
+            # clés déjà vues lors d'un vidage précédent du même appel
+            octets = (int(cles[-1]) >> 3) + 1 if cles.size else 0
+            if octets > self._vus.size:
+                agrandi = np.zeros(max(octets, 2 * self._vus.size), dtype=np.uint8)
+                agrandi[:self._vus.size] = self._vus
+                self._vus = agrandi
+            octet, bit = cles >> 3, (cles & 7).astype(np.uint8)
+            neuves = (self._vus[octet] >> bit) & 1 == 0
+            cles, premier = cles[neuves], premier[neuves]
+            self._premiers_passages(cles % taille, t[premier])
+            np.bitwise_or.at(self._vus, octet[neuves], np.left_shift(1, bit[neuves], dtype=np.uint8))
+
+    # --- trajets stockés ---------------------------------------------------
+
+    def add_trajectories(self, trajets):
+        """trajets : liste de tableaux (k, 2) de points (x, y), départ compris."""
+        trajets = [np.asarray(t).reshape(-1, 2) for t in trajets]
+        longueurs = np.array([len(t) for t in trajets], dtype=np.int64)
+        fins = np.cumsum(longueurs)
+        for a, b in self._paquets(fins - longueurs, fins):
+            points = np.concatenate(trajets[a:b])
+            debut = fins[a] - longueurs[a]
+            self._ajouter(points, fins[a:b] - longueurs[a:b] - debut, fins[a:b] - debut)
+
+    def add_store(self, store, strategy=None):
+        """Trajets enregistrés d'un ResultStore (tous, ou ceux de `strategy`)."""
+        code = None
+        if strategy is not None:
+            if strategy not in store.manifest["strategies"]:
+                return
+            code = store.manifest["strategies"].index(strategy)
+        shards = zip(store.manifest["shards"], store.iter_shards(["strategy", "traj_offset"]))
+        for shard, colonnes in shards:
+            if not shard.get("trajets"):
+                continue
+            points = np.load(os.path.join(store.path, shard["name"], "trajets.npy"), mmap_mode="r")
+            offsets = np.asarray(colonnes["traj_offset"])
+            fins = np.append(offsets[1:], points.shape[0])
+            garde = offsets >= 0
+            if code is not None:
+                garde &= np.asarray(colonnes["strategy"]) == code
+            debuts, fins = offsets[garde], fins[garde]
+            for a, b in self._paquets(debuts, fins):
+                # les trajets d'un shard sont contigus : un paquet est une tranche
+                lo, hi = debuts[a], fins[b - 1]
+                self._ajouter(np.asarray(points[lo:hi]), debuts[a:b] - lo, fins[a:b] - lo)
+
+    def _paquets(self, debuts, fins):
+        # tranches [a, b) de trajets consécutifs d'environ `buffer` points
+        cumul = np.cumsum(fins - debuts)
+        a = 0
+        while a < cumul.size:
+            base = cumul[a - 1] if a else 0
+            b = max(int(np.searchsorted(cumul, base + self.buffer, side="right")), a + 1)
+            yield a, b
+            a = b
+
+    def _ajouter(self, points, debuts, fins):
+        # points des trajets [debuts[i], fins[i]) ; trajets entiers -> pas d'état entre paquets
+        longueurs = fins - debuts
+        self.trials += longueurs.size
+        traj = np.repeat(np.arange(longueurs.size), longueurs)
+        t = np.arange(points.shape[0]) - np.repeat(debuts, longueurs)
+        x = points[:, 0].astype(np.int64)
+        y = points[:, 1].astype(np.int64)
+        garde = (t > 0) & (x >= 0) & (x < self.shape[1]) & (y >= 0) & (y < self.shape[0])
+        traj, t, cases = traj[garde], t[garde], (y * self.shape[1] + x)[garde]
+        self._compter(cases)
+        if self.first_passage:
+            taille = self.visits.size
+            cles, premier = np.unique(traj * taille + cases, return_index=True)
+            self._premiers_passages(cles % taille, t[premier])
+
+    # --- accumulation ------------------------------------------------------
+
+    def _compter(self, cases, modes=None):
+        taille = self.visits.size
+        if modes is None:
+            self.visits += np.bincount(cases, minlength=taille)
+            return
+        occupation = np.bincount(modes * taille + cases, minlength=len(MODES) * taille)
+        occupation = occupation.reshape(len(MODES), taille)
+        self.occupancy += occupation
+        self.visits += occupation.sum(axis=0)
+
+    def _premiers_passages(self, cases, t):
+        self.fp_sum += np.bincount(cases, weights=t, minlength=self.visits.size)
+        self.fp_count += np.bincount(cases, minlength=self.visits.size)
+
+    def merge(self, other):
+        super().merge(other)
+        if isinstance(other, TrajectoryMaps):
+            other._vider()
+            self.visits += other.visits
+            self.occupancy += other.occupancy
+            self.fp_sum += other.fp_sum
+            self.fp_count += other.fp_count
+        return self
+
+    def maps(self):
+        """Cartes (domain_y, domain_x) ; nan là où elles ne sont pas définies."""
+        self._vider()
+        H, W = self.shape
+        with np.errstate(invalid="ignore", divide="ignore"):
+            premier = np.where(self.fp_count > 0, self.fp_sum / self.fp_count, np.nan)
+            parts = np.where(self.visits > 0, self.occupancy / self.visits, np.nan)
+        return {
+            "trials": self.trials,
+            "visits": self.visits.reshape(H, W),
+            "visits_per_trial": self.visits.reshape(H, W) / max(self.trials, 1),
+            "first_passage": premier.reshape(H, W) if self.first_passage else None,
+            "reach": self.fp_count.reshape(H, W) / max(self.trials, 1) if self.first_passage else None,
+            "occupancy": self.occupancy.reshape(len(MODES), H, W),
+            "mode_share": parts.reshape(len(MODES), H, W) if self.occupancy.any() else None,
+        }
+
+
+def plot_maps(maps, field=None, source=None, title=None, path=None):
+    """
+    Une figure pour tous les jeux de cartes.
+    maps   : TrajectoryMaps, dict de maps(), ou dict {nom: l'un des deux}
+    field  : champ de concentration tracé en première colonne (optionnel)
+    source : (source_x, source_y, a, b), encadrée sur chaque carte
+    path   : fichier où enregistrer la figure (sinon à l'appelant de l'afficher)
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    if isinstance(maps, TrajectoryMaps) or "visits" in maps:
+        maps = {"": maps}
+    lignes = {nom: m.maps() if isinstance(m, TrajectoryMaps) else m for nom, m in maps.items()}
+    avec_modes = any(m["mode_share"] is not None for m in lignes.values())
+    colonnes = ["visites / essai", "premier passage moyen"]
+    if avec_modes:
+        colonnes += [f"part {mode}" for mode in MODES]
+    decalage = field is not None
+
+    fig, axes = plt.subplots(len(lignes), len(colonnes) + decalage, squeeze=False,
+                             figsize=(3.6 * (len(colonnes) + decalage), 2.8 * len(lignes)))
+    for ax, (nom, m) in zip(axes, lignes.items()):
+        images = [(m["visits_per_trial"], {"norm": LogNorm(), "cmap": "magma"}),
+                  (m["first_passage"], {"cmap": "viridis_r"})]
+        if avec_modes:
+            parts = m["mode_share"]
+            images += [(None if parts is None else parts[k], {"vmin": 0, "vmax": 1, "cmap": "Blues"})
+                       for k in range(len(MODES))]
+        if decalage:
+            ax[0].imshow(field, origin="lower", cmap="Greys", interpolation="nearest")
+            ax[0].set_title("champ")
+        for a, (image, style), titre in zip(ax[decalage:], images, colonnes):
+            if image is None:
+                a.set_axis_off()
+                continue
+            if "norm" in style:
+                image = np.where(image > 0, image, np.nan)
+            im = a.imshow(image, origin="lower", interpolation="nearest", **style)
+            fig.colorbar(im, ax=a, shrink=0.8)
+            a.set_title(titre)
+        for a in ax:
+            if source is not None:
+                source_x, source_y, sa, sb = source
+                a.add_patch(plt.Rectangle((source_x - 0.5, source_y - 0.5), sa, sb,
+                                          edgecolor="r", facecolor="none", lw=1))
+        if nom:
+            ax[0].set_ylabel(f"{nom} (n={m['trials']})")
+    if title:
+        fig.suptitle(title)
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path, dpi=120)
+    return fig
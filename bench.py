@@ -0,0 +1,249 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import strategies_jit
+from benchmark import resume
+from plume_dynamique import DynamicPlume
+from plumes import PlumeFactory
+from strategies_api import simulate, simulate_batch
+
+
+# Banc d'essai de référence, scénarios nommés et reproductibles :
+#
+#   python bench.py                              tous les scénarios
+#   python bench.py poisson-70x50 --trials 500   un scénario, moins d'essais
+#   python bench.py --output bench.json          résultats en JSON
+#   python bench.py --baseline bench.json        comparaison à une référence
+#   python bench.py --repeat 5                   5 passes chronométrées
+#
+# Pour chaque (scénario, stratégie, moteur) : temps (meilleure et médiane de
+# --repeat passes, mêmes graines), essais/s sur la meilleure passe, pic
+# mémoire (tracemalloc, passe séparée non chronométrée), taux de succès + IC
+# de Wilson, itérations moyennes. Les moteurs de même politique de bord sont
+# comparés entre eux (un moteur plus rapide ne doit pas changer les
+# statistiques), et chaque mesure à la référence : régression si le débit
+# (meilleure passe, la moins bruitée) chute de plus de --perf-tolerance, si la
+# mémoire augmente d'autant, ou si le taux de succès s'écarte de plus de --z
+# écarts-types (test de deux proportions).
+# Code de sortie 1 en cas de régression ou d'incohérence.
+
+STRATEGIES = [("simple", {"d": 4}), ("spiral", {"T_loss": 10}), ("mosquito", {})]
+
+# moteur -> politique de bord (les noyaux JIT suivent strategies2 : "open")
+BACKENDS = {"batch": "clamp", "step": "clamp", "jit": "open"}
+
+
+def _poisson_70x50(rng):
+    source = (2, 22, 10, 6)
+    field = PlumeFactory.poisson_flag((70, 50), source).single(rng)
+    return field, source, 69, (17, 27), 3000
+
+
+def _advdiff_100x50(rng):
+    source = (2, 23, 6, 4)
+    field = PlumeFactory.advection_diffusion((100, 50), source).single(rng)
+    return field, source, 99, (15, 35), 3000
+
+
+def _large_1000x500(rng):
+    source = (2, 247, 10, 6)
+    field = PlumeFactory.advection_diffusion((1000, 500), source, tau=100).single(rng)
+    return field, source, 299, (220, 280), 6000
+
+
+def _dynamic_100x50(rng):
+    source = (2, 23, 6, 4)
+    factory = PlumeFactory.advection_diffusion((100, 50), source)
+    return DynamicPlume(factory, V=1, meander=0.5, rng=rng), source, 99, (15, 35), 3000
+
+
+# nom -> (construction du champ, essais par moteur, moteurs)
+# le champ dynamique évolue avec le temps : moteurs batch et step seulement
+# (les noyaux JIT lisent un tableau figé) ; le pilote step lit le champ pas à
+# pas par at(), d'où moins d'essais
+SCENARIOS = {
+    "poisson-70x50": (_poisson_70x50, {"batch": 4000, "step": 400, "jit": 4000}, ("batch", "step", "jit")),
+    "advdiff-100x50": (_advdiff_100x50, {"batch": 4000, "step": 400, "jit": 4000}, ("batch", "step", "jit")),
+    "large-1000x500": (_large_1000x500, {"batch": 1000, "step": 100, "jit": 1000}, ("batch", "step", "jit")),
+    "dynamic-100x50": (_dynamic_100x50, {"batch": 4000, "step": 100}, ("batch", "step")),
+}
+
+
+def _jouer(backend, name, params, field, source, start_x, start_y, max_tot_iter, n, seed):
+    rng = np.random.default_rng(seed)
+    ys = rng.integers(start_y[0], start_y[1], size=n)
+    if backend == "batch":
+        found, _, total_iter = simulate_batch(name, field, *source, start_x, ys,
+                                              max_tot_iter=max_tot_iter, rng=rng, **params)
+        return found, total_iter
+    found = np.zeros(n, dtype=bool)
+    total_iter = np.zeros(n, dtype=np.int64)
+    graines = rng.integers(2**32, size=n).tolist()
+    for i, (y, g) in enumerate(zip(ys.tolist(), graines)):
+        if backend == "step":
+            f, _, it = simulate(name, field, *source, start_x, y, boundary="clamp",
+                                max_tot_iter=max_tot_iter, rng=g, record="none", **params)
+        else:
+            f, _, it = simulate(name, field, *source, start_x, y, boundary="open", backend="numba",
+                                max_tot_iter=max_tot_iter, rng=g, record="none", **params)
+        found[i], total_iter[i] = f, it
+    return found, total_iter
+
+
+def run_scenario(scenario, trials=None, seed=0, memory=True, backends=None, repeat=3):
+    build, n_essais, moteurs = SCENARIOS[scenario]
+    if backends is not None:
+        moteurs = [m for m in moteurs if m in backends]
+    if strategies_jit.njit is None:
+        moteurs = [m for m in moteurs if m != "jit"]
+
+    resultats = []
+    for name, params in STRATEGIES:
+        for backend in moteurs:
+            n = trials or n_essais[backend]
+            args = (backend, name, params)
+
+            def jouer():
+                # champ reconstruit à chaque passe : même état de départ (champ dynamique)
+                field, source, start_x, start_y, max_tot_iter = build(np.random.default_rng(seed))
+                return _jouer(*args, field, source, start_x, start_y, max_tot_iter, n, seed + 1)
+
+            if backend == "jit":
+                _jouer(*args, *build(np.random.default_rng(seed)), 1, seed)   # compilation hors mesure
+            # mêmes graines à chaque passe : mêmes essais, seul le temps varie
+            walls = []
+            for _ in range(max(1, repeat)):
+                debut = time.perf_counter()
+                found, total_iter = jouer()
+                walls.append(time.perf_counter() - debut)
+            wall = min(walls)
+
+            pic = None
+            if memory:
+                tracemalloc.start()
+                jouer()
+                pic = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+
+            r = resume(name, found, total_iter)
+            resultats.append({
+                "scenario": scenario, "strategy": name, "params": params, "backend": backend,
+                "boundary": BACKENDS[backend], "n": r["n"],
+                "wall_s": wall, "wall_median_s": float(np.median(walls)), "repeat": len(walls),
+                "trials_per_s": r["n"] / wall if wall > 0 else math.inf,
+                "peak_mem_mb": pic,
+                "success_rate": r["success_rate"], "success_ci": list(r["success_ci"]),
+                "avg_iter_success": None if np.isnan(r["avg_iter_success"]) else r["avg_iter_success"],
+            })
+    return resultats
+
+
+def _ecart(r1, r2, z):
+    # test de deux proportions (taux de succès en %), True si écart significatif
+    n1, n2 = r1["n"], r2["n"]
+    p1, p2 = r1["success_rate"] / 100, r2["success_rate"] / 100
+    p = (p1 * n1 + p2 * n2) / (n1 + n2)
+    se = math.sqrt(max(p * (1 - p), 1e-12) * (1 / n1 + 1 / n2))
+    return abs(p1 - p2) > z * se + 1e-12
+
+
+def _cle(r):
+    return (r["scenario"], r["strategy"], r["backend"])
+
+
+def consistency(resultats, z=3.0):
+    # moteurs de même politique de bord : mêmes statistiques attendues
+    problemes = []
+    for i, r1 in enumerate(resultats):
+        for r2 in resultats[i + 1:]:
+            if (r1["scenario"], r1["strategy"], r1["boundary"]) == (r2["scenario"], r2["strategy"], r2["boundary"]) \
+                    and _ecart(r1, r2, z):
+                problemes.append(f"{r1['scenario']}/{r1['strategy']} : {r1['backend']} "
+                                 f"{r1['success_rate']:.1f}% vs {r2['backend']} {r2['success_rate']:.1f}%")
+    return problemes
+
+
+def compare(resultats, baseline, perf_tolerance=0.25, z=3.0):
+    reference = {_cle(r): r for r in baseline["results"]}
+    problemes = []
+    for r in resultats:
+        ref = reference.get(_cle(r))
+        if ref is None:
+            continue
+        nom = "/".join(_cle(r))
+        if r["trials_per_s"] < ref["trials_per_s"] * (1 - perf_tolerance):
+            problemes.append(f"{nom} : débit {r['trials_per_s']:.0f} essais/s "
+                             f"< référence {ref['trials_per_s']:.0f}")
+        if r["peak_mem_mb"] is not None and ref.get("peak_mem_mb") is not None \
+                and r["peak_mem_mb"] > ref["peak_mem_mb"] * (1 + perf_tolerance) + 1.0:   # 1 Mo de marge
+            problemes.append(f"{nom} : mémoire {r['peak_mem_mb']:.1f} Mo > référence {ref['peak_mem_mb']:.1f}")
+        if _ecart(r, ref, z):
+            problemes.append(f"{nom} : succès {r['success_rate']:.1f}% vs référence {ref['success_rate']:.1f}%")
+    return problemes
+
+
+def _meta():
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": strategies_jit.njit is not None,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des stratégies de tracking")
+    parser.add_argument("scenarios", nargs="*", help=f"parmi {', '.join(SCENARIOS)} (défaut : tous)")
+    parser.add_argument("--trials", type=int, help="essais par moteur (défaut : valeur du scénario)")
+    parser.add_argument("--backend", action="append", choices=tuple(BACKENDS), help="moteur(s) à mesurer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="passes chronométrées par mesure (on garde la meilleure)")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--baseline", help="JSON de référence (sortie d'un run précédent)")
+    parser.add_argument("--perf-tolerance", type=float, default=0.25,
+                        help="baisse de débit / hausse de mémoire tolérée (fraction)")
+    parser.add_argument("--z", type=float, default=3.0, help="seuil du test sur les taux de succès")
+    parser.add_argument("--no-memory", action="store_true", help="sans la passe tracemalloc")
+    args = parser.parse_args(argv)
+
+    inconnus = [s for s in args.scenarios if s not in SCENARIOS]
+    if inconnus:
+        parser.error(f"scénario(s) inconnu(s) : {', '.join(inconnus)}")
+
+    resultats = []
+    for scenario in args.scenarios or SCENARIOS:
+        for r in run_scenario(scenario, args.trials, args.seed, not args.no_memory, args.backend,
+                              args.repeat):
+            mem = f"{r['peak_mem_mb']:7.1f} Mo" if r["peak_mem_mb"] is not None else "      -   "
+            print(f"{r['scenario']:<16} {r['strategy']:<9} {r['backend']:<6} n={r['n']:<5} "
+                  f"{r['wall_s']:7.2f} s (méd. {r['wall_median_s']:.2f}) {r['trials_per_s']:9.0f} essais/s {mem}  "
+                  f"succès {r['success_rate']:5.1f}% [{r['success_ci'][0]:.1f}-{r['success_ci'][1]:.1f}]")
+            resultats.append(r)
+
+    problemes = [f"incohérence {p}" for p in consistency(resultats, args.z)]
+    if args.baseline:
+        with open(args.baseline) as f:
+            problemes += compare(resultats, json.load(f), args.perf_tolerance, args.z)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": _meta(), "results": resultats, "problems": problemes}, f, indent=1)
+
+    for p in problemes:
+        print("REGRESSION", p)
+    return 1 if problemes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from field_archive import FieldArchive
+from instrumentation import Counters, merge_counters
+from strategies_api import batch_function
+
+
+# Banc d'essai Monte-Carlo parallèle : les essais de chaque stratégie sont
+# découpés en paquets, chaque paquet est joué par le moteur batch
+# (strategies_batch) dans un processus du pool avec son propre générateur,
+# dérivé par SeedSequence.spawn -> résultats reproductibles quel que soit le
+# nombre de workers (la taille des paquets n'en dépend pas). Le champ de concentration est partagé en mémoire
+# partagée au lieu d'être picklé à chaque tâche ; une archive de champs
+# (field_archive) est rouverte par chaque worker, l'essai i (numéro global
+# dans la stratégie) jouant le champ i modulo la taille de l'archive.
+
+
+CHUNK_SIZE = 1024   # taille par défaut des paquets, fixe : elle définit le découpage des graines
+
+# champ du worker courant (attaché une fois par processus)
+_champ = None
+_shm = None
+
+
+def _attacher(name, shape, dtype):
+    global _champ, _shm
+    # les workers partagent le resource_tracker du parent : seul le parent
+    # détruit le segment (unlink) en fin de benchmark
+    _shm = shared_memory.SharedMemory(name=name)
+    _champ = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+
+
+def _jouer_paquet(func, params, source, start_x, start_y, n, max_tot_iter, seed_seq,
+                  instrument=False, first_trial=None, concentration=None):
+    # first_trial : numéro global du premier essai du paquet, si concentration
+    # est une FieldArchive (None pour un champ unique)
+    concentration = _champ if concentration is None else concentration
+    rng = np.random.default_rng(seed_seq)
+    if isinstance(start_y, tuple):
+        start_y = rng.integers(start_y[0], start_y[1], size=n)
+    counters = Counters() if instrument else None
+    if counters is not None:
+        params = dict(params, counters=counters)
+    if first_trial is None:
+        found, _, total_iter = func(concentration, *source, start_x, start_y,
+                                    max_tot_iter=max_tot_iter, n_probes=n, rng=rng, **params)
+        return found, total_iter, start_y, counters
+
+    # l'essai global i joue le champ i % len(archive) : un appel au moteur
+    # par champ, dans l'ordre des champs (même rng, donc même résultat)
+    champs = (first_trial + np.arange(n)) % len(concentration)
+    ordre = np.argsort(champs, kind="stable")
+    coupures = np.flatnonzero(np.diff(champs[ordre])) + 1
+    xs, ys = np.broadcast_to(start_x, (n,)), np.broadcast_to(start_y, (n,))
+    found = np.zeros(n, dtype=bool)
+    total_iter = np.zeros(n, dtype=np.int64)
+    for k in np.split(ordre, coupures):
+        f, _, it = func(concentration[int(champs[k[0]])], *source, xs[k], ys[k],
+                        max_tot_iter=max_tot_iter, n_probes=k.size, rng=rng, **params)
+        found[k], total_iter[k] = f, it
+    return found, total_iter, start_y, counters
+
+
+def _tranche(valeur, start, n):
+    # départ d'un paquet : scalaire ou tuple (y_min, y_max) tels quels, tableau découpé
+    if isinstance(valeur, tuple) or np.ndim(valeur) == 0:
+        return valeur
+    return np.asarray(valeur)[start:start + n]
+
+
+def _contexte():
+    # fork quand il existe : les scripts du dépôt n'ont pas de garde
+    # if __name__ == "__main__" et ne doivent pas être ré-importés par les workers
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def wilson_interval(k, n, z=1.96):
+    # intervalle de confiance de Wilson pour une proportion k/n
+    if n == 0:
+        return (0.0, 1.0)
+    p = k / n
+    denom = 1 + z**2 / n
+    centre = (p + z**2 / (2*n)) / denom
+    demi = z * math.sqrt(p*(1 - p)/n + z**2/(4*n**2)) / denom
+    return (centre - demi, centre + demi)
+
+
+def resume(name, found, total_iter, z=1.96):
+    n = found.size
+    success_count = int(found.sum())
+    low, high = wilson_interval(success_count, n, z)
+    iters = total_iter[found]
+    if success_count > 0:
+        avg = float(iters.mean())
+        demi = z * float(iters.std(ddof=1)) / math.sqrt(success_count) if success_count > 1 else np.nan
+    else:
+        avg, demi = np.nan, np.nan
+    return {
+        "strategy": name,
+        "n": n,
+        "success_count": success_count,
+        "success_rate": 100 * success_count / n if n else np.nan,
+        "success_ci": (100 * low, 100 * high),
+        "avg_iter_success": avg,
+        "avg_iter_ci": (avg - demi, avg + demi),
+        "found": found,
+        "total_iter": total_iter,
+    }
+
+
+def run_benchmark(strategies, n_trials, concentration, source, start_x, start_y,
+                  max_tot_iter=3000, workers=None, seed=None, chunk_size=None, store=None,
+                  instrument=False):
+    """
+    strategies : liste de (nom, fonction batch, params), ex. STRATEGIES_TO_TEST ;
+                 la fonction peut être remplacée par le nom d'une stratégie
+                 enregistrée dans strategies_api (politique de bord "clamp")
+    concentration : champ, ou FieldArchive (essai i : champ i % len(archive))
+    source     : (source_x, source_y, a, b)
+    start_x    : entier, ou tableau de n_trials valeurs (découpé par paquet)
+    start_y    : entier, tableau de n_trials valeurs, ou tuple (y_min, y_max)
+                 tiré uniformément par essai
+    workers    : nombre de processus (None : tous les coeurs, 1 : sans pool)
+    chunk_size : essais par paquet (défaut CHUNK_SIZE) ; avec seed, les
+                 résultats ne dépendent que de (seed, chunk_size), pas de workers
+    store      : ResultStore optionnel, chaque paquet d'essais y est ajouté
+    instrument : compteurs des moteurs (instrumentation.Counters) agrégés par
+                 stratégie dans r["counters"] : pas par mode, transitions,
+                 odeurs, retours en spirale, casting, temps par phase
+
+    Renvoie une liste de dicts par stratégie (taux de succès et intervalle de
+    Wilson, itérations moyennes si succès et intervalle à 95%, tableaux bruts
+    found / total_iter).
+    """
+    workers = os.cpu_count() if workers is None else workers
+    chunk_size = CHUNK_SIZE if chunk_size is None else chunk_size
+
+    # (stratégie, premier essai, nombre d'essais)
+    paquets = [(i, start, min(chunk_size, n_trials - start))
+               for i in range(len(strategies))
+               for start in range(0, n_trials, chunk_size)]
+    racine = np.random.SeedSequence(seed)
+    seeds = racine.spawn(len(paquets))
+    fonctions = [batch_function(f) if isinstance(f, str) else f for _, f, _ in strategies]
+    archive = concentration if isinstance(concentration, FieldArchive) else None
+    taches = [(fonctions[i], strategies[i][2], tuple(source), _tranche(start_x, start, n),
+               _tranche(start_y, start, n), n, max_tot_iter, s, instrument,
+               start if archive is not None else None)
+              for (i, start, n), s in zip(paquets, seeds)]
+
+    if workers <= 1:
+        sorties = [_jouer_paquet(*t, concentration=concentration) for t in taches]
+    elif archive is not None:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_contexte()) as ex:
+            sorties = list(ex.map(partial(_jouer_paquet, concentration=archive), *zip(*taches)))
+    else:
+        concentration = np.ascontiguousarray(concentration)
+        shm = shared_memory.SharedMemory(create=True, size=max(concentration.nbytes, 1))
+        try:
+            np.ndarray(concentration.shape, dtype=concentration.dtype, buffer=shm.buf)[...] = concentration
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_contexte(),
+                                     initializer=_attacher,
+                                     initargs=(shm.name, concentration.shape, concentration.dtype)) as ex:
+                sorties = list(ex.map(_jouer_paquet, *zip(*taches)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    if store is not None:
+        # la graine racine + l'indice du paquet suffisent à rejouer un paquet
+        for k, ((i, start, n), (found, total_iter, ys, _)) in enumerate(zip(paquets, sorties)):
+            name, _, params = strategies[i]
+            meta = {"seed_entropy": racine.entropy, "max_tot_iter": max_tot_iter}
+            if archive is not None:
+                # essai j du paquet : champ (first_trial + j) % n_fields
+                meta.update(field_archive=os.path.abspath(archive.path), first_trial=start,
+                            n_fields=len(archive))
+            store.append(name, params, found, total_iter, taches[k][3], ys, seed_chunk=k, meta=meta)
+
+    resultats = []
+    for i, (name, _, _) in enumerate(strategies):
+        mes_sorties = [s for (j, _, _), s in zip(paquets, sorties) if j == i]
+        found = np.concatenate([s[0] for s in mes_sorties]) if mes_sorties else np.zeros(0, dtype=bool)
+        total_iter = np.concatenate([s[1] for s in mes_sorties]) if mes_sorties else np.zeros(0, dtype=np.int64)
+        r = resume(name, found, total_iter)
+        if instrument:
+            r["counters"] = merge_counters(s[3] for s in mes_sorties).as_dict()
+        resultats.append(r)
+    return resultats
+
+
+if __name__ == "__main__":
+    # vérification : mêmes tableaux quel que soit le nombre de workers
+    from plumes import generate_poisson_plume
+    from strategies_batch import batch_mosquito, batch_simple
+
+    domain_x, domain_y, a, b = 70, 50, 10, 6
+    source = (2, (domain_y - b) // 2, a, b)
+    champ = generate_poisson_plume((domain_x, domain_y), source, 8, 0.03, 0.4)
+    strategies = [("Simple (d=4)", batch_simple, {"d": 4}), ("Mosquito", batch_mosquito, {})]
+    departs = np.random.default_rng(0).integers(17, 27, size=3000)
+    runs = {w: run_benchmark(strategies, 3000, champ, source, domain_x - 1, departs,
+                             max_tot_iter=1000, workers=w, seed=5, chunk_size=512)
+            for w in (1, 4)}
+    for r1, r4 in zip(runs[1], runs[4]):
+        assert np.array_equal(r1["found"], r4["found"]), r1["strategy"]
+        assert np.array_equal(r1["total_iter"], r4["total_iter"]), r1["strategy"]
+        print(f"{r1['strategy']} : {r1['success_count']}/{r1['n']}, identique pour 1 et 4 workers")
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+# Politiques de bord des stratégies, communes aux trois moteurs :
+#   - pilote pas à pas (strategies_api)  : apply / sees, walk (avance rapide)
+#   - moteur batch (strategies_batch)    : apply_batch / sees_batch, vectorisés
+#   - noyaux JIT (strategies_jit)        : code entier, bornage compilé
+#
+#   "clamp"   : sonde bornée au domaine (strategies.py)
+#   "open"    : sonde libre, odeur lue seulement dans la fenêtre (strategies2.py)
+#   "reflect" : rebond sur les bords, même pour un saut de plusieurs largeurs
+#
+# Une politique définie hors d'ici n'a besoin que de apply : les versions
+# vectorisées par défaut bouclent dessus (moteur batch plus lent, mais
+# correct) ; sans code, elle n'a pas de noyau JIT.
+
+
+class Boundary:
+    name = None
+    code = None      # identifiant des noyaux JIT (None : pas de noyau)
+    inside = True    # apply garde-t-elle toujours la sonde dans le domaine ?
+
+    def apply(self, x, y, shape):
+        return x, y
+
+    def sees(self, x, y, shape):
+        # l'odeur est-elle lue en (x, y) ?
+        return True
+
+    def apply_batch(self, x, y, shape):
+        # version vectorisée de apply (x, y tableaux d'entiers)
+        xy = [self.apply(u, v, shape) for u, v in zip(x.tolist(), y.tolist())]
+        out = np.array(xy, dtype=np.int64).reshape(-1, 2)
+        return out[:, 0], out[:, 1]
+
+    def sees_batch(self, x, y, shape):
+        if self.inside:
+            return np.ones(np.shape(x), dtype=bool)
+        return np.array([self.sees(u, v, shape) for u, v in zip(x.tolist(), y.tolist())], dtype=bool)
+
+    def walk(self, x, y, dx, dy, shape):
+        # positions après chacun des déplacements (dx[k], dy[k]), pas à pas
+        xs = np.empty(len(dx), dtype=np.int64)
+        ys = np.empty(len(dy), dtype=np.int64)
+        for k, (u, v) in enumerate(zip(dx.tolist(), dy.tolist())):
+            x, y = self.apply(x + u, y + v, shape)
+            xs[k], ys[k] = x, y
+        return xs, ys
+
+
+def _borner(p, d, n):
+    # positions successives de p + d[0] + d[1]... bornées à [0, n-1] à chaque pas
+    libre = p + np.cumsum(d)
+    if (d >= 0).all() or (d <= 0).all():
+        return np.clip(libre, 0, n - 1)
+    if libre.min() >= 0 and libre.max() <= n - 1:
+        return libre
+    # |d| >= n - 1 : le bord atteint ne dépend pas du point de départ
+    sature = np.abs(d) >= n - 1
+    out = np.where(d > 0, n - 1, 0)
+    k = np.flatnonzero(~sature)
+    pas = d[k].tolist()
+    for i, (j, v) in enumerate(zip(k.tolist(), pas)):
+        if i == 0 or k[i - 1] != j - 1:
+            p = int(out[j - 1]) if j else p
+        p = min(max(p + v, 0), n - 1)
+        out[j] = p
+    return out
+
+
+class Clamp(Boundary):
+    name = "clamp"
+    code = 0
+
+    def apply(self, x, y, shape):
+        domain_y, domain_x = shape
+        return min(max(x, 0), domain_x - 1), min(max(y, 0), domain_y - 1)
+
+    def apply_batch(self, x, y, shape):
+        domain_y, domain_x = shape
+        return np.clip(x, 0, domain_x - 1), np.clip(y, 0, domain_y - 1)
+
+    def walk(self, x, y, dx, dy, shape):
+        return _borner(x, dx, shape[1]), _borner(y, dy, shape[0])
+
+
+class Open(Boundary):
+    name = "open"
+    code = 1
+    inside = False
+
+    def sees(self, x, y, shape):
+        return 0 <= x < shape[1] and 0 <= y < shape[0]
+
+    def apply_batch(self, x, y, shape):
+        return x, y
+
+    def sees_batch(self, x, y, shape):
+        return (x >= 0) & (x < shape[1]) & (y >= 0) & (y < shape[0])
+
+    def walk(self, x, y, dx, dy, shape):
+        return x + np.cumsum(dx), y + np.cumsum(dy)
+
+
+def _reflechir(v, n):
+    # rebond sur les bords [0, n-1], même pour un saut de plusieurs largeurs
+    if n <= 1:
+        return 0
+    periode = 2 * (n - 1)
+    v %= periode
+    return periode - v if v > n - 1 else v
+
+
+def _reflechir_batch(v, n):
+    if n <= 1:
+        return np.zeros_like(v)
+    periode = 2 * (n - 1)
+    v = v % periode
+    return np.where(v > n - 1, periode - v, v)
+
+
+class Reflect(Boundary):
+    name = "reflect"
+    code = 2
+
+    def apply(self, x, y, shape):
+        domain_y, domain_x = shape
+        return _reflechir(x, domain_x), _reflechir(y, domain_y)
+
+    def apply_batch(self, x, y, shape):
+        domain_y, domain_x = shape
+        return _reflechir_batch(x, domain_x), _reflechir_batch(y, domain_y)
+
+
+BOUNDARIES = {b.name: b for b in (Clamp(), Open(), Reflect())}
+
+
+def get_boundary(boundary):
+    if isinstance(boundary, Boundary):
+        return boundary
+    try:
+        return BOUNDARIES[boundary]
+    except KeyError:
+        raise ValueError(f"boundary doit être dans {tuple(BOUNDARIES)}, pas {boundary!r}") from None
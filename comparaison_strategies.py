@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from strategies import strategy_simple, strategy_spiral, strategy_mosquito 
+from strategies_batch import batch_simple, batch_spiral, batch_mosquito
+from plumes import generate_poisson_plume
+from benchmark import run_benchmark
+from result_store import ResultStore
 
 # --- 1. ENVIRONNEMENT ---
 domain_x, domain_y = 70, 50
@@ -11,29 +14,10 @@ source_x, source_y = 2, (domain_y-b)//2
 base_lambda = 8       
 k_decay = 0.03        
 s_spread = 0.4        
-x_pts, y_pts = [], []
 
 # Création du champ de concentration
-for x in range(source_x, source_x+a):
-    for y in range(source_y, source_y+b):
-        x_pts.append(x)
-        y_pts.append(y)
-
-for x in range(source_x + a, domain_x):
-    lambda_x = base_lambda * np.exp(-k_decay * (x - (source_x + a)))
-    n_particles = np.random.poisson(lambda_x)
-    spread = int(b/2 + (x - (source_x+a))*s_spread) 
-    y_center = source_y + b//2
-    y_min = max(0, y_center - spread)
-    y_max = min(domain_y, y_center + spread)
-    for _ in range(n_particles):
-        y = np.random.randint(y_min, y_max)
-        x_pts.append(x)
-        y_pts.append(y)
-
-concentration = np.zeros((domain_y, domain_x), dtype=int)
-for x, y in zip(x_pts, y_pts):
-    concentration[y, x] = 1
+concentration = generate_poisson_plume((domain_x, domain_y), (source_x, source_y, a, b),
+                                       base_lambda, k_decay, s_spread)
 
 # Paramètres de simulation
 max_tot_iter = 3000
@@ -45,56 +29,39 @@ start_y_ref = (domain_y-b)//2 # Référence du centre de départ
 # Nous allons utiliser les paramètres optimaux trouvés ou des valeurs standards:
 STRATEGIES_TO_TEST = [
     # Hypothèse: d=4 (un saut agressif)
-    ("Simple (d=4)", strategy_simple, {'d': 4}),
+    ("Simple (d=4)", batch_simple, {'d': 4}),
     
     # Hypothèse: T_loss=10
-    ("Spiral (T_loss=10)", strategy_spiral, {'T_loss': 10}), 
+    ("Spiral (T_loss=10)", batch_spiral, {'T_loss': 10}), 
     
     # Stratégie Mosquito (pas de paramètre externe à optimiser ici)
-    ("Mosquito", strategy_mosquito, {}), 
+    ("Mosquito", batch_mosquito, {}), 
 ]
 
 N_SIMULATIONS = 150 # Nombre d'essais pour la robustesse statistique
+WORKERS = None      # None : tous les coeurs
+RESULTS_DIR = None  # ex. "resultats/comparaison" pour conserver chaque essai sur disque
 
 print("\n--- Comparaison Numérique des Stratégies de Tracking ---")
 print(f"Banc d'essai: Plume Poisson Turbulente | N={N_SIMULATIONS} simulations par stratégie")
 print("-" * 75)
 
-comparaison_results = []
-
-for name, strategy_func, params in STRATEGIES_TO_TEST:
-    
-    success_count = 0
-    total_iterations_success = 0
-    
-    for i in range(N_SIMULATIONS):
-        # Point de départ légèrement aléatoire pour éviter un biais de position
-        start_y = np.random.randint(max(0, start_y_ref - 5), min(domain_y, start_y_ref + 5))
-        
-        # Exécution de la stratégie (Simulation du tracking du moustique)
-        found, _, total_iter = strategy_func(
-            concentration, 
-            source_x, source_y, a, b, 
-            start_x, start_y, 
-            max_tot_iter=max_tot_iter,
-            **params 
-        )
-        
-        if found:
-            success_count += 1
-            total_iterations_success += total_iter
-
-    # Calcul des métriques
-    success_rate = (success_count / N_SIMULATIONS) * 100
-    avg_iter_success = total_iterations_success / success_count if success_count > 0 else np.nan
-    
-    comparaison_results.append({
-        "strategy": name,
-        "success_rate": success_rate,
-        "avg_iter_success": avg_iter_success
-    })
-    
-    print(f"| {name:<20} | Taux Succès: {success_rate:.1f}% | Iter. Moy.: {avg_iter_success:.0f}")
+# Point de départ légèrement aléatoire pour éviter un biais de position
+start_y_range = (max(0, start_y_ref - 5), min(domain_y, start_y_ref + 5))
+
+# Essais répartis sur tous les coeurs (graine reproductible par paquet d'essais)
+comparaison_results = run_benchmark(
+    STRATEGIES_TO_TEST, N_SIMULATIONS,
+    concentration, (source_x, source_y, a, b),
+    start_x, start_y_range,
+    max_tot_iter=max_tot_iter,
+    workers=WORKERS,
+    store=ResultStore(RESULTS_DIR) if RESULTS_DIR else None,
+)
+
+for r in comparaison_results:
+    low, high = r['success_ci']
+    print(f"| {r['strategy']:<20} | Taux Succès: {r['success_rate']:.1f}% [{low:.1f}-{high:.1f}] | Iter. Moy.: {r['avg_iter_success']:.0f}")
 
 print("-" * 75)
 
@@ -0,0 +1,110 @@
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from sparse_field import PackedField
+
+
+# Archive de champs de concentration, générée une fois puis relue par
+# n'importe quel nombre de processus :
+#
+#   MAGIC (8 octets) | longueur de l'en-tête (uint32 little-endian) | en-tête JSON
+#   | bourrage jusqu'à un multiple de ALIGN | n trames (domain_y, largeur) uint8
+#
+# largeur = ceil(domain_x / 8) si packed (np.packbits le long de x), domain_x
+# sinon. L'en-tête garde la spécification du générateur (PlumeFactory.spec),
+# la graine racine et la taille des paquets : la trame i vient du paquet
+# i // chunk, tiré avec le i // chunk-ième enfant de SeedSequence(seed), et
+# peut être régénérée à l'identique (regenerate).
+#
+# Les trames sont lues par np.memmap en lecture seule : archive.frames[i] est
+# une vue sans copie, archive.packed_field(i) un PackedField sur cette vue, et
+# archive[i] le champ dense (décompacté si besoin). Une FieldArchive se
+# transmet aux workers par son chemin : chacun rouvre le fichier.
+
+MAGIC = b"ODORFLD\x01"
+ALIGN = 64
+FORMAT = 1
+
+
+class FieldArchive:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} n'est pas une archive de champs")
+            taille = int.from_bytes(f.read(4), "little")
+            self.header = json.loads(f.read(taille).decode())
+        if self.header["format"] != FORMAT:
+            raise ValueError(f"format d'archive {self.header['format']} non pris en charge")
+        self.shape = tuple(self.header["shape"])
+        self.packed = self.header["packed"]
+        self.spec = self.header["spec"]
+        largeur = -(-self.shape[1] // 8) if self.packed else self.shape[1]
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=self.header["offset"],
+                                shape=(self.header["n"], self.shape[0], largeur))
+
+    @classmethod
+    def create(cls, path, factory, n, seed=None, packed=True, chunk=1024):
+        """Génère n champs avec factory (PlumeFactory) et les écrit dans path."""
+        racine = np.random.SeedSequence(seed)
+        shape = (factory.domain_y, factory.domain_x)
+        header = {
+            "format": FORMAT, "n": n, "shape": list(shape), "packed": packed,
+            "chunk": chunk, "seed_entropy": racine.entropy, "spec": factory.spec,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        # l'offset des données fait partie de l'en-tête : on le fixe à part
+        texte = json.dumps(dict(header, offset=0)).encode()
+        offset = math.ceil((len(MAGIC) + 4 + len(texte) + 32) / ALIGN) * ALIGN
+        texte = json.dumps(dict(header, offset=offset)).encode()
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + len(texte).to_bytes(4, "little") + texte)
+            f.write(b"\0" * (offset - f.tell()))
+            for c, enfant in enumerate(racine.spawn(math.ceil(n / chunk))):
+                k = min(chunk, n - c * chunk)
+                f.write(factory.generate(k, np.random.default_rng(enfant), packed, chunk).tobytes())
+        os.replace(tmp, path)
+        return cls(path)
+
+    def __len__(self):
+        return self.frames.shape[0]
+
+    def __getitem__(self, i):
+        # champ(s) dense(s) uint8 (domain_y, domain_x)
+        trames = self.frames[i]
+        if self.packed:
+            return np.unpackbits(trames, axis=-1, count=self.shape[1])
+        return trames
+
+    def packed_field(self, i):
+        if not self.packed:
+            raise ValueError("archive non compactée : utiliser archive[i]")
+        return PackedField(self.frames[i], self.shape)
+
+    def stream(self, start=0, stop=None, chunk=256):
+        """Champs denses un par un, lus par paquets de trames consécutives."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for debut in range(start, stop, chunk):
+            yield from self[debut:min(debut + chunk, stop)]
+
+    def regenerate(self, i, factory):
+        # trame i recalculée depuis la graine (vérification de l'archive)
+        chunk = self.header["chunk"]
+        c = i // chunk
+        racine = np.random.SeedSequence(self.header["seed_entropy"])
+        enfant = racine.spawn(c + 1)[c]
+        k = min(chunk, len(self) - c * chunk)
+        return factory.generate(k, np.random.default_rng(enfant), self.packed, chunk)[i % chunk]
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
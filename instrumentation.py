@@ -0,0 +1,101 @@
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+# Compteurs optionnels des boucles de stratégies (counters=None par défaut :
+# aucun coût hors d'un test `is not None`). Modes communs aux trois stratégies :
+# search, upwind (remontée, y compris le saut de d pas de strategy_simple)
+# et casting. Les transitions sont comptées entre deux déplacements successifs
+# d'une même sonde, d'où :
+#   upwind -> search   : retours en spirale (strategy_spiral), fins de saut (simple)
+#   casting -> casting : croissances de l'amplitude de casting (strategy_mosquito)
+# Les nouvelles spirales (plume perdue depuis T_loss pas) sont comptées à part
+# par les moteurs de strategy_spiral (spiral_resets), 0 pour les autres.
+# Le temps est cumulé par phase de la boucle (lap), en secondes.
+
+MODES = ("search", "upwind", "casting")
+
+
+class Counters:
+
+    def __init__(self):
+        self.trials = 0
+        self.steps = np.zeros(len(MODES), dtype=np.int64)
+        self.transitions = np.zeros((len(MODES), len(MODES)), dtype=np.int64)
+        self.odor_hits = 0
+        self.max_casting_ampl = 0
+        self.spiral_resets = 0
+        self.time = defaultdict(float)
+        self._t = None
+
+    def start(self):
+        self._t = time.perf_counter()
+
+    def lap(self, phase):
+        # temps écoulé depuis le dernier lap (ou start) attribué à `phase`
+        t = time.perf_counter()
+        if self._t is not None:
+            self.time[phase] += t - self._t
+        self._t = t
+
+    def record(self, modes, next_modes=None, odor=None, at=None):
+        """
+        modes      : mode (code 0/1/2) du déplacement de chaque sonde ce pas-ci
+        next_modes : mode du déplacement suivant, pour les sondes qui continuent
+                     (même ordre, déjà filtré) ; None si aucune
+        odor       : odeur détectée après le déplacement (bool)
+        at         : (ids, x, y, it) des sondes après le déplacement ; ignoré
+                     ici, utilisé par les sous-classes (analytics.TrajectoryMaps)
+        """
+        n = len(MODES)
+        self.steps += np.bincount(np.asarray(modes, dtype=np.int64).ravel(), minlength=n)
+        if next_modes is not None:
+            k = np.asarray(next_modes[0], dtype=np.int64) * n + np.asarray(next_modes[1], dtype=np.int64)
+            self.transitions += np.bincount(k.ravel(), minlength=n * n).reshape(n, n)
+        if odor is not None:
+            self.odor_hits += int(np.count_nonzero(odor))
+
+    def record_step(self, mode, next_mode, odor):
+        # version scalaire (pilote pas à pas)
+        self.steps[mode] += 1
+        if next_mode is not None:
+            self.transitions[mode, next_mode] += 1
+        if odor:
+            self.odor_hits += 1
+
+    def merge(self, other):
+        self.trials += other.trials
+        self.steps += other.steps
+        self.transitions += other.transitions
+        self.odor_hits += other.odor_hits
+        self.max_casting_ampl = max(self.max_casting_ampl, other.max_casting_ampl)
+        self.spiral_resets += other.spiral_resets
+        for phase, t in other.time.items():
+            self.time[phase] += t
+        return self
+
+    def as_dict(self):
+        total = int(self.steps.sum())
+        return {
+            "trials": self.trials,
+            "steps": {m: int(s) for m, s in zip(MODES, self.steps)},
+            "steps_share": {m: (int(s) / total if total else 0.0) for m, s in zip(MODES, self.steps)},
+            "transitions": {f"{a}->{b}": int(self.transitions[i, j])
+                            for i, a in enumerate(MODES) for j, b in enumerate(MODES)
+                            if self.transitions[i, j]},
+            "odor_hits": self.odor_hits,
+            "spiral_resets": self.spiral_resets,
+            "casting_growth": int(self.transitions[2, 2]),
+            "max_casting_ampl": self.max_casting_ampl,
+            "time": dict(self.time),
+        }
+
+
+def merge_counters(counters):
+    total = Counters()
+    for c in counters:
+        if c is not None:
+            total.merge(c)
+    return total
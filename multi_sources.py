@@ -0,0 +1,100 @@
+import numpy as np
+
+from strategies_api import simulate_batch
+
+
+# Scénarios à plusieurs sources et plusieurs sondes (flotte de K sondes).
+#
+# SourceMap : grille d'étiquettes (domain_y, domain_x), 0 hors source, i + 1
+# dans la source i (la première l'emporte si deux rectangles se chevauchent).
+# Le test d'arrivée d'une sonde est une lecture grid[y, x] : O(1) quel que soit
+# le nombre M de sources, pour un coût mémoire de 2 octets par cellule.
+#
+# run_fleet fait partir les K sondes ensemble dans le moteur batch
+# (labels=SourceMap) ; fleet_summary en tire les issues par sonde, par source
+# et pour la flotte (première arrivée, toutes les sources trouvées).
+#
+#   factory = MultiPlumeFactory([PlumeFactory.poisson_flag(domain, s) for s in sources])
+#   field = factory.single(rng)
+#   r = run_fleet("mosquito", field, factory.sources, 69, ys, rng=rng)
+
+
+class SourceMap:
+
+    def __init__(self, shape, sources):
+        self.shape = tuple(shape)
+        self.sources = [tuple(s) for s in sources]
+        if not self.sources:
+            raise ValueError("au moins une source")
+        dtype = np.int16 if len(self.sources) < np.iinfo(np.int16).max else np.int32
+        self.grid = np.zeros(self.shape, dtype=dtype)
+        # en ordre inverse : en cas de chevauchement, la source de plus petit indice reste
+        for i in range(len(self.sources) - 1, -1, -1):
+            source_x, source_y, a, b = self.sources[i]
+            self.grid[max(source_y, 0):source_y + b, max(source_x, 0):source_x + a] = i + 1
+
+    def __len__(self):
+        return len(self.sources)
+
+    def label(self, x, y):
+        # indice de source + 1 en (x, y), 0 hors source ; positions dans le domaine
+        return self.grid[y, x]
+
+    def contains(self, x, y):
+        return self.grid[y, x] > 0
+
+
+def fleet_summary(labels, found, positions, total_iter):
+    """
+    Issues d'une flotte, à partir de la sortie du moteur batch.
+    Par sonde : found, source (indice, -1 si aucune), iter.
+    Par source : nombre de sondes arrivées, pas et indice de la première.
+    Flotte : première arrivée, pas auquel toutes les sources sont trouvées
+    (-1 si l'une ne l'est pas).
+    """
+    found = np.asarray(found, dtype=bool)
+    total_iter = np.asarray(total_iter)
+    M = len(labels)
+    source = np.full(found.size, -1, dtype=np.int64)
+    source[found] = labels.label(positions[found, 0], positions[found, 1]).astype(np.int64) - 1
+
+    arrivees = np.flatnonzero(found)
+    hits = np.bincount(source[arrivees], minlength=M)
+    # première arrivée par source : tri par (source, pas)
+    ordre = arrivees[np.lexsort((total_iter[arrivees], source[arrivees]))]
+    premiers = ordre[np.r_[True, source[ordre][1:] != source[ordre][:-1]]] if ordre.size else ordre
+    first_iter = np.full(M, -1, dtype=np.int64)
+    first_probe = np.full(M, -1, dtype=np.int64)
+    first_iter[source[premiers]] = total_iter[premiers]
+    first_probe[source[premiers]] = premiers
+
+    trouvees = int((hits > 0).sum())
+    return {
+        "n_probes": found.size,
+        "n_sources": M,
+        "probe_found": found,
+        "probe_source": source,
+        "probe_iter": total_iter,
+        "success_rate": 100 * float(found.mean()) if found.size else np.nan,
+        "source_hits": hits,
+        "source_first_iter": first_iter,
+        "source_first_probe": first_probe,
+        "sources_found": trouvees,
+        "first_iter": int(total_iter[arrivees].min()) if arrivees.size else -1,
+        "all_found_iter": int(first_iter.max()) if trouvees == M else -1,
+    }
+
+
+def run_fleet(strategy, concentration, sources, start_x, start_y, n_probes=None,
+              max_tot_iter=3000, rng=None, counters=None, censor=None, **params):
+    """
+    K sondes de la stratégie enregistrée `strategy` (moteur batch, bord "clamp")
+    vers M sources. sources : liste de rectangles (source_x, source_y, a, b)
+    ou SourceMap déjà construite. start_x / start_y : scalaires ou tableaux (K,).
+    """
+    labels = sources if isinstance(sources, SourceMap) else SourceMap(concentration.shape, sources)
+    found, positions, total_iter = simulate_batch(
+        strategy, concentration, *labels.sources[0], start_x, start_y, boundary="clamp",
+        max_tot_iter=max_tot_iter, n_probes=n_probes, rng=rng, counters=counters,
+        censor=censor, labels=labels, **params)
+    return fleet_summary(labels, found, positions, total_iter)
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+# Index d'un champ de concentration binaire, construit une fois puis
+# interrogé en temps constant (ou logarithmique) par les stratégies et les
+# métriques :
+#   - distance de Tchebychev (nombre minimal de pas de sonde, diagonales
+#     comprises) à la cellule d'odeur la plus proche ;
+#   - codage par plages (run-length) des cellules d'odeur, par ligne et par colonne ;
+#   - table de sommes cumulées 2D : nombre d'odeurs dans un rectangle en O(1).
+
+
+def chebyshev_distance(hits):
+    """
+    Transformée en distance de Tchebychev de hits (tableau bool (H, W)).
+    Deux passes de chanfrein (haut -> bas puis bas -> haut) ; dans chaque
+    ligne la propagation horizontale est vectorisée par un minimum cumulé.
+    Les cellules sans aucune odeur dans le champ valent H + W.
+    """
+    H, W = hits.shape
+    inf = H + W
+    d = np.where(hits, 0, inf).astype(np.int32)
+    cols = np.arange(W, dtype=np.int32)
+
+    def _ligne(row, voisine):
+        if voisine is not None:
+            cand = voisine.copy()
+            cand[1:] = np.minimum(cand[1:], voisine[:-1])
+            cand[:-1] = np.minimum(cand[:-1], voisine[1:])
+            np.minimum(row, cand + 1, out=row)
+        # d[x] = min_k d[k] + |x - k| : gauche -> droite puis droite -> gauche
+        np.minimum(row, np.minimum.accumulate(row - cols) + cols, out=row)
+        rev = row[::-1]
+        np.minimum(rev, np.minimum.accumulate(rev - cols) + cols, out=rev)
+
+    for y in range(H):
+        _ligne(d[y], d[y-1] if y > 0 else None)
+    for y in range(H - 2, -1, -1):
+        _ligne(d[y], d[y+1])
+    return np.minimum(d, inf)
+
+
+def _runs(lines):
+    # plages de 1 consécutifs de chaque ligne de `lines` (bool (n, L)), format CSR
+    n, L = lines.shape
+    pad = np.zeros((n, L + 2), dtype=np.int8)
+    pad[:, 1:-1] = lines
+    diff = np.diff(pad, axis=1)
+    li, starts = np.nonzero(diff == 1)
+    _, ends = np.nonzero(diff == -1)   # même ordre (ligne, position) que starts
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(li, minlength=n), out=offsets[1:])
+    return offsets, starts, ends
+
+
+class OdorIndex:
+
+    def __init__(self, concentration):
+        hits = np.asarray(concentration) == 1
+        self.shape = hits.shape
+        self.distance = chebyshev_distance(hits)
+
+        # plages par ligne (le long de x) et par colonne (le long de y), fin exclue
+        self.row_offsets, self.row_starts, self.row_ends = _runs(hits)
+        self.col_offsets, self.col_starts, self.col_ends = _runs(hits.T)
+
+        # table de sommes cumulées, une ligne / colonne de zéros en tête
+        H, W = hits.shape
+        self.sat = np.zeros((H + 1, W + 1), dtype=np.int64)
+        np.cumsum(np.cumsum(hits, axis=0), axis=1, out=self.sat[1:, 1:])
+
+    def distance_at(self, x, y):
+        # pas minimaux jusqu'à l'odeur la plus proche (x, y scalaires ou tableaux)
+        return self.distance[y, x]
+
+    def count(self, x0, y0, x1, y1):
+        """Nombre de cellules d'odeur dans [x0, x1) x [y0, y1), bornes rognées au domaine."""
+        H, W = self.shape
+        x0, x1 = np.clip(x0, 0, W), np.clip(x1, 0, W)
+        y0, y1 = np.clip(y0, 0, H), np.clip(y1, 0, H)
+        s = self.sat
+        n = s[y1, x1] - s[y0, x1] - s[y1, x0] + s[y0, x0]
+        return np.where((x1 > x0) & (y1 > y0), n, 0)
+
+    def row_runs(self, y):
+        # plages (début, fin exclue) des odeurs de la ligne y
+        a, b = self.row_offsets[y], self.row_offsets[y + 1]
+        return self.row_starts[a:b], self.row_ends[a:b]
+
+    def col_runs(self, x):
+        a, b = self.col_offsets[x], self.col_offsets[x + 1]
+        return self.col_starts[a:b], self.col_ends[a:b]
+
+    def next_hit_left(self, x, y):
+        """Plus grand x' <= x avec une odeur sur la ligne y, ou -1 (recherche dichotomique)."""
+        starts, ends = self.row_runs(y)
+        k = np.searchsorted(starts, x, side="right") - 1
+        if k < 0:
+            return -1
+        return min(x, ends[k] - 1)
+
+    def next_hit_right(self, x, y):
+        """Plus petit x' >= x avec une odeur sur la ligne y, ou -1."""
+        starts, ends = self.row_runs(y)
+        k = np.searchsorted(ends, x, side="right")
+        if k >= starts.size:
+            return -1
+        return max(x, starts[k])
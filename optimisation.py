@@ -0,0 +1,140 @@
+import itertools
+import math
+
+import numpy as np
+
+from benchmark import wilson_interval
+from plumes import PlumeFactory
+from random_source import as_generator
+
+
+# Réglage adaptatif des paramètres d'une stratégie (d, T_loss...) par
+# successive halving + racing, à la place des grilles exhaustives du notebook :
+#   - chaque tour, les candidats encore en course reçoivent de nouveaux essais
+#     (joués par le moteur batch, sur les mêmes champs et départs pour tous :
+#     nombres aléatoires communs, les écarts entre candidats sont moins bruités) ;
+#   - on élimine les candidats statistiquement dominés (IC disjoints du meilleur),
+#     puis on ne garde que la meilleure fraction 1/eta (au moins deux) ;
+#   - le nombre d'essais par candidat est multiplié par eta à chaque tour.
+# Arrêt quand le racing a isolé un seul candidat ou que le budget est épuisé.
+
+
+def grille(**values):
+    """grille(d=[1, 2, 3], T_loss=[5, 10]) -> liste de dicts de paramètres"""
+    noms = list(values)
+    return [dict(zip(noms, combo)) for combo in itertools.product(*values.values())]
+
+
+def _stats(c, objective, max_tot_iter, z):
+    n = c["n"]
+    if objective == "success":
+        low, high = wilson_interval(c["success"], n, z)
+        return c["success"] / n, low, high
+    # coût : itérations moyennes par essai, un échec compte max_tot_iter
+    # -> on maximise l'opposé pour garder "plus grand = meilleur"
+    mean = c["cost_sum"] / n
+    var = max(c["cost_sq"] / n - mean**2, 0.0)
+    demi = z * math.sqrt(var / n) if n > 1 else max_tot_iter
+    return -mean, -mean - demi, -mean + demi
+
+
+def _jouer(func, params, fields, source, start_x, start_y, n, max_tot_iter, rng):
+    found, total_iter = [], []
+    # n essais répartis sur les champs du tour
+    for field, k in zip(fields, np.array_split(np.arange(n), len(fields))):
+        if k.size == 0:
+            continue
+        f, _, it = func(field, *source, start_x, start_y[k],
+                        max_tot_iter=max_tot_iter, n_probes=k.size, rng=rng, **params)
+        found.append(f)
+        total_iter.append(it)
+    return np.concatenate(found), np.concatenate(total_iter)
+
+
+def tune(func, candidates, concentration, source, start_x, start_y,
+         objective="success", budget=20000, initial_trials=64, eta=2,
+         max_tot_iter=3000, trials_per_field=32, z=1.96, rng=None, verbose=False):
+    """
+    func          : fonction du moteur batch (batch_simple, batch_spiral...)
+    candidates    : liste de dicts de paramètres, ex. grille(d=range(1, 36))
+    concentration : champ fixe, ou PlumeFactory pour un champ neuf tous les
+                    trials_per_field essais (comme les balayages du notebook)
+    start_y       : entier ou tuple (y_min, y_max) tiré par essai
+    objective     : "success" (taux de succès) ou "cost" (itérations moyennes
+                    par essai, échecs comptés à max_tot_iter)
+
+    Renvoie {"best": params, "estimate", "ci", "table": [...], "trials_used"}.
+    """
+    rng = as_generator(rng)
+    table = [{"params": dict(p), "n": 0, "success": 0, "cost_sum": 0.0, "cost_sq": 0.0,
+              "iter_success_sum": 0, "eliminated_round": None} for p in candidates]
+    alive = list(range(len(table)))
+    n_round = initial_trials
+    used = 0
+    tour = 0
+
+    while alive and used < budget:
+        # pas plus que le budget restant, réparti sur les survivants
+        n_round = max(1, min(n_round, (budget - used) // len(alive)))
+
+        # champs et départs communs à tous les candidats du tour
+        if isinstance(concentration, PlumeFactory):
+            n_fields = max(1, math.ceil(n_round / trials_per_field))
+            fields = [concentration.single(rng) for _ in range(n_fields)]
+        else:
+            fields = [concentration]
+        if isinstance(start_y, tuple):
+            ys = rng.integers(start_y[0], start_y[1], size=n_round)
+        else:
+            ys = np.full(n_round, start_y)
+        graine = rng.integers(2**63)
+
+        for i in alive:
+            c = table[i]
+            found, total_iter = _jouer(func, c["params"], fields, source, start_x, ys,
+                                       n_round, max_tot_iter, np.random.default_rng(graine))
+            cost = np.where(found, total_iter, max_tot_iter).astype(float)
+            c["n"] += n_round
+            c["success"] += int(found.sum())
+            c["iter_success_sum"] += int(total_iter[found].sum())
+            c["cost_sum"] += cost.sum()
+            c["cost_sq"] += (cost**2).sum()
+            used += n_round
+
+        stats = {i: _stats(table[i], objective, max_tot_iter, z) for i in alive}
+        meilleur = max(alive, key=lambda i: stats[i][0])
+
+        # racing : éliminer ceux dont la borne haute est sous la borne basse du meilleur
+        survivants = [i for i in alive if stats[i][2] >= stats[meilleur][1]]
+        # successive halving : garder la meilleure fraction 1/eta, mais au moins
+        # deux candidats tant que le racing ne les a pas départagés
+        survivants.sort(key=lambda i: stats[i][0], reverse=True)
+        survivants = survivants[:max(2, math.ceil(len(alive) / eta))]
+        for i in alive:
+            if i not in survivants:
+                table[i]["eliminated_round"] = tour
+        alive = survivants
+
+        if verbose:
+            print(f"tour {tour} : {n_round} essais/candidat, {len(alive)} en course, "
+                  f"meilleur {table[meilleur]['params']} ({stats[meilleur][0]:.3f}), budget {used}/{budget}")
+
+        tour += 1
+        if len(alive) == 1:
+            break
+        n_round *= eta
+
+    for c in table:
+        n = c["n"]
+        c["success_rate"] = 100 * c["success"] / n if n else np.nan
+        c["avg_iter_success"] = c["iter_success_sum"] / c["success"] if c["success"] else np.nan
+        c["mean_cost"] = c["cost_sum"] / n if n else np.nan
+
+    best = max((i for i in range(len(table)) if table[i]["n"]),
+               key=lambda i: (table[i]["eliminated_round"] is None,
+                              _stats(table[i], objective, max_tot_iter, z)[0]))
+    estimate, low, high = _stats(table[best], objective, max_tot_iter, z)
+    if objective == "cost":
+        estimate, low, high = -estimate, -high, -low
+    return {"best": table[best]["params"], "estimate": estimate, "ci": (low, high),
+            "table": table, "trials_used": used}
@@ -0,0 +1,210 @@
+import math
+
+import numpy as np
+
+from random_source import as_generator
+
+
+# Balayages Monte-Carlo par vagues, avec arrêt anticipé des sondes sans espoir.
+#
+# Censor, passé au moteur batch (censor=), coupe une sonde avant max_tot_iter :
+#   - HOPELESS (exact) : sonde mosquito en casting saturé. Dès que
+#     casting_ampl >= domain_y - 1, chaque pas de casting la plaque sur une
+#     ligne extrême (0 ou domain_y - 1, en alternance) et x décroît jusqu'à 0 :
+#     la suite de la trajectoire est déterministe. Si aucune case de ce
+#     chemin n'est une odeur ni la source, l'essai échouera à coup sûr ; il
+#     est compté comme un échec, sans biais. Champs figés uniquement.
+#   - CENSORED (heuristique, optionnel) : sonde collée à un bord depuis
+#     boundary_steps pas, ou casting_ampl > casting_limit. L'issue est alors
+#     inconnue, et ces coupures sont informatives (un Kaplan-Meier classique
+#     surestime le succès). D'où une roulette russe : une fraction `keep` des
+#     sondes signalées continue (KEPT, poids 1 / keep), les autres sont
+#     coupées (poids 0). Les estimateurs pondérés restent sans biais, quelle
+#     que soit la qualité de l'heuristique ; elle ne joue que sur la variance.
+#
+# survival : taux de succès et fonction de survie S(t) = P(pas encore trouvé
+# à t) pondérés (Horvitz-Thompson), IC normal, et encadrement brut
+# [censurés = échecs, censurés = succès].
+
+NONE, CENSORED, HOPELESS, KEPT = 0, 1, 2, 3
+
+
+class Censor:
+    """
+    exact          : critère exact du casting saturé (strategy_mosquito, champ figé)
+    boundary_steps : pas consécutifs au bord du domaine avant signalement
+    casting_limit  : amplitude de casting au-delà de laquelle la sonde est signalée
+    keep           : fraction des sondes signalées qui continuent (roulette russe),
+                     dans ]0, 1] dès qu'une coupure heuristique est active
+    rng            : générateur de la roulette ; par défaut, dérivé de celui de
+                     run_waves (rng=) à chaque appel
+    """
+
+    def __init__(self, exact=True, boundary_steps=None, casting_limit=None, keep=0.1, rng=None):
+        heuristique = boundary_steps is not None or casting_limit is not None
+        if heuristique and not 0 < keep <= 1:
+            # keep = 0 : poids 1 / keep infini, estimateurs sans objet
+            raise ValueError(f"keep doit être dans ]0, 1] avec boundary_steps / casting_limit, "
+                             f"pas {keep!r}")
+        if not 0 <= keep <= 1:
+            raise ValueError(f"keep doit être dans [0, 1], pas {keep!r}")
+        self.exact = exact
+        self.boundary_steps = boundary_steps
+        self.casting_limit = casting_limit
+        self.keep = keep
+        self.seeded = rng is not None
+        self.rng = as_generator(rng)
+
+    def begin(self, concentration, dedans, n, boundary=None):
+        # appelé par le moteur : état par essai, tables du critère exact
+        # (dedans : test d'arrivée du moteur, (x, y) -> bool). Le critère
+        # exact suppose la sonde bornée ("clamp") : ailleurs, pas de HOPELESS.
+        self.status = np.zeros(n, dtype=np.int8)
+        self.shape = concentration.shape
+        self._chemins = None
+        borne = boundary is None or getattr(boundary, "name", boundary) == "clamp"
+        if self.exact and borne and not hasattr(concentration, "at"):
+            domain_y, domain_x = self.shape
+            cols = np.arange(domain_x)
+            chemins = []
+            for row in (0, domain_y - 1):
+                rows = np.full(domain_x, row)
+                hit = (np.asarray(concentration[rows, cols]) == 1) | dedans(cols, rows)
+                # any_hit[c] : une touche en c, c-2, c-4... (même parité, >= 0)
+                any_hit = hit.copy()
+                for parite in (0, 1):
+                    any_hit[parite::2] = np.logical_or.accumulate(hit[parite::2])
+                chemins.append(any_hit)
+            self._chemins = np.stack(chemins)
+
+    def check(self, ids, vivant, x, y, colle, casting=None, casting_ampl=None, casting_dir=None):
+        """
+        Appelé par le moteur à chaque pas, après le déplacement.
+        vivant : sondes qui continuent ; colle : pas consécutifs au bord.
+        Renvoie (colle, coupe), coupe : sondes à arrêter maintenant (motif noté).
+        """
+        coupe = np.zeros(x.shape, dtype=bool)
+        if self.boundary_steps is not None:
+            domain_y, domain_x = self.shape
+            bord = (x == 0) | (x == domain_x - 1) | (y == 0) | (y == domain_y - 1)
+            colle = np.where(bord, colle + 1, 0)
+            coupe |= colle >= self.boundary_steps
+        if self.casting_limit is not None and casting is not None:
+            coupe |= casting & (casting_ampl > self.casting_limit)
+        coupe &= vivant & (self.status[ids] == NONE)   # une seule roulette par sonde
+        if coupe.any():
+            k = np.flatnonzero(coupe)
+            garde = self.rng.random(k.size) < self.keep
+            self.status[ids[k[garde]]] = KEPT
+            self.status[ids[k[~garde]]] = CENSORED
+            coupe[k[garde]] = False
+
+        if casting is not None and self._chemins is not None:
+            # casting saturé : prochaine ligne extrême selon casting_dir, puis
+            # alternance, x décroissant jusqu'à 0 -> chemin déterministe
+            k = np.flatnonzero(casting & (casting_ampl >= self.shape[0] - 1) & vivant & ~coupe)
+            if k.size:
+                xk, r1 = x[k], (casting_dir[k] > 0).astype(np.int64)
+                touche = (self._chemins[r1, np.maximum(xk - 1, 0)] & (xk >= 1)) \
+                    | (self._chemins[1 - r1, np.maximum(xk - 2, 0)] & (xk >= 2)) \
+                    | self._chemins[0, 0] | self._chemins[1, 0]
+                k = k[~touche]
+                self.status[ids[k]] = HOPELESS
+                coupe[k] = True
+        return colle, coupe
+
+    def weights(self):
+        # poids d'estimation de chaque essai du dernier appel au moteur
+        w = np.ones(self.status.size)
+        w[self.status == CENSORED] = 0.0
+        if self.keep > 0:
+            w[self.status == KEPT] = 1 / self.keep
+        return w
+
+
+def survival(found, total_iter, weights=None, status=None, z=1.96):
+    """
+    found, total_iter : sorties du moteur ; weights : Censor.weights()
+    (None : essais non censurés) ; status : Censor.status, pour les comptes.
+    """
+    found = np.asarray(found, dtype=bool)
+    total_iter = np.asarray(total_iter)
+    n = found.size
+    w = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+    status = np.zeros(n, dtype=np.int8) if status is None else np.asarray(status)
+
+    wf = w * found
+    p = float(wf.mean()) if n else np.nan
+    demi = z * math.sqrt(max(float((wf**2).mean()) - p**2, 0.0) / n) if n else np.nan
+    ordre = np.argsort(total_iter[found], kind="stable")
+    t = total_iter[found][ordre]
+    S = 1 - np.cumsum(w[found][ordre]) / n if n else np.zeros(0)
+
+    k, c = int(found.sum()), int((status == CENSORED).sum())
+    return {
+        "n": n,
+        "found": k,
+        "censored": c,
+        "hopeless": int((status == HOPELESS).sum()),
+        "kept": int((status == KEPT).sum()),
+        "success_rate": 100 * p,
+        "success_ci": (100 * max(p - demi, 0.0), 100 * min(p + demi, 1.0)),
+        "success_bounds": (100 * k / n if n else np.nan, 100 * (k + c) / n if n else np.nan),
+        "avg_iter_success": float(np.average(t, weights=w[found][ordre])) if wf.sum() else np.nan,
+        "survival_times": t,
+        "survival": S,
+    }
+
+
+def run_waves(func, concentration, source, start_x, start_y, max_tot_iter=3000,
+              wave_size=1000, max_trials=100000, step_budget=None, target_ci=None,
+              censor=None, rng=None, verbose=False, **params):
+    """
+    Essais par vagues de wave_size sondes avec le moteur batch `func`
+    (batch_simple... ou strategies_api.batch_function(nom)), jusqu'à :
+      - max_trials essais,
+      - step_budget pas simulés au total,
+      - ou une demi-largeur d'IC (en %) du taux de succès <= target_ci.
+    censor : Censor (défaut : critère exact seul). start_y : entier ou (y_min, y_max).
+    wave_size doit rester grand : le coût fixe d'un pas du moteur est partagé
+    entre les sondes encore actives.
+    Renvoie survival(...) + "waves", "steps_used".
+    """
+    rng = as_generator(rng)
+    censor = Censor() if censor is None else censor
+    if not censor.seeded:
+        # roulette reproductible avec rng= : générateur enfant de celui des vagues
+        censor.rng = rng.spawn(1)[0]
+    found, total_iter, poids, status = [], [], [], []
+    stats = survival(np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64))
+    pas = 0
+    vague = 0
+    while True:
+        n = min(wave_size, max_trials - sum(f.size for f in found))
+        if n <= 0:
+            break
+        ys = rng.integers(start_y[0], start_y[1], size=n) if isinstance(start_y, tuple) \
+            else np.full(n, start_y)
+        f, _, it = func(concentration, *source, start_x, ys, max_tot_iter=max_tot_iter,
+                        n_probes=n, rng=rng, censor=censor, **params)
+        found.append(f)
+        total_iter.append(it)
+        poids.append(censor.weights())
+        status.append(censor.status.copy())
+        pas += int(it.sum())
+        vague += 1
+
+        stats = survival(np.concatenate(found), np.concatenate(total_iter),
+                         np.concatenate(poids), np.concatenate(status))
+        demi = (stats["success_ci"][1] - stats["success_ci"][0]) / 2
+        if verbose:
+            print(f"vague {vague} : n={stats['n']} succès {stats['success_rate']:.1f}% ±{demi:.1f} "
+                  f"(censurés {stats['censored']}, sans espoir {stats['hopeless']}), {pas} pas")
+        if target_ci is not None and stats["n"] >= 2 * wave_size and demi <= target_ci:
+            break
+        if step_budget is not None and pas >= step_budget:
+            break
+
+    stats["waves"] = vague
+    stats["steps_used"] = pas
+    return stats
@@ -0,0 +1,96 @@
+import numpy as np
+
+from random_source import as_generator
+
+
+# Plume qui évolue dans le temps : les bouffées partent de la source et
+# dérivent vers +x (sous le vent) de V colonnes par pas.
+#
+# Hypothèse de turbulence figée : chaque cellule reçoit à son émission un
+# tirage uniforme u, puis la colonne entière est transportée telle quelle.
+# La cellule (x, y) est une odeur au pas t si u < p(x, y), p étant la carte
+# de probabilité du champ statique (PlumeFactory.probability) : la loi de
+# chaque instant est celle du champ figé, mais les bouffées sont corrélées
+# d'un pas à l'autre et s'éteignent en avançant quand p décroît.
+#
+# Les colonnes sont rangées dans un tampon circulaire : avancer d'un pas
+# décale l'origine du tampon et ne retire que les V colonnes qui entrent
+# côté source -> O(domain_y * V) par pas, jamais de reconstruction de la grille.
+#
+# meander : écart-type du déplacement latéral de l'axe de la plume par
+# colonne émise (marche aléatoire rappelée vers 0), 0 pour une plume droite.
+
+
+class DynamicPlume:
+
+    def __init__(self, factory, V=1, meander=0.0, rng=None):
+        self.proba = np.asarray(factory.probability(), dtype=np.float32)
+        self.shape = self.proba.shape
+        self.source = factory.source
+        self.V = int(V)
+        if self.V < 1:
+            raise ValueError("V doit être un nombre entier de colonnes par pas >= 1")
+        self.meander = meander
+        self.rng = as_generator(rng)
+        self.reset()
+
+    def reset(self):
+        # état stationnaire : tout le domaine déjà rempli de bouffées, t = 0
+        H, W = self.shape
+        self.t = 0
+        self._origine = 0    # indice physique de la colonne logique x = 0
+        self._axe = 0.0
+        self._u = self.rng.random((H, W), dtype=np.float32)
+        self._decalage = np.zeros(W, dtype=np.int64)
+        if self.meander:
+            for col in range(W - 1, -1, -1):   # la colonne la plus loin a été émise en premier
+                self._decalage[col] = self._emettre_axe()
+
+    def _emettre_axe(self):
+        self._axe = 0.95 * self._axe + self.meander * self.rng.standard_normal()
+        return int(round(self._axe))
+
+    def step(self, n=1):
+        """Avance de n pas : seules les colonnes émises à la source sont tirées."""
+        H, W = self.shape
+        nouvelles = min(n * self.V, W)
+        self._origine = (self._origine - n * self.V) % W
+        # colonnes logiques 0 .. nouvelles-1, de la plus ancienne (x grand) à la plus récente
+        cols = (self._origine + np.arange(nouvelles)) % W
+        self._u[:, cols] = self.rng.random((H, nouvelles), dtype=np.float32)
+        if self.meander:
+            for col in cols[::-1]:
+                self._decalage[col] = self._emettre_axe()
+        self.t += n
+
+    def at(self, t, x, y):
+        """
+        Odeur (1/0) en (x, y) au pas t ; x, y scalaires ou tableaux.
+        Le champ avance jusqu'à t si besoin ; on ne peut pas revenir en arrière.
+        """
+        if t < self.t:
+            raise ValueError(f"pas {t} déjà passé (champ au pas {self.t}), appeler reset()")
+        if t > self.t:
+            self.step(t - self.t)
+        return self[y, x]
+
+    def __getitem__(self, index):
+        # lecture au pas courant, comme un tableau concentration[y, x]
+        y, x = index
+        H, W = self.shape
+        col = (self._origine + np.asarray(x)) % W
+        y_emis = np.asarray(y) - self._decalage[col]
+        dedans = (y_emis >= 0) & (y_emis < H)
+        p = np.where(dedans, self.proba[np.clip(y_emis, 0, H - 1), x], 0)
+        source_x, source_y, a, b = self.source
+        source = (source_x <= x) & (x < source_x + a) & (source_y <= y) & (y < source_y + b)
+        odeur = source | (self._u[y, col] < p)
+        if np.ndim(odeur) == 0:
+            return int(odeur)
+        return odeur.astype(np.uint8)
+
+    def snapshot(self, dtype=np.uint8):
+        # champ dense au pas courant (affichage, archivage)
+        H, W = self.shape
+        ys, xs = np.mgrid[0:H, 0:W]
+        return self[ys, xs].astype(dtype)
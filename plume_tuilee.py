@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from plumes import advection_diffusion_kernel
+from random_source import as_generator
+
+
+# Champ d'advection-diffusion paresseux, par tuiles, pour les très grands
+# domaines (20000 x 10000 et plus). Même champ binaire que
+# PlumeFactory.advection_diffusion (Bernoulli de probabilité c / max c, zone
+# source forcée à 1), ou c / max c >= threshold si un seuil est donné, mais
+# rien n'est calculé à la construction :
+#
+#   - une tuile (tile_y, tile_x) est évaluée et binarisée au premier accès,
+#     puis gardée dans un cache LRU d'au plus max_tiles tuiles ;
+#   - son tirage vient d'un générateur propre à la tuile (graine du champ,
+#     indices de la tuile) : une tuile évincée puis relue est identique ;
+#   - une borne analytique du noyau sur chaque tuile (séparable : décroissance
+#     en x, gaussienne en y) repère les tuiles entièrement sous le seuil (ou
+#     sous cutoff en mode Bernoulli) : elles valent 0 et ne sont jamais allouées.
+#
+# La normalisation (max du noyau sur les cellules) se fait sur une seule ligne
+# du domaine. Mémoire et temps de mise en place suivent donc la surface
+# visitée par les sondes, pas celle du domaine.
+#
+# Interface des champs creux (sparse_field) : .shape et field[y, x], scalaires
+# ou tableaux d'indices, valeur 1 sur une cellule d'odeur. Utilisable par le
+# moteur batch et le pilote pas à pas (pas par les noyaux JIT, qui veulent un
+# tableau dense).
+
+
+class TiledPlume:
+
+    def __init__(self, domain, source, V=2.0, D=1.0, tau=10, center=None, gauss=2.0,
+                 threshold=None, cutoff=1e-12, tile=256, max_tiles=256, rng=None):
+        self.domain_x, self.domain_y = domain
+        self.shape = (self.domain_y, self.domain_x)
+        self.source = source
+        self.params = (V, D, tau, gauss)
+        source_x, source_y, a, b = source
+        self.x0, self.y0 = (source_x, source_y) if center is None else center
+        self.threshold = threshold
+        self.tile = tile
+        self.max_tiles = max_tiles
+        self.seed = int(as_generator(rng).integers(2**63))
+
+        # max du noyau : à chaque x, atteint sur la ligne la plus proche de y0
+        y_max = min(max(round(self.y0), 0), self.domain_y - 1)
+        self.norme = advection_diffusion_kernel(np.arange(self.domain_x) - self.x0,
+                                                y_max - self.y0, *self.params).max()
+
+        self.n_tiles = (-(-self.domain_y // tile), -(-self.domain_x // tile))
+        self.empty = self._tuiles_vides(threshold if threshold is not None else cutoff)
+        self._cache = OrderedDict()
+        self.built = self.hits = 0
+
+    def _tuiles_vides(self, seuil):
+        # borne supérieure de c / max c sur chaque tuile
+        V, D, tau, gauss = self.params
+        ny, nx = self.n_tiles
+        x_lo = np.arange(nx) * self.tile
+        x_hi = np.minimum(x_lo + self.tile, self.domain_x) - 1
+        y_lo = np.arange(ny)[:, None] * self.tile
+        y_hi = np.minimum(y_lo + self.tile, self.domain_y) - 1
+
+        premier = np.maximum(x_lo, np.floor(self.x0) + 1)        # première cellule en aval
+        aval = premier <= x_hi
+        xd_min = np.where(aval, premier - self.x0, 1.0)
+        xd_max = np.where(aval, x_hi - self.x0, 1.0)
+        dy = np.where((y_lo <= self.y0) & (self.y0 <= y_hi), 0.0,
+                      np.minimum(np.abs(y_lo - self.y0), np.abs(y_hi - self.y0)))
+        with np.errstate(under="ignore"):
+            borne = np.exp(-xd_min / (V * tau)) * np.exp(-dy**2 / (gauss * 4 * D * xd_max / V)) / self.norme
+        vide = ~aval | (borne < seuil)
+
+        # les tuiles qui touchent la source ne sont jamais vides
+        source_x, source_y, a, b = self.source
+        touche = (x_lo < source_x + a) & (x_hi >= source_x) & (y_lo < source_y + b) & (y_hi >= source_y)
+        return vide & ~touche
+
+    def _construire(self, ty, tx):
+        t = self.tile
+        xs = np.arange(tx * t, min((tx + 1) * t, self.domain_x))
+        ys = np.arange(ty * t, min((ty + 1) * t, self.domain_y))
+        with np.errstate(under="ignore"):
+            p = advection_diffusion_kernel(xs - self.x0, ys[:, None] - self.y0, *self.params) / self.norme
+        if self.threshold is not None:
+            tuile = (p >= self.threshold).astype(np.uint8)
+        else:
+            rng = np.random.default_rng((self.seed, ty, tx))
+            tuile = (rng.random(p.shape) < p).astype(np.uint8)
+
+        source_x, source_y, a, b = self.source
+        tuile[max(source_y - ys[0], 0):max(source_y + b - ys[0], 0),
+              max(source_x - xs[0], 0):max(source_x + a - xs[0], 0)] = 1
+        self.built += 1
+        return tuile
+
+    def tile_at(self, ty, tx):
+        """Tuile (ty, tx) binarisée, ou None si elle est vide."""
+        if self.empty[ty, tx]:
+            return None
+        cle = (ty, tx)
+        tuile = self._cache.get(cle)
+        if tuile is not None:
+            self._cache.move_to_end(cle)
+            self.hits += 1
+            return tuile
+        tuile = self._construire(ty, tx)
+        self._cache[cle] = tuile
+        while len(self._cache) > self.max_tiles:
+            self._cache.popitem(last=False)
+        return tuile
+
+    def __getitem__(self, index):
+        y, x = index
+        t = self.tile
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            tuile = self.tile_at(y // t, x // t)
+            return 0 if tuile is None else int(tuile[y % t, x % t])
+
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=np.int64), np.asarray(y, dtype=np.int64))
+        out = np.zeros(x.shape, dtype=np.uint8)
+        ty, tx = y // t, x // t
+        pleines = np.flatnonzero(~self.empty[ty, tx].ravel())
+        if pleines.size == 0:
+            return out
+        # regroupement des points par tuile
+        cles = (ty.ravel() * self.n_tiles[1] + tx.ravel())[pleines]
+        ordre = np.argsort(cles, kind="stable")
+        cles, pleines = cles[ordre], pleines[ordre]
+        debuts = np.flatnonzero(np.r_[True, cles[1:] != cles[:-1]])
+        fins = np.r_[debuts[1:], cles.size]
+        xf, yf, plat = x.ravel(), y.ravel(), out.reshape(-1)
+        for d, f in zip(debuts.tolist(), fins.tolist()):
+            k = pleines[d:f]
+            tuile = self.tile_at(*divmod(int(cles[d]), self.n_tiles[1]))
+            plat[k] = tuile[yf[k] % t, xf[k] % t]
+        return out
+
+    @property
+    def nbytes(self):
+        # mémoire des tuiles en cache
+        return sum(tuile.nbytes for tuile in self._cache.values())
+
+    def stats(self):
+        return {
+            "tiles": int(self.n_tiles[0] * self.n_tiles[1]),
+            "empty_tiles": int(self.empty.sum()),
+            "cached_tiles": len(self._cache),
+            "built": self.built,
+            "hits": self.hits,
+            "cache_bytes": self.nbytes,
+        }
+
+    def to_dense(self):
+        # champ complet (petits domaines : vérification, affichage)
+        ys, xs = np.mgrid[0:self.domain_y, 0:self.domain_x]
+        return self[ys, xs]
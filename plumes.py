@@ -0,0 +1,182 @@
+import numpy as np
+
+from random_source import as_generator
+
+
+def advection_diffusion_kernel(xdist, ydist, V=2.0, D=1.0, tau=10, gauss=2.0):
+    """
+    Intensité non normalisée exp(-xdist/(V*tau)) * exp(-ydist**2 / (gauss*spread)),
+    spread = 4*D*xdist/V, nulle en amont de l'origine (xdist <= 0).
+    xdist, ydist : distances à l'origine, entières ou réelles, diffusées ensemble.
+    """
+    xdist, ydist = np.broadcast_arrays(np.asarray(xdist, dtype=float), np.asarray(ydist, dtype=float))
+    spread = 4 * D * xdist / V
+    in_field = spread > 0
+    c = np.zeros(xdist.shape)
+    c[in_field] = (np.exp(-xdist[in_field] / (V * tau))
+                   * np.exp(-ydist[in_field]**2 / (gauss * spread[in_field])))
+    return c
+
+
+class PlumeFactory:
+    """
+    Fabrique de champs de concentration binaires pour un jeu de paramètres.
+    La partie déterministe (carte de probabilité, ou lambda/bande de Poisson
+    par colonne) est calculée une seule fois ; seuls les tirages changent
+    d'un essai à l'autre.
+
+    generate(n) renvoie une pile (n, domain_y, domain_x) de champs, compactée
+    par défaut avec np.packbits le long de x (8 cellules par octet).
+
+    spec : paramètres du générateur (dict JSON), pour les archives et caches.
+    """
+
+    def __init__(self, domain, source, proba=None, poisson=None, spec=None):
+        self.domain_x, self.domain_y = domain
+        self.source = source
+        self.proba = proba        # carte (domain_y, domain_x) pour un tirage de Bernoulli
+        self.poisson = poisson    # (xs, lambda_x, y_min, y_max) pour le drapeau de Poisson
+        self.spec = spec
+
+    @classmethod
+    def advection_diffusion(cls, domain, source, V=2.0, D=1.0, tau=10,
+                            center=None, gauss=2.0):
+        """
+        Champ infotaxis : c = exp(-xdist/(V*tau)) * exp(-ydist**2 / (gauss*spread)),
+        spread = 4*D*xdist/V, normalisé en probabilité par c.max().
+        center = (x0, y0) origine de la plume (par défaut (source_x, source_y)).
+        """
+        domain_x, domain_y = domain
+        source_x, source_y, a, b = source
+        x0, y0 = (source_x, source_y) if center is None else center
+
+        # profil séparable : une ligne en x, une colonne en y, pas de meshgrid
+        xdist = np.arange(domain_x) - x0
+        ydist = np.arange(domain_y)[:, None] - y0
+        c = advection_diffusion_kernel(xdist, ydist, V, D, tau, gauss)
+        spec = {"kind": "advection_diffusion", "domain": list(domain), "source": list(source),
+                "V": V, "D": D, "tau": tau, "center": None if center is None else list(center),
+                "gauss": gauss}
+        return cls(domain, source, proba=c / c.max(), spec=spec)
+
+    @classmethod
+    def poisson_flag(cls, domain, source, base_lambda=8, k_decay=0.03, s_spread=0.4):
+        domain_x, domain_y = domain
+        source_x, source_y, a, b = source
+
+        xs = np.arange(source_x + a, domain_x)
+        dist = xs - (source_x + a)
+        lambda_x = base_lambda * np.exp(-k_decay * dist)
+        spread = (b/2 + dist*s_spread).astype(int)
+        y_center = source_y + b//2
+        y_min = np.maximum(0, y_center - spread)
+        y_max = np.minimum(domain_y, y_center + spread)
+        lambda_x[y_max <= y_min] = 0  # bande vide : aucune particule possible
+        spec = {"kind": "poisson_flag", "domain": list(domain), "source": list(source),
+                "base_lambda": base_lambda, "k_decay": k_decay, "s_spread": s_spread}
+        return cls(domain, source, poisson=(xs, lambda_x, y_min, y_max), spec=spec)
+
+    def probability(self):
+        """
+        Carte (domain_y, domain_x) de la probabilité qu'une cellule soit une
+        odeur (hors zone source). Pour le drapeau de Poisson : lambda_x
+        particules uniformes sur une bande de largeur w -> 1 - exp(-lambda_x / w).
+        """
+        if self.proba is not None:
+            return self.proba
+        xs, lambda_x, y_min, y_max = self.poisson
+        p = np.zeros((self.domain_y, self.domain_x))
+        largeur = np.maximum(y_max - y_min, 1)
+        ys = np.arange(self.domain_y)[:, None]
+        bande = (ys >= y_min) & (ys < y_max)
+        p[:, xs] = np.where(bande, 1 - np.exp(-lambda_x / largeur), 0)
+        return p
+
+    def _tirer(self, fields, rng):
+        # remplit fields (k, domain_y, domain_x), déjà à zéro
+        k = fields.shape[0]
+        if self.proba is not None:
+            fields[...] = rng.random(fields.shape) < self.proba
+        else:
+            xs, lambda_x, y_min, y_max = self.poisson
+            n_particles = rng.poisson(lambda_x, size=(k, xs.size)).ravel()
+            essai = np.repeat(np.repeat(np.arange(k), xs.size), n_particles)
+            x_pts = np.repeat(np.tile(xs, k), n_particles)
+            y_pts = rng.integers(np.repeat(np.tile(y_min, k), n_particles),
+                                 np.repeat(np.tile(y_max, k), n_particles))
+            fields[essai, y_pts, x_pts] = 1
+
+        # zone source forcée à 1
+        source_x, source_y, a, b = self.source
+        fields[:, source_y:source_y+b, source_x:source_x+a] = 1
+
+    def single(self, rng=None, dtype=np.uint8):
+        field = np.zeros((1, self.domain_y, self.domain_x), dtype=dtype)
+        self._tirer(field, as_generator(rng))
+        return field[0]
+
+    def generate(self, n, rng=None, packed=True, chunk=1024):
+        rng = as_generator(rng)
+        width = (self.domain_x + 7) // 8 if packed else self.domain_x
+        out = np.empty((n, self.domain_y, width), dtype=np.uint8)
+
+        # par paquets pour borner la mémoire du tirage non compacté
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            fields = np.zeros((stop - start, self.domain_y, self.domain_x), dtype=np.uint8)
+            self._tirer(fields, rng)
+            out[start:stop] = np.packbits(fields, axis=-1) if packed else fields
+        return out
+
+
+class MultiPlumeFactory(PlumeFactory):
+    """
+    Superposition de plusieurs plumes sur un même domaine, une fabrique par
+    source : une cellule est une odeur si l'une des plumes l'est (tirages
+    indépendants, chaque zone source forcée à 1). single / generate comme
+    PlumeFactory ; sources : rectangles de chaque plume, dans l'ordre.
+    """
+
+    def __init__(self, factories):
+        self.factories = list(factories)
+        if not self.factories:
+            raise ValueError("au moins une plume")
+        domains = {(f.domain_x, f.domain_y) for f in self.factories}
+        if len(domains) > 1:
+            raise ValueError(f"plumes sur des domaines différents : {sorted(domains)}")
+        self.domain_x, self.domain_y = domains.pop()
+        self.sources = [f.source for f in self.factories]
+        self.spec = {"kind": "multi", "plumes": [f.spec for f in self.factories]}
+
+    def probability(self):
+        absent = np.ones((self.domain_y, self.domain_x))
+        for f in self.factories:
+            absent *= 1 - f.probability()
+        return 1 - absent
+
+    def _tirer(self, fields, rng):
+        plume = np.empty_like(fields)
+        for f in self.factories:
+            plume[...] = 0
+            f._tirer(plume, rng)
+            fields |= plume
+
+
+def unpack_fields(packed, domain_x):
+    # inverse de PlumeFactory.generate(packed=True), sur un champ ou une pile
+    return np.unpackbits(packed, axis=-1, count=domain_x)
+
+
+def generate_poisson_plume(domain, source, base_lambda=8, k_decay=0.03, s_spread=0.4,
+                           rng=None, dtype=np.uint8):
+    """
+    Champ de concentration binaire en "drapeau" de Poisson.
+    domain = (domain_x, domain_y), source = (source_x, source_y, a, b)
+
+    Source rectangulaire pleine, puis pour chaque colonne x à droite de la source
+    un nombre de particules ~ Poisson(base_lambda * exp(-k_decay * dist)) tirées
+    uniformément dans une bande verticale qui s'élargit de s_spread par colonne.
+    Tous les tirages sont faits en un seul appel, puis posés par indexation.
+    """
+    factory = PlumeFactory.poisson_flag(domain, source, base_lambda, k_decay, s_spread)
+    return factory.single(rng, dtype)
@@ -0,0 +1,54 @@
+import numpy as np
+
+
+# Source d'aléa des stratégies : au lieu d'appeler np.random.choice à chaque pas
+# (tableau temporaire + RNG global), on tire les pas par gros blocs avec un
+# np.random.Generator et on les distribue un par un sous forme d'entiers Python.
+# Le bloc suivant n'est tiré que lorsque le précédent est épuisé.
+
+
+class RandomSource:
+
+    def __init__(self, seed=None, block_size=4096):
+        # seed : None (entropie système), entier, SeedSequence ou Generator
+        if isinstance(seed, np.random.Generator):
+            self.generator = seed
+        else:
+            self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._flux = {}
+
+    def flux(self, values):
+        """
+        Itérateur infini de tirages uniformes dans `values`.
+        Un même jeu de valeurs partage le même flux (et son bloc en cours).
+        ex : pas = rng.flux((-1, 0, 1)) ; x += next(pas)
+        """
+        values = tuple(values)
+        tirages = self._flux.get(values)
+        if tirages is None:
+            tirages = self._flux[values] = self._tirages(values)
+        return tirages
+
+    def _tirages(self, values):
+        table = np.asarray(values)
+        while True:
+            yield from table[self.generator.integers(0, len(table), self.block_size)].tolist()
+
+    def spawn(self, n):
+        # n sources indépendantes (une par essai), sans toucher à l'état global
+        return [RandomSource(g, self.block_size) for g in self.generator.spawn(n)]
+
+
+def as_random_source(rng=None):
+    if isinstance(rng, RandomSource):
+        return rng
+    return RandomSource(rng)
+
+
+def as_generator(rng=None):
+    if isinstance(rng, RandomSource):
+        return rng.generator
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
@@ -0,0 +1,177 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+# Stockage des essais en colonnes, en ajout seul :
+#
+#   <path>/manifest.json            liste des shards, catégories, schéma
+#   <path>/shard-000000/<col>.npy   une colonne par fichier .npy
+#   <path>/shard-000000/trajets.npy points (x, y) int16 concaténés (optionnel)
+#
+# Chaque append écrit un nouveau shard puis remplace le manifest de façon
+# atomique : un shard n'est jamais réécrit. Les colonnes sont relues avec
+# np.load(mmap_mode="r") : seules les colonnes demandées sont touchées.
+#
+# Plusieurs écrivains (processus) peuvent ajouter au même dossier : append
+# prend le verrou <path>/manifest.lock (création exclusive), relit le
+# manifest, écrit son shard puis le manifest, et rend le verrou. Un verrou
+# laissé par un processus tué se supprime à la main.
+
+COLUMNS = {
+    "strategy": np.int16,      # indice dans manifest["strategies"]
+    "params": np.int16,        # indice dans manifest["params"] (json)
+    "seed_chunk": np.int32,    # indice du SeedSequence.spawn du paquet d'essais
+    "start_x": np.int32,
+    "start_y": np.int32,
+    "found": np.bool_,
+    "total_iter": np.int32,
+    "traj_offset": np.int64,   # début du trajet dans trajets.npy, -1 si absent
+}
+
+
+LOCK_TIMEOUT = 60.0   # secondes d'attente du verrou avant d'abandonner
+
+
+def _json_defaut(obj):
+    # scalaires et tableaux numpy (params de tune / benchmark) -> JSON natif
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} n'est pas sérialisable en JSON")
+
+
+class ResultStore:
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.manifest_path = os.path.join(path, "manifest.json")
+        self.lock_path = os.path.join(path, "manifest.lock")
+        self._lire_manifest()
+
+    def _lire_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"columns": {k: np.dtype(v).str for k, v in COLUMNS.items()},
+                             "strategies": [], "params": [], "shards": []}
+
+    def _verrouiller(self):
+        debut = time.monotonic()
+        while True:
+            try:
+                os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                if time.monotonic() - debut > LOCK_TIMEOUT:
+                    raise TimeoutError(f"verrou {self.lock_path} tenu depuis plus de "
+                                       f"{LOCK_TIMEOUT:.0f} s (écrivain tué ? supprimer le fichier)")
+                time.sleep(0.01)
+
+    def _code(self, table, value):
+        values = self.manifest[table]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def _ecrire_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1, default=_json_defaut)
+        os.replace(tmp, self.manifest_path)
+
+    def append(self, strategy, params, found, total_iter, start_x, start_y,
+               seed_chunk=-1, trajets=None, meta=None):
+        """
+        Ajoute un paquet d'essais d'une même (strategy, params) dans un nouveau shard.
+        trajets : liste optionnelle de tableaux (k, 2), un par essai.
+        meta    : dict libre conservé dans le manifest (graine racine, champ...).
+        """
+        found = np.asarray(found, dtype=bool)
+        n = found.size
+        parametres = json.dumps(params or {}, sort_keys=True, default=_json_defaut)
+        self._verrouiller()
+        try:
+            # manifest relu sous verrou : shards et codes des autres écrivains
+            self._lire_manifest()
+            self._ajouter(strategy, parametres, found, n, total_iter, start_x, start_y,
+                          seed_chunk, trajets, meta)
+        finally:
+            os.remove(self.lock_path)
+
+    def _ajouter(self, strategy, parametres, found, n, total_iter, start_x, start_y,
+                 seed_chunk, trajets, meta):
+        colonnes = {
+            "strategy": np.full(n, self._code("strategies", strategy)),
+            "params": np.full(n, self._code("params", parametres)),
+            "seed_chunk": np.broadcast_to(seed_chunk, n),
+            "start_x": np.broadcast_to(start_x, n),
+            "start_y": np.broadcast_to(start_y, n),
+            "found": found,
+            "total_iter": np.asarray(total_iter),
+            "traj_offset": np.full(n, -1),
+        }
+
+        name = f"shard-{len(self.manifest['shards']):06d}"
+        dossier = os.path.join(self.path, name)
+        os.makedirs(dossier, exist_ok=True)   # reste d'un append interrompu : écrasé
+        if trajets is not None:
+            longueurs = np.array([len(t) for t in trajets], dtype=np.int64)
+            colonnes["traj_offset"] = np.concatenate(([0], np.cumsum(longueurs)[:-1]))
+            points = np.concatenate([np.asarray(t, dtype=np.int16).reshape(-1, 2) for t in trajets]) \
+                if n else np.zeros((0, 2), dtype=np.int16)
+            np.save(os.path.join(dossier, "trajets.npy"), points)
+        for col, dtype in COLUMNS.items():
+            np.save(os.path.join(dossier, col + ".npy"), np.asarray(colonnes[col], dtype=dtype))
+
+        self.manifest["shards"].append({"name": name, "rows": n,
+                                        "trajets": trajets is not None, "meta": meta or {}})
+        self._ecrire_manifest()
+
+    def iter_shards(self, columns=None):
+        # un dict {colonne: memmap} par shard, sans copie
+        columns = list(COLUMNS) if columns is None else columns
+        for shard in self.manifest["shards"]:
+            dossier = os.path.join(self.path, shard["name"])
+            yield {col: np.load(os.path.join(dossier, col + ".npy"), mmap_mode="r") for col in columns}
+
+    def read(self, columns=None, strategy=None):
+        """
+        Colonnes demandées concaténées sur tous les shards.
+        strategy : nom pour ne garder que les essais de cette stratégie.
+        """
+        columns = list(COLUMNS) if columns is None else list(columns)
+        lues = columns if strategy is None or "strategy" in columns else columns + ["strategy"]
+        morceaux = {col: [] for col in lues}
+        for shard in self.iter_shards(lues):
+            for col in lues:
+                morceaux[col].append(shard[col])
+        out = {col: np.concatenate(m) if m else np.zeros(0, dtype=COLUMNS[col])
+               for col, m in morceaux.items()}
+        if strategy is not None:
+            if strategy not in self.manifest["strategies"]:
+                return {col: out[col][:0] for col in columns}
+            garde = out["strategy"] == self.manifest["strategies"].index(strategy)
+            out = {col: out[col][garde] for col in columns}
+        return out
+
+    def trajet(self, shard_index, row):
+        # trajet (k, 2) d'un essai, lu en mémoire mappée
+        shard = self.manifest["shards"][shard_index]
+        if not shard.get("trajets"):
+            return None
+        dossier = os.path.join(self.path, shard["name"])
+        offsets = np.load(os.path.join(dossier, "traj_offset.npy"), mmap_mode="r")
+        if offsets[row] < 0:
+            return None
+        points = np.load(os.path.join(dossier, "trajets.npy"), mmap_mode="r")
+        fin = offsets[row + 1] if row + 1 < offsets.size else points.shape[0]
+        return points[offsets[row]:fin]
+
+    def strategy_names(self, codes):
+        return np.asarray(self.manifest["strategies"])[codes]
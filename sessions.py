@@ -0,0 +1,742 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from operator import attrgetter
+
+import numpy as np
+
+from random_source import RandomSource, as_generator
+from strategies_api import (CASTING, SEARCH, UPWIND, Jump, Observation, get_boundary,
+                            get_strategy)
+from strategies_batch import _avancer_spirale
+from strategies_jit import M32, _tirage
+from trajectoires import fin_trajet, nouveau_trajet
+
+
+# Serveur de sessions de stratégies, piloté de l'extérieur (asyncio).
+#
+# Dans les simulations, la stratégie lit elle-même le champ. Ici, le
+# contrôleur (la sonde réelle) fait le déplacement et renvoie l'observation ;
+# chaque session répond par le déplacement suivant :
+#
+#   move = await server.step(sid, obs)     # obs : Observation, None au 1er pas
+#   moves = await server.step_many(sids, observations)
+#
+# move = (dx, dy), ou None : session terminée (arrivée dans la source, ou
+# budget max_tot_iter épuisé hors manoeuvre engagée, comme run_strategy).
+# Le retour de spiral au dernier point de détection (Jump) est un déplacement
+# comme les autres pour le contrôleur, mais il n'est pas compté dans le budget
+# et l'observation qui suit est ignorée.
+#
+# Les demandes sont mises en file ; une seule tâche les traite par ticks.
+# Avant un tick, elle attend que toutes les sessions actives aient soumis
+# leur pas (au plus max_batch), ou au plus `gather` secondes : un tick sert
+# ainsi tout un pas de la flotte, pas la poignée de clients déjà revenus.
+# Contre-pression : au-delà de max_pending pas en attente, step() attend
+# qu'un tick libère de la place. step_many (un seul futur pour un paquet de
+# sessions) évite le coût d'une coroutine par sonde.
+#
+# Décisions vectorisées : une session ouverte par nom de stratégie
+# enregistrée (simple, spiral, mosquito) est une ligne des tableaux d'état
+# d'un _Lot, comme une sonde du moteur batch ; un tick décide toutes les
+# sessions d'un lot en quelques opérations NumPy. L'aléa est celui des
+# noyaux strategies_jit (tirage (graine, k), graine = seed) : même suite de
+# déplacements que le noyau de même graine, quel que soit le découpage en
+# ticks (`python -m sessions` le vérifie). Une instance de Strategy, une
+# stratégie sans lot ou rng=RandomSource(...) passent par strategy.step,
+# comme run_strategy(..., fast_forward=False).
+#
+# Protocole par messages JSON (handle), le même pour un transport websocket ou
+# HTTP ; LocalClient le rejoue dans le processus (tests, démonstrations) :
+#   {"op": "open", "strategy": "mosquito", "x": 69, "y": 22, "seed": 1, "params": {}}
+#   {"op": "step", "session": 0, "obs": [x, y, odor, in_source]}  (obs null au 1er pas)
+#   {"op": "step_many", "sessions": [...], "obs": [...]}
+#   {"op": "close", "session": 0}, {"op": "stats"}
+
+
+class Session:
+    __slots__ = ("id", "name", "strategy", "lot", "slot", "_steps", "max_tot_iter",
+                 "pending", "done", "found")
+
+    def __init__(self, sid, name, max_tot_iter, strategy=None, lot=None, slot=None):
+        self.id = sid
+        self.name = name
+        self.strategy = strategy    # instance pas à pas, ou None (ligne `slot` du lot)
+        self.lot = lot
+        self.slot = slot
+        self._steps = 0
+        self.max_tot_iter = max_tot_iter
+        self.pending = False
+        self.done = False
+        self.found = False
+
+    @property
+    def steps(self):
+        return self._steps if self.lot is None else int(self.lot.steps[self.slot])
+
+    def summary(self):
+        return {"session": self.id, "strategy": self.name, "steps": self.steps,
+                "done": self.done, "found": self.found}
+
+
+# --- décisions vectorisées ---------------------------------------------------
+
+_SANS_BUDGET = np.iinfo(np.int64).max
+_SANS_OBS = (0, 0, 0, 0)                     # premier pas : pas d'observation
+_MOSQUITO_DX = np.array([-1, 0, 0, 1])       # r & 3 des noyaux JIT
+_SPIRALE_DX = np.array([1, 0, -1, 0])        # droite, haut, gauche, bas
+_SPIRALE_DY = np.array([0, 1, 0, -1])
+
+
+def _uniforme(graine, k, n):
+    # tirage k de chaque session, dans [0, n) (comme tirage(graine, k) % n)
+    return (_tirage(graine, k) % n).astype(np.int64)
+
+
+class _Lot:
+    """
+    Sessions d'une même stratégie : une ligne par session dans des tableaux
+    d'état (ETAT, plus graine, k, steps, budget, fini), lignes réutilisées
+    après close. _pas est Strategy.step de strategies_api, vectorisé.
+    """
+    ETAT = {}
+
+    def __init__(self):
+        etat = dict(self.ETAT, graine=np.uint64, k=np.uint64, steps=np.int64,
+                    budget=np.int64, fini=bool)
+        self._types = etat
+        for nom, dtype in etat.items():
+            setattr(self, nom, np.zeros(0, dtype=dtype))
+        self._libres = []
+
+    def ouvrir(self, x, y, in_source, graine, budget, **params):
+        if not self._libres:
+            n = self.fini.size
+            for nom, dtype in self._types.items():
+                tableau = np.zeros(max(2 * n, 64), dtype=dtype)
+                tableau[:n] = getattr(self, nom)
+                setattr(self, nom, tableau)
+            self._libres = list(range(max(2 * n, 64) - 1, n - 1, -1))
+        slot = self._libres.pop()
+        self.graine[slot] = graine
+        self.k[slot] = 0
+        self.steps[slot] = 0
+        self.budget[slot] = _SANS_BUDGET if budget is None else budget
+        self.fini[slot] = False
+        self._initialiser(slot, x, y, in_source, **params)
+        return slot
+
+    def fermer(self, slot):
+        self._libres.append(slot)
+
+    def decider(self, slots, obs, vue):
+        """
+        slots : lignes des sessions ; obs (m, 4) int : x, y, odor, in_source ;
+        vue : observation présente (False au premier pas).
+        Renvoie dx, dy, stop (session terminée), found.
+        """
+        fini = self.fini[slots]
+        src = vue & (obs[:, 3] != 0)
+        dx, dy, stop, engaged, saut = self._pas(slots, obs[:, 0], obs[:, 1],
+                                                vue & (obs[:, 2] != 0), src, vue)
+        found = stop & src
+        # budget épuisé hors manoeuvre engagée : échec (comme run_strategy)
+        stop |= ~engaged & (self.steps[slots] >= self.budget[slots])
+        stop |= fini
+        found &= ~fini
+        # saut : déplacements Jump (retours de spiral), hors budget
+        self.steps[slots] += ~stop if saut is None else ~stop & ~saut
+        self.fini[slots] = stop
+        return dx, dy, stop, found
+
+    def _initialiser(self, slot, x, y, in_source, **params):
+        raise NotImplementedError
+
+    def _pas(self, s, x, y, odor, src, vue):
+        # -> dx, dy, stop, engaged, saut (Jump non compté, None si aucun)
+        raise NotImplementedError
+
+
+class _LotSimple(_Lot):
+    ETAT = {"saut": np.int64, "marche": bool, "arret": bool, "x0": np.int64, "d": np.int64}
+
+    def _initialiser(self, slot, x, y, in_source, d=4):
+        self.saut[slot] = 0
+        self.marche[slot] = False
+        self.arret[slot] = in_source
+        self.x0[slot] = x
+        self.d[slot] = d
+
+    def _pas(self, s, x, y, odor, src, vue):
+        marche, d = self.marche[s], self.d[s]
+        # la source n'est testée qu'après la remontée
+        leve = marche & odor & (d > 0)
+        saut = np.where(leve, d, self.saut[s])
+        stop = ~leve & src
+        saute = ~stop & (saut > 0)
+        stop |= ~saute & (self.arret[s] | (np.where(vue, x, self.x0[s]) <= 0))
+        marche_pas = ~stop & ~saute
+        graine, k = self.graine[s], self.k[s]
+        dx = np.where(saute, -1, _uniforme(graine, k, 3) - 1)
+        dy = np.where(saute, 0, _uniforme(graine, k + 1, 3) - 1)
+        self.k[s] = k + marche_pas * np.uint64(2)
+        self.saut[s] = saut - saute
+        self.marche[s] = marche_pas
+        return dx, dy, stop, saute, None
+
+
+class _LotSpiral(_Lot):
+    ETAT = {"upwind": bool, "last_x": np.int64, "last_y": np.int64, "since": np.int64,
+            "dir_index": np.int64, "step_length": np.int64, "steps_done": np.int64,
+            "segments_done": np.int64, "T_loss": np.int64, "retour": bool}
+
+    def _initialiser(self, slot, x, y, in_source, T_loss=10):
+        self.upwind[slot] = self.retour[slot] = False
+        self.last_x[slot], self.last_y[slot] = x, y
+        self.since[slot] = 0
+        self.dir_index[slot] = self.steps_done[slot] = self.segments_done[slot] = 0
+        self.step_length[slot] = 1
+        self.T_loss[slot] = T_loss
+
+    def _pas(self, s, x, y, odor, src, vue):
+        # observation au point de retour : ignorée, comme Spiral.step
+        vue = vue & ~self.retour[s]
+        odor, src = odor & vue, src & vue
+        stop = src
+        upwind = self.upwind[s]
+        detecte = ~stop & odor
+        perdu = ~stop & vue & ~odor & upwind
+        since = np.where(detecte, 0, self.since[s] + perdu)
+        # plume perdue depuis T_loss pas : retour (Jump) au point de détection,
+        # puis nouvelle spirale depuis ce point au pas suivant
+        reset = perdu & (since >= self.T_loss[s])
+        last_x = np.where(detecte, x, self.last_x[s])
+        last_y = np.where(detecte, y, self.last_y[s])
+        upwind = (upwind | detecte) & ~reset
+        dir_index = np.where(reset, 0, self.dir_index[s])
+        step_length = np.where(reset, 1, self.step_length[s])
+        steps_done = np.where(reset, 0, self.steps_done[s])
+        segments_done = np.where(reset, 0, self.segments_done[s])
+
+        graine, k = self.graine[s], self.k[s]
+        dx = np.where(reset, last_x - x, np.where(upwind, -1, _SPIRALE_DX[dir_index]))
+        dy = np.where(reset, last_y - y,
+                      np.where(upwind, _uniforme(graine, k, 3) - 1, _SPIRALE_DY[dir_index]))
+        self.k[s] = k + (~stop & upwind)
+
+        _avancer_spirale(~stop & ~upwind & ~reset, dir_index, step_length, steps_done,
+                         segments_done)
+
+        self.upwind[s], self.since[s] = upwind, since
+        self.last_x[s], self.last_y[s] = last_x, last_y
+        self.dir_index[s], self.step_length[s] = dir_index, step_length
+        self.steps_done[s], self.segments_done[s] = steps_done, segments_done
+        self.retour[s] = reset
+        return dx, dy, stop, reset, reset
+
+
+class _LotMosquito(_Lot):
+    ETAT = {"mode": np.int8, "casting_ampl": np.int64, "casting_dir": np.int64}
+
+    def _initialiser(self, slot, x, y, in_source):
+        self.mode[slot] = SEARCH
+        self.casting_ampl[slot] = self.casting_dir[slot] = 1
+
+    def _pas(self, s, x, y, odor, src, vue):
+        stop = src
+        mode, ampl, sens = self.mode[s], self.casting_ampl[s], self.casting_dir[s]
+        perd = ~stop & vue & ~odor & (mode == UPWIND)
+        ampl = np.where(perd, 1, ampl + (~stop & vue & ~odor & (mode == CASTING)))
+        sens = np.where(perd, 1, sens)
+        mode = np.where(~stop & odor, UPWIND, np.where(perd, CASTING, mode)).astype(np.int8)
+
+        search = ~stop & (mode == SEARCH)
+        casting = ~stop & (mode == CASTING)
+        graine, k = self.graine[s], self.k[s]
+        dx = np.where(search, _MOSQUITO_DX[_uniforme(graine, k, 4)], -1)
+        dy = np.where(search, _uniforme(graine, k + 1, 3) - 1,
+                      np.where(casting, sens * ampl, _uniforme(graine, k, 3) - 1))
+        self.k[s] = k + (np.where(search, 2, np.where(casting, 0, 1)) * ~stop).astype(np.uint64)
+        self.mode[s], self.casting_ampl[s] = mode, ampl
+        self.casting_dir[s] = np.where(casting, -sens, sens)
+        return dx, dy, stop, np.zeros(s.size, dtype=bool), None
+
+
+LOTS = {"simple": _LotSimple, "spiral": _LotSpiral, "mosquito": _LotMosquito}
+
+
+class SessionServer:
+    """
+    max_pending : pas en attente au-delà desquels step() attend (contre-pression)
+    max_batch   : pas décidés au plus par tick (None : toute la file)
+    gather      : attente maximale (s) des pas des autres sessions actives
+                  avant un tick (0 : tick dès qu'un pas est en file)
+    block_size  : taille des blocs de tirages des sessions pas à pas
+                  (RandomSource) ; petite, la mémoire par session reste faible
+    """
+
+    def __init__(self, max_pending=100000, max_batch=None, max_tot_iter=None, gather=0.002,
+                 block_size=64):
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_tot_iter = max_tot_iter
+        self.gather = gather
+        self.block_size = block_size
+        self.sessions = {}
+        self.lots = {}                  # nom -> _Lot
+        self._ids = itertools.count()
+        self._file = deque()            # (sessions, observations, futur, seul)
+        self._en_attente = 0
+        self._actives = 0               # sessions ouvertes non terminées
+        self._reveil = None
+        self._plein = None
+        self._places = None
+        self._tache = None
+        self.ticks = self.steps = self.max_queue = 0
+        self.busy = 0.0
+
+    # --- cycle de vie ------------------------------------------------------
+
+    async def start(self):
+        self._reveil = asyncio.Event()
+        self._plein = asyncio.Event()
+        self._places = asyncio.Event()
+        self._places.set()
+        self._tache = asyncio.get_running_loop().create_task(self._tourner())
+
+    async def stop(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+            self._tache = None
+        while self._file:
+            sessions, _, futur, _ = self._file.popleft()
+            for session in sessions:
+                session.pending = False
+            if not futur.done():
+                futur.set_exception(RuntimeError("serveur arrêté"))
+        self._en_attente = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # --- sessions ----------------------------------------------------------
+
+    def open(self, strategy, x, y, in_source=False, rng=None, max_tot_iter=None, **params):
+        """
+        Nouvelle session depuis la position (x, y). strategy : nom enregistré
+        (ligne d'un lot vectorisé, ou instance neuve par session) ou instance
+        de Strategy non partagée. rng : graine entière (tirages des noyaux
+        JIT), None, ou RandomSource (pas à pas).
+        """
+        budget = self.max_tot_iter if max_tot_iter is None else max_tot_iter
+        sid = next(self._ids)
+        if isinstance(strategy, str) and strategy in LOTS and not isinstance(rng, RandomSource):
+            get_strategy(strategy, **params)        # nom et paramètres vérifiés
+            if strategy not in self.lots:
+                self.lots[strategy] = LOTS[strategy]()
+            lot = self.lots[strategy]
+            if isinstance(rng, (int, np.integer)):
+                graine = int(rng) & M32             # comme strategies_jit
+            else:
+                graine = int(as_generator(rng).integers(2**32))
+            slot = lot.ouvrir(x, y, in_source, graine, budget, **params)
+            session = Session(sid, strategy, budget, lot=lot, slot=slot)
+        else:
+            strategy = get_strategy(strategy, **params)
+            if not isinstance(rng, RandomSource):
+                rng = RandomSource(rng, self.block_size)
+            strategy.reset(Observation(x, y, None, in_source), rng)
+            session = Session(sid, strategy.name, budget, strategy=strategy)
+        self.sessions[sid] = session
+        self._actives += 1
+        return sid
+
+    def close(self, sid):
+        session = self._session(sid)
+        if session.pending:
+            raise RuntimeError(f"session {sid} : un pas est encore en attente")
+        del self.sessions[sid]
+        if not session.done:
+            self._actives -= 1
+        resume = session.summary()
+        if session.lot is not None:
+            session.lot.fermer(session.slot)
+        return resume
+
+    def _session(self, sid):
+        try:
+            return self.sessions[sid]
+        except KeyError:
+            raise ValueError(f"session inconnue {sid!r}") from None
+
+    # --- pas ---------------------------------------------------------------
+
+    async def step(self, sid, obs=None):
+        return await self._soumettre([self._session(sid)], [obs], True)
+
+    async def step_many(self, sids, observations):
+        if len(sids) != len(observations):
+            raise ValueError("sids et observations doivent avoir la même longueur")
+        try:
+            sessions = [self.sessions[sid] for sid in sids]
+        except KeyError as erreur:
+            raise ValueError(f"session inconnue {erreur.args[0]!r}") from None
+        return await self._soumettre(sessions, list(observations), False)
+
+    async def _soumettre(self, sessions, observations, seul):
+        if self._tache is None:
+            raise RuntimeError("serveur non démarré (start() ou async with)")
+        for session in sessions:
+            if session.pending:
+                raise RuntimeError(f"session {session.id} : un pas est déjà en attente")
+        while self._en_attente >= self.max_pending:
+            self._places.clear()
+            await self._places.wait()
+        for session in sessions:
+            session.pending = True
+        futur = asyncio.get_running_loop().create_future()
+        self._file.append((sessions, observations, futur, seul))
+        self._en_attente += len(sessions)
+        self.max_queue = max(self.max_queue, self._en_attente)
+        self._reveil.set()
+        if self._en_attente >= self._cible():
+            self._plein.set()
+        return await futur
+
+    def _cible(self):
+        # pas attendus avant un tick : un par session active, au plus max_batch
+        cible = min(self._actives, self.max_pending)
+        return cible if self.max_batch is None else min(cible, self.max_batch)
+
+    async def _tourner(self):
+        while True:
+            if not self._file:
+                self._reveil.clear()
+                await self._reveil.wait()
+            if self.gather and self._en_attente < self._cible():
+                # les clients servis au tick précédent n'ont pas tous resoumis
+                self._plein.clear()
+                try:
+                    await asyncio.wait_for(self._plein.wait(), self.gather)
+                except asyncio.TimeoutError:
+                    pass
+            self._tick()
+            await asyncio.sleep(0)
+
+    def _tick(self):
+        t = time.perf_counter()
+        demandes = []
+        n = 0
+        while self._file and (self.max_batch is None or n < self.max_batch):
+            demandes.append(self._file.popleft())
+            n += len(demandes[-1][0])
+        try:
+            reponses = self._decider_tout(demandes)
+        except Exception:
+            # observation mal formée, refusée avant toute mise à jour d'état :
+            # demandes une par une, pour n'échouer que la fautive
+            reponses = []
+            for demande in demandes:
+                try:
+                    reponses.append(self._decider_tout([demande])[0])
+                except Exception as erreur:
+                    for session in demande[0]:
+                        session.pending = False
+                    reponses.append(erreur)
+        for (_, _, futur, seul), moves in zip(demandes, reponses):
+            if futur.done():
+                continue
+            if isinstance(moves, Exception):
+                futur.set_exception(moves)
+            else:
+                futur.set_result(moves[0] if seul else moves)
+        self._en_attente -= n
+        if self._en_attente < self.max_pending:
+            self._places.set()
+        self.ticks += 1
+        self.steps += n
+        self.busy += time.perf_counter() - t
+
+    def _decider_tout(self, demandes):
+        # pas de toutes les demandes du tick : un appel vectorisé par lot,
+        # strategy.step pour les sessions pas à pas
+        sessions = [s for demande in demandes for s in demande[0]]
+        observations = [o for demande in demandes for o in demande[1]]
+        lots = list(map(_LOT_DE, sessions))
+        distincts = set(lots)
+        if len(distincts) == 1:
+            # cas courant (une flotte d'une seule stratégie) : sans regroupement
+            groupes = {lots[0]: range(len(sessions))}
+        else:
+            groupes = {lot: [] for lot in distincts}
+            for i, lot in enumerate(lots):
+                groupes[lot].append(i)
+        pas_a_pas = groupes.pop(None, ())
+        # conversion de toutes les observations avant toute mise à jour d'état
+        entrees = [(lot, idx, _entrees(idx, sessions, observations))
+                   for lot, idx in groupes.items()]
+        moves = [None] * len(sessions)
+        for lot, idx, (slots, obs, vue) in entrees:
+            dx, dy, stop, found = lot.decider(slots, obs, vue)
+            lot_moves = list(zip(dx.tolist(), dy.tolist()))
+            for j in np.flatnonzero(stop).tolist():
+                lot_moves[j] = None
+                session = sessions[idx[j]]
+                if not session.done:
+                    session.done = True
+                    session.found = bool(found[j])
+                    self._actives -= 1
+            if len(idx) == len(sessions):
+                moves = lot_moves
+            else:
+                for i, move in zip(idx, lot_moves):
+                    moves[i] = move
+        erreurs = {}
+        for i in pas_a_pas:
+            try:
+                moves[i] = self._decider(sessions[i], observations[i])
+            except Exception as erreur:
+                erreurs[i] = erreur
+        for session in sessions:
+            session.pending = False
+        # découpage par demande ; une erreur de strategy.step fait échouer sa demande
+        if len(demandes) == 1 and not erreurs:
+            return [moves]
+        reponses, debut = [], 0
+        for demande in demandes:
+            fin = debut + len(demande[0])
+            erreur = next((erreurs[i] for i in range(debut, fin) if i in erreurs), None) \
+                if erreurs else None
+            reponses.append(moves[debut:fin] if erreur is None else erreur)
+            debut = fin
+        return reponses
+
+    def _decider(self, session, obs):
+        if session.done:
+            return None
+        strategy = session.strategy
+        move = strategy.step(obs)
+        if type(move) is Jump:
+            return move    # retour de spiral, hors budget
+        if move is not None and session.max_tot_iter is not None \
+                and session._steps >= session.max_tot_iter and not strategy.engaged:
+            move = None
+            obs = None    # budget épuisé : échec
+        if move is None:
+            session.done = True
+            session.found = obs is not None and bool(obs.in_source)
+            self._actives -= 1
+            return None
+        session._steps += 1
+        return move
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "active": self._actives,
+            "ticks": self.ticks,
+            "steps": self.steps,
+            "mean_batch": self.steps / self.ticks if self.ticks else 0.0,
+            "max_queue": self.max_queue,
+            "pending": self._en_attente,
+            "busy_per_step": self.busy / self.steps if self.steps else 0.0,
+        }
+
+    # --- protocole par messages --------------------------------------------
+
+    async def handle(self, message):
+        """Message JSON décodé (dict) -> réponse (dict), {"error": ...} en cas d'échec."""
+        try:
+            op = message["op"]
+            if op == "open":
+                sid = self.open(message["strategy"], message["x"], message["y"],
+                                in_source=message.get("in_source", False), rng=message.get("seed"),
+                                max_tot_iter=message.get("max_tot_iter"), **message.get("params", {}))
+                return {"session": sid}
+            if op == "step":
+                sid = message["session"]
+                move = await self.step(sid, _observation(message.get("obs")))
+                return _reponse(move, self.sessions[sid])
+            if op == "step_many":
+                sids = message["sessions"]
+                moves = await self.step_many(sids, [_observation(o) for o in message["obs"]])
+                return {"moves": [_reponse(m, self.sessions[sid]) for m, sid in zip(moves, sids)]}
+            if op == "close":
+                return self.close(message["session"])
+            if op == "stats":
+                return self.stats()
+            raise ValueError(f"opération inconnue {op!r}")
+        except (KeyError, TypeError, ValueError, RuntimeError) as erreur:
+            return {"error": f"{type(erreur).__name__}: {erreur}"}
+
+
+_LOT_DE = attrgetter("lot")
+_SLOT_DE = attrgetter("slot")
+
+
+def _entrees(idx, sessions, observations):
+    # (slots, obs (m, 4) x/y/odor/in_source, observation présente) d'un lot
+    m = len(idx)
+    if m == len(sessions):
+        choisies, obs = sessions, observations
+    else:
+        choisies = [sessions[i] for i in idx]
+        obs = [observations[i] for i in idx]
+    slots = np.fromiter(map(_SLOT_DE, choisies), dtype=np.int64, count=m)
+    if None in obs:
+        vue = np.fromiter((o is not None for o in obs), dtype=bool, count=m)
+        obs = [_SANS_OBS if o is None else o for o in obs]
+    else:
+        vue = np.ones(m, dtype=bool)
+    return slots, np.array(obs, dtype=np.int64).reshape(m, 4), vue
+
+
+def _observation(obs):
+    return None if obs is None else Observation(int(obs[0]), int(obs[1]), bool(obs[2]), bool(obs[3]))
+
+
+def _reponse(move, session):
+    if move is None:
+        return {"move": None, "found": session.found, "steps": session.steps}
+    return {"move": [int(move[0]), int(move[1])]}
+
+
+class LocalClient:
+    """
+    Client dans le processus : mêmes messages qu'un transport réseau, passés
+    par json (ce qui passe ici passe sur le fil), sans socket.
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    async def request(self, message):
+        reponse = await self.server.handle(json.loads(json.dumps(message)))
+        reponse = json.loads(json.dumps(reponse))
+        if "error" in reponse:
+            raise RuntimeError(reponse["error"])
+        return reponse
+
+    async def open(self, strategy, x, y, in_source=False, seed=None, max_tot_iter=None, **params):
+        reponse = await self.request({"op": "open", "strategy": strategy, "x": x, "y": y,
+                                      "in_source": in_source, "seed": seed,
+                                      "max_tot_iter": max_tot_iter, "params": params})
+        return reponse["session"]
+
+    async def step(self, sid, obs=None):
+        return await self.request({"op": "step", "session": sid,
+                                   "obs": None if obs is None else list(obs)})
+
+    async def step_many(self, sids, observations):
+        reponse = await self.request({"op": "step_many", "sessions": list(sids),
+                                      "obs": [None if o is None else list(o) for o in observations]})
+        return reponse["moves"]
+
+    async def close(self, sid):
+        return await self.request({"op": "close", "session": sid})
+
+
+async def drive(client, strategy, concentration, source_x, source_y, a, b, start_x, start_y,
+                boundary="clamp", max_tot_iter=3000, seed=None, record="full", **params):
+    """
+    Rôle du contrôleur, sur un champ simulé : applique les déplacements de la
+    session et renvoie les observations. Même résultat (found, total_iter,
+    trajet) que le noyau strategies_jit de même graine et même politique de
+    bord.
+    Renvoie (found, trajet, total_iter).
+    """
+    bord = get_boundary(boundary)
+    shape = concentration.shape
+    x, y = start_x, start_y
+    dans = (source_x <= x < source_x + a) and (source_y <= y < source_y + b)
+    sid = await client.open(strategy, x, y, in_source=dans, seed=seed,
+                            max_tot_iter=max_tot_iter, **params)
+    capacite = get_strategy(strategy, **params).capacity(max_tot_iter) + 1
+    trajet = nouveau_trajet(record, (x, y), capacite)
+    obs = None
+    while True:
+        reponse = await client.step(sid, obs)
+        if reponse["move"] is None:
+            await client.close(sid)
+            return reponse["found"], fin_trajet(trajet), reponse["steps"]
+        dx, dy = reponse["move"]
+        x, y = bord.apply(x + dx, y + dy, shape)
+        trajet.append((x, y))
+        odeur = bord.sees(x, y, shape) and concentration[y, x] == 1
+        obs = (x, y, bool(odeur), (source_x <= x < source_x + a) and (source_y <= y < source_y + b))
+
+
+def _verifier(n=200, max_tot_iter=400):
+    # sessions (lots vectorisés, n clients concurrents) contre les noyaux
+    # strategies_jit de même graine, pour chaque politique de bord
+    import strategies_jit
+    from plumes import generate_poisson_plume
+
+    domain_x, domain_y, a, b = 70, 50, 10, 6
+    source = (2, (domain_y - b) // 2, a, b)
+    champ = generate_poisson_plume((domain_x, domain_y), source, 8, 0.03, 0.4, rng=0)
+    depart = (domain_x - 1, domain_y - 3)
+
+    async def jouer(name, boundary):
+        async with SessionServer() as server:
+            client = LocalClient(server)
+            r = await asyncio.gather(*(drive(client, name, champ, *source, *depart, boundary,
+                                             max_tot_iter, seed=g) for g in range(n)))
+            return r, server.stats()
+
+    ok = True
+    for name in LOTS:
+        for boundary in ("clamp", "open", "reflect"):
+            r, stats = asyncio.run(jouer(name, boundary))
+            noyau = getattr(strategies_jit, f"strategy_{name}")
+            k = [noyau(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g,
+                       backend="python", boundary=boundary) for g in range(n)]
+            bon = all(u == v for u, v in zip(r, k))
+            ok &= bon
+            print(f"{name:9s} {boundary:8s} {n} sessions, {stats['mean_batch']:.0f} pas par tick "
+                  f"{'identique au noyau' if bon else 'ÉCART'}")
+    return ok
+
+
+async def _flotte(n, pas=200):
+    # n sessions mosquito pilotées en bloc (step_many) : latence d'un pas de
+    # la flotte et coût par session
+    rng = np.random.default_rng(0)
+    champ = rng.random((200, 400)) < 0.05
+    x = np.full(n, 399)
+    y = rng.integers(0, 200, size=n)
+    async with SessionServer() as server:
+        sids = [server.open("mosquito", int(u), int(v), rng=i)
+                for i, (u, v) in enumerate(zip(x.tolist(), y.tolist()))]
+        obs = [None] * n
+        t = time.perf_counter()
+        for _ in range(pas):
+            moves = await server.step_many(sids, obs)
+            dx = np.array([m[0] for m in moves])
+            dy = np.array([m[1] for m in moves])
+            x = np.clip(x + dx, 0, 399)
+            y = np.clip(y + dy, 0, 199)
+            obs = list(zip(x.tolist(), y.tolist(), champ[y, x].tolist(), [False] * n))
+        duree = time.perf_counter() - t
+        return duree / pas, server.stats()["busy_per_step"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    ok = _verifier()
+    for n in (1000, 5000):
+        latence, cout = asyncio.run(_flotte(n))
+        print(f"{n} sessions : {1e3 * latence:.2f} ms par pas de la flotte "
+              f"(serveur {1e6 * cout:.2f} us par session et par pas)")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,297 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+
+# Cache des résultats de simulation, adressé par contenu.
+# Clé = sha256 de (contenu du champ et spécification éventuelle, stratégie +
+# empreinte de son code, arguments, graine). L'empreinte couvre le code réellement exécuté : la
+# fonction, les fonctions et classes du dépôt qu'elle appelle (de proche en
+# proche), et les stratégies enregistrées qu'elle désigne par leur nom
+# (strategies_api) avec leurs moteurs ; un partial est déplié (fonction,
+# arguments). Jamais de repr() d'objet : la clé est stable d'un processus à
+# l'autre. Un résultat n'est mis en cache que si la graine est
+# fixée : sans graine le tirage n'est pas reproductible.
+#
+# Sur disque : <path>/<2 premiers hex>/<clé>.pkl, taille totale bornée,
+# éviction LRU (date de dernier accès tenue en mémoire, reportée sur le mtime
+# du fichier). Une couche LRU en mémoire du processus est placée devant.
+
+CACHE_VERSION = 1
+
+
+def _canon(obj):
+    # forme JSON stable d'un argument (dict triés, tableaux résumés par leur hash)
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        return {"__array__": [arr.dtype.str, list(arr.shape), hashlib.sha256(arr.tobytes()).hexdigest()]}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, dict):
+        return {str(k): _canon(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (list, tuple)):
+        return [_canon(v) for v in obj]
+    if callable(obj):
+        return strategy_fingerprint(obj)
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if hasattr(obj, "__dict__"):
+        # objet de paramétrage (Boundary...) : sa classe et son état
+        return {"__object__": strategy_fingerprint(type(obj)), "state": _canon(vars(obj))}
+    raise TypeError(f"argument {type(obj).__name__} sans forme stable pour la clé de cache")
+
+
+def _canon_champ(concentration):
+    # contenu du champ (hash), ou None si le champ n'a pas de contenu figé
+    # (champ dynamique : tirages internes, état qui avance)
+    if isinstance(concentration, np.ndarray):
+        if concentration.dtype == np.bool_:
+            # champ binaire : hash du tableau compacté (8 fois moins d'octets)
+            paquets = np.packbits(concentration, axis=-1)
+            return {"__packed__": [list(concentration.shape),
+                                   hashlib.sha256(paquets.tobytes()).hexdigest()]}
+        return _canon(concentration)
+    packed = getattr(concentration, "packed", None)
+    if isinstance(packed, np.ndarray):
+        return {"__packed__": [list(concentration.shape), _canon(packed)]}
+    keys = getattr(concentration, "keys", None)
+    if isinstance(keys, np.ndarray):
+        return {"__sparse__": [list(concentration.shape), _canon(keys)]}
+    return None
+
+
+_RACINE = os.path.dirname(os.path.abspath(__file__))
+_sources = {}   # objet -> source (le code ne change pas en cours de processus)
+_empreintes = {}   # fonction ou classe -> strategy_fingerprint, même raison
+
+
+def _du_depot(obj):
+    module = sys.modules.get(getattr(obj, "__module__", None))
+    fichier = getattr(module, "__file__", None)
+    return fichier is not None and os.path.dirname(os.path.abspath(fichier)) == _RACINE
+
+
+def _source(obj):
+    if obj not in _sources:
+        try:
+            _sources[obj] = inspect.getsource(obj)
+        except (OSError, TypeError):
+            _sources[obj] = ""
+    return _sources[obj]
+
+
+def _fonctions(obj):
+    # fonctions Python d'une fonction (noyau numba déplié) ou d'une classe
+    if inspect.isclass(obj):
+        for valeur in vars(obj).values():
+            valeur = getattr(valeur, "__func__", valeur)
+            if inspect.isfunction(valeur):
+                yield valeur
+    elif inspect.isfunction(obj):
+        yield obj
+
+
+def _codes(code):
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _codes(const)
+
+
+def _dependances(obj, vues):
+    # obj puis, de proche en proche, les fonctions et classes du dépôt qu'il référence
+    obj = getattr(obj, "py_func", obj)
+    if obj in vues or not _du_depot(obj):
+        return
+    vues[obj] = None
+    suivants = []
+    if inspect.isclass(obj):
+        suivants += obj.__mro__[1:]
+        # stratégie enregistrée : ses moteurs batch et JIT
+        suivants += [getattr(obj, "batch", None), getattr(obj, "jit", None)]
+    registre = getattr(sys.modules.get("strategies_api"), "STRATEGIES", {})
+    for fonction in _fonctions(obj):
+        glob = fonction.__globals__
+        for code in _codes(fonction.__code__):
+            for nom in code.co_names:
+                valeur = glob.get(nom)
+                if inspect.ismodule(valeur):
+                    # module.attribut : attributs du module nommés dans le code
+                    suivants += [getattr(valeur, n) for n in code.co_names if hasattr(valeur, n)]
+                elif valeur is not None:
+                    suivants.append(valeur)
+            suivants += [registre[c] for c in code.co_consts if isinstance(c, str) and c in registre]
+    for suivant in suivants:
+        if inspect.isfunction(suivant) or inspect.isclass(suivant) or hasattr(suivant, "py_func"):
+            _dependances(suivant, vues)
+
+
+def strategy_fingerprint(func):
+    # nom qualifié + version explicite (__version__) ou, à défaut, hash du
+    # source de func et de tout le code du dépôt qu'elle atteint
+    if isinstance(func, partial):
+        arguments = json.dumps([_canon(list(func.args)), _canon(func.keywords)],
+                               sort_keys=True, separators=(",", ":"))
+        # stratégies enregistrées désignées par leur nom dans les arguments
+        registre = getattr(sys.modules.get("strategies_api"), "STRATEGIES", {})
+        noms = [v for v in (*func.args, *func.keywords.values()) if isinstance(v, str) and v in registre]
+        moteurs = "".join(f",{strategy_fingerprint(registre[nom])}" for nom in noms)
+        return f"partial({strategy_fingerprint(func.func)},{arguments}{moteurs})"
+    if not (inspect.isfunction(func) or inspect.isclass(func) or hasattr(func, "py_func")):
+        func = type(func)    # objet appelable : sa classe
+    try:
+        return _empreintes[func]
+    except (KeyError, TypeError):
+        pass
+    name = f"{func.__module__}.{func.__qualname__}"
+    version = getattr(func, "__version__", None)
+    if version is None:
+        vues = {}
+        _dependances(func, vues)
+        empreinte = hashlib.sha256()
+        for obj in (vues or [func]):
+            obj = getattr(obj, "py_func", obj)
+            empreinte.update(f"{obj.__module__}.{obj.__qualname__}\n{_source(obj)}".encode())
+        version = empreinte.hexdigest()[:16]
+    try:
+        _empreintes[func] = f"{name}@{version}"
+    except TypeError:
+        pass    # non hachable : recalculée à chaque appel
+    return f"{name}@{version}"
+
+
+def cache_key(field_spec, func, args=(), kwargs=None, seed=None, field=None):
+    # field : forme canonique du contenu du champ (_canon_champ) ; field_spec
+    # seul ne suffit pas (deux tirages d'une même spécification diffèrent)
+    payload = {
+        "v": CACHE_VERSION,
+        "field": _canon(field_spec),
+        "content": field,
+        "strategy": strategy_fingerprint(func),
+        "args": _canon(list(args)),
+        "kwargs": _canon(kwargs or {}),
+        "seed": _canon(seed),
+    }
+    texte = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texte.encode()).hexdigest()
+
+
+class SimulationCache:
+
+    def __init__(self, path, max_bytes=1 << 30, memory_items=256):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memoire = OrderedDict()
+        self.hits = self.misses = 0
+
+        # index disque : clé -> [taille, dernier accès], dans l'ordre LRU (le
+        # moins récemment utilisé en tête), construit une seule fois
+        entrees = []
+        os.makedirs(path, exist_ok=True)
+        for sous in os.scandir(path):
+            if sous.is_dir():
+                for f in os.scandir(sous.path):
+                    if f.name.endswith(".pkl"):
+                        st = f.stat()
+                        entrees.append((f.name[:-4], [st.st_size, st.st_mtime]))
+        entrees.sort(key=lambda kv: kv[1][1])
+        self._index = OrderedDict(entrees)
+        self.total_bytes = sum(t for t, _ in self._index.values())
+
+    def _fichier(self, key):
+        return os.path.join(self.path, key[:2], key + ".pkl")
+
+    def _en_memoire(self, key, value):
+        if self.memory_items <= 0:
+            return
+        self._memoire[key] = value
+        self._memoire.move_to_end(key)
+        while len(self._memoire) > self.memory_items:
+            self._memoire.popitem(last=False)
+
+    def get(self, key, default=None):
+        if key in self._memoire:
+            self._memoire.move_to_end(key)
+            self.hits += 1
+            return self._memoire[key]
+        entree = self._index.get(key)
+        if entree is None:
+            self.misses += 1
+            return default
+        fichier = self._fichier(key)
+        try:
+            with open(fichier, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # fichier supprimé ou tronqué par un autre processus
+            self._oublier(key)
+            self.misses += 1
+            return default
+        entree[1] = time.time()
+        self._index.move_to_end(key)
+        os.utime(fichier, (entree[1], entree[1]))
+        self._en_memoire(key, value)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        fichier = self._fichier(key)
+        os.makedirs(os.path.dirname(fichier), exist_ok=True)
+        tmp = f"{fichier}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, fichier)
+
+        taille = os.path.getsize(fichier)
+        if key in self._index:
+            self.total_bytes -= self._index[key][0]
+        self._index[key] = [taille, time.time()]
+        self._index.move_to_end(key)
+        self.total_bytes += taille
+        self._en_memoire(key, value)
+        self._evincer()
+
+    def _oublier(self, key):
+        entree = self._index.pop(key, None)
+        if entree is not None:
+            self.total_bytes -= entree[0]
+        self._memoire.pop(key, None)
+        try:
+            os.remove(self._fichier(key))
+        except OSError:
+            pass
+
+    def _evincer(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        # les moins récemment utilisées d'abord (tête de l'index)
+        while self.total_bytes > self.max_bytes and self._index:
+            self._oublier(next(iter(self._index)))
+
+    def run(self, func, concentration, *args, field_spec=None, seed=None, **kwargs):
+        """
+        Appelle func(concentration, *args, rng=seed, **kwargs) via le cache.
+        La clé contient le contenu du champ (hash) ; field_spec (paramètres
+        du générateur, dict) s'y ajoute à titre descriptif.
+        """
+        champ = _canon_champ(concentration)
+        if not isinstance(seed, (int, np.integer)) or champ is None:
+            # pas de graine entière ou champ sans contenu figé (dynamique) :
+            # résultat non reproductible, pas de cache
+            return func(concentration, *args, rng=seed, **kwargs)
+        key = cache_key(field_spec, func, args, kwargs, seed, field=champ)
+        manque = object()
+        value = self.get(key, manque)
+        if value is manque:
+            value = func(concentration, *args, rng=seed, **kwargs)
+            self.put(key, value)
+        return value
@@ -0,0 +1,104 @@
+import numpy as np
+
+from plumes import PlumeFactory
+from random_source import as_generator
+
+
+# Champs de concentration creux pour les très grands domaines.
+# Même interface que le tableau dense utilisé par les stratégies :
+# .shape et concentration[y, x] (scalaires ou tableaux d'indices), qui vaut 1
+# sur une cellule d'odeur et 0 ailleurs.
+#
+#   SparseField : cellules d'odeur triées par colonne puis par ligne (CSR par
+#                 colonne, clé x * H + y), recherche dichotomique vectorisée ;
+#                 les accès scalaires passent par un ensemble haché construit
+#                 à la demande.
+#   PackedField : repli dense à 1 bit par cellule (np.packbits le long de x).
+
+
+class SparseField:
+
+    def __init__(self, shape, ys, xs):
+        self.shape = tuple(shape)
+        H, W = self.shape
+        keys = np.unique(np.asarray(xs, dtype=np.int64) * H + np.asarray(ys, dtype=np.int64))
+        self.keys = keys
+        # CSR par colonne : les lignes de la colonne x sont rows[offsets[x]:offsets[x+1]]
+        self.col_offsets = np.searchsorted(keys, np.arange(W + 1, dtype=np.int64) * H)
+        self._set = None
+
+    @classmethod
+    def from_dense(cls, concentration):
+        ys, xs = np.nonzero(np.asarray(concentration) == 1)
+        return cls(concentration.shape, ys, xs)
+
+    @property
+    def nnz(self):
+        return self.keys.size
+
+    def rows(self, x):
+        H = self.shape[0]
+        return self.keys[self.col_offsets[x]:self.col_offsets[x + 1]] - x * H
+
+    def __getitem__(self, index):
+        y, x = index
+        H = self.shape[0]
+        if np.isscalar(y) and np.isscalar(x):
+            if self._set is None:
+                self._set = set(self.keys.tolist())
+            return 1 if x * H + y in self._set else 0
+        k = np.asarray(x, dtype=np.int64) * H + np.asarray(y, dtype=np.int64)
+        if self.keys.size == 0:
+            return np.zeros(k.shape, dtype=np.uint8)
+        i = np.minimum(np.searchsorted(self.keys, k), self.keys.size - 1)
+        return (self.keys[i] == k).astype(np.uint8)
+
+    def to_dense(self, dtype=np.uint8):
+        H, W = self.shape
+        out = np.zeros((H, W), dtype=dtype)
+        out[self.keys % H, self.keys // H] = 1
+        return out
+
+
+class PackedField:
+
+    def __init__(self, packed, shape):
+        self.packed = packed
+        self.shape = tuple(shape)
+
+    @classmethod
+    def from_dense(cls, concentration):
+        return cls(np.packbits(np.asarray(concentration) == 1, axis=-1), concentration.shape)
+
+    def __getitem__(self, index):
+        y, x = index
+        if np.isscalar(y) and np.isscalar(x):
+            return (int(self.packed[y, x >> 3]) >> (7 - (x & 7))) & 1
+        x = np.asarray(x)
+        return (self.packed[y, x >> 3] >> (7 - (x & 7))) & 1
+
+    def to_dense(self, dtype=np.uint8):
+        return np.unpackbits(self.packed, axis=-1, count=self.shape[1]).astype(dtype)
+
+
+def sparse_poisson_plume(domain, source, base_lambda=8, k_decay=0.03, s_spread=0.4, rng=None):
+    """
+    Même drapeau de Poisson que plumes.generate_poisson_plume, construit
+    directement en SparseField sans jamais allouer la grille dense.
+    """
+    rng = as_generator(rng)
+    domain_x, domain_y = domain
+    source_x, source_y, a, b = source
+    xs, lambda_x, y_min, y_max = PlumeFactory.poisson_flag(domain, source, base_lambda,
+                                                           k_decay, s_spread).poisson
+
+    n_particles = rng.poisson(lambda_x)
+    x_pts = np.repeat(xs, n_particles)
+    y_pts = rng.integers(np.repeat(y_min, n_particles), np.repeat(y_max, n_particles))
+
+    # zone source pleine, rognée au domaine
+    sy, sx = np.mgrid[max(source_y, 0):min(source_y + b, domain_y),
+                      max(source_x, 0):min(source_x + a, domain_x)]
+    return SparseField((domain_y, domain_x),
+                       np.concatenate([sy.ravel(), y_pts]),
+                       np.concatenate([sx.ravel(), x_pts]))
@@ -0,0 +1,557 @@
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+import strategies_batch
+import strategies_jit
+from bords import BOUNDARIES, Boundary, Clamp, Open, Reflect, get_boundary
+from random_source import as_generator, as_random_source
+from trajectoires import nouveau_trajet, fin_trajet, prolonger
+
+
+# Interface commune des stratégies : une seule implémentation par stratégie,
+# pilotée pas à pas, et des politiques de bord interchangeables.
+#
+#   Strategy.reset(obs, rng)  : état initial, obs = position de départ
+#   Strategy.step(obs)        : déplacement (dx, dy) à partir de l'observation
+#                               du pas précédent (None au premier pas), ou None
+#                               pour s'arrêter ; l'essai est réussi si la sonde
+#                               s'arrête dans la source. Un Jump est un
+#                               déplacement noté au trajet sans compter de pas
+#                               ni lire le champ (retour de spiral, comme
+#                               strategies.py) : step est rappelé ensuite avec
+#                               l'observation précédente, ou celle du point
+#                               d'arrivée, que la stratégie ignore
+#   Strategy.engaged          : le dernier déplacement appartient à une manoeuvre
+#                               qui se termine même au-delà de max_tot_iter
+#   Strategy.mode             : mode du dernier déplacement (SEARCH / UPWIND /
+#                               CASTING), lu par l'instrumentation (counters=)
+#   Strategy.plan(obs, limit, minimum) / commit(n) : avance rapide (optionnelle)
+#                               sur les déplacements déterministes, voir Segment
+#   Strategy.may_plan(minimum): plan peut-il renvoyer un segment ? (sinon le
+#                               pilote ne l'appelle pas)
+#   boundary                  : politique de bord (bords.py) : "clamp" (sonde
+#                               bornée, strategies.py), "open" (sonde libre,
+#                               odeur lue seulement dans la fenêtre,
+#                               strategies2.py), "reflect"
+#
+# Le registre associe à chaque nom la classe pas à pas et, si elles existent,
+# ses versions accélérées (moteur batch, noyaux JIT), qui prennent la
+# politique de bord en argument : simulate / simulate_batch prennent la plus
+# rapide disponible. `python -m strategies_api` vérifie que moteur batch et
+# noyaux JIT suivent le pilote pas à pas pour chaque politique de bord.
+
+Observation = namedtuple("Observation", "x y odor in_source")
+Jump = namedtuple("Jump", "dx dy")
+
+# Avance rapide : plan(obs, ...) décrit les prochains déplacements que ferait
+# step si obs et les observations suivantes étaient neutres (ni odeur si
+# `odor`, ni source) : dx, dy tableaux d'entiers, engaged comme Strategy.engaged.
+# Le pilote calcule le segment d'un coup (Boundary.walk, lecture vectorisée
+# du champ), garde les déplacements jusqu'à la première observation non
+# neutre incluse, et commit(n) met l'état à jour comme n appels à step.
+# Sans tirage aléatoire dans un segment, le résultat est identique pas à pas.
+Segment = namedtuple("Segment", "dx dy odor engaged")
+
+_SEGMENT_MIN = 16     # en dessous, le pas à pas est plus rapide
+_SEGMENT_MAX = 512    # segments sans fin naturelle (casting), par tranches
+
+SEARCH, UPWIND, CASTING = strategies_batch.SEARCH, strategies_batch.UPWIND, strategies_batch.CASTING
+
+
+class Strategy:
+    name = None
+    batch = None   # fonction du moteur batch (strategies_batch), boundary=
+    jit = None     # fonction de strategies_jit, boundary=
+    engaged = False
+    mode = SEARCH
+    resets = 0     # nouvelles spirales depuis reset (instrumentation, Spiral)
+
+    def __init__(self, **params):
+        self.params = params
+
+    def capacity(self, max_tot_iter):
+        # nombre maximal de déplacements d'un essai (taille du trajet)
+        return max_tot_iter
+
+    def reset(self, obs, rng):
+        raise NotImplementedError
+
+    def step(self, obs):
+        raise NotImplementedError
+
+    def may_plan(self, minimum):
+        return type(self).plan is not Strategy.plan
+
+    def plan(self, obs, limit, minimum):
+        # Segment d'au moins `minimum` déplacements (au plus `limit` s'ils ne
+        # sont pas engagés), ou None : pas d'avance rapide ici
+        return None
+
+    def commit(self, n):
+        raise NotImplementedError
+
+
+STRATEGIES = {}
+
+
+def register(name, batch=None, jit=None):
+    def enregistrer(cls):
+        cls.name = name
+        # staticmethod : pas de liaison à l'instance (strat.batch(...))
+        cls.batch = None if batch is None else staticmethod(batch)
+        cls.jit = None if jit is None else staticmethod(jit)
+        STRATEGIES[name] = cls
+        return cls
+    return enregistrer
+
+
+def get_strategy(strategy, **params):
+    if isinstance(strategy, Strategy):
+        return strategy
+    try:
+        cls = STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"stratégie inconnue {strategy!r}, enregistrées : {tuple(STRATEGIES)}") from None
+    return cls(**params)
+
+
+@register("simple",
+          batch=strategies_batch.batch_simple,
+          jit=strategies_jit.strategy_simple)
+class Simple(Strategy):
+    """Marche aléatoire ; à la détection, d pas vers l'amont (gauche)."""
+
+    def __init__(self, d=4):
+        super().__init__(d=d)
+        self.d = d
+
+    def capacity(self, max_tot_iter):
+        return max_tot_iter + self.d
+
+    def reset(self, obs, rng):
+        self.pas = as_random_source(rng).flux((-1, 0, 1))
+        self.saut = 0
+        self.marche = False      # le dernier pas était-il un pas de marche ?
+        self.arret = obs.in_source
+        self.x0 = obs.x
+
+    # mode et engaged se déduisent du dernier déplacement (pas d'écriture par pas)
+    @property
+    def mode(self):
+        return SEARCH if self.marche else UPWIND
+
+    @property
+    def engaged(self):
+        return not self.marche
+
+    def step(self, obs):
+        if obs is not None:
+            if self.marche and obs.odor and self.d > 0:
+                # la source n'est testée qu'après la remontée
+                self.saut = self.d
+            elif obs.in_source:
+                return None
+        if self.saut > 0:
+            self.saut -= 1
+            self.marche = False
+            return -1, 0
+        # départ dans la source : arrêt immédiat, sans succès (comme strategies.py)
+        if self.arret or (obs.x if obs is not None else self.x0) <= 0:
+            return None
+        self.marche = True
+        return next(self.pas), next(self.pas)
+
+    def may_plan(self, minimum):
+        return self.d >= minimum
+
+    def plan(self, obs, limit, minimum):
+        # reste de la remontée : seule la source l'interrompt
+        if self.saut < minimum or self.marche or obs.in_source:
+            return None
+        return Segment(np.full(self.saut, -1), np.zeros(self.saut, dtype=np.int64), False, True)
+
+    def commit(self, n):
+        self.saut -= n
+        self.marche = False
+
+
+_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))  # droite, haut, gauche, bas
+
+
+@register("spiral",
+          batch=strategies_batch.batch_spiral,
+          jit=strategies_jit.strategy_spiral)
+class Spiral(Strategy):
+    """
+    SEARCH : spirale carrée qui grandit autour du point courant
+    UPWIND : remonte le vent tant qu'il sent l'odeur ; sans odeur pendant
+             T_loss pas -> retour au dernier point de détection (Jump, noté
+             sans pas compté) et nouvelle spirale depuis ce point.
+    """
+
+    def __init__(self, T_loss=10):
+        super().__init__(T_loss=T_loss)
+        self.T_loss = T_loss
+
+    def capacity(self, max_tot_iter):
+        # un retour (Jump) au plus tous les T_loss pas
+        return max_tot_iter + max_tot_iter // max(self.T_loss, 1)
+
+    def reset(self, obs, rng):
+        self.pas = as_random_source(rng).flux((-1, 0, 1))
+        self.resets = 0
+        self.upwind = False
+        self.retour = False
+        self.last_detection = (obs.x, obs.y)
+        self.since_detection = 0
+        self._spirale()
+
+    @property
+    def mode(self):
+        return UPWIND if self.upwind else SEARCH
+
+    def _spirale(self):
+        self.dir_index = 0
+        self.step_length = 1
+        self.steps_done = 0
+        self.segments_done = 0
+
+    def step(self, obs):
+        if self.retour:
+            # observation au point de retour : ignorée (strategies.py ne lit pas le champ)
+            self.retour = False
+            obs = None
+        if obs is not None:
+            if obs.in_source:
+                return None
+            if obs.odor:
+                self.upwind = True
+                self.last_detection = (obs.x, obs.y)
+                self.since_detection = 0
+            elif self.upwind:
+                self.since_detection += 1
+                if self.since_detection >= self.T_loss:
+                    self.upwind = False
+                    self.resets += 1
+                    self._spirale()
+                    self.retour = True
+                    return Jump(self.last_detection[0] - obs.x, self.last_detection[1] - obs.y)
+
+        if self.upwind:
+            return -1, next(self.pas)
+
+        dx, dy = _DIRECTIONS[self.dir_index]
+        # commit(1), en ligne (chemin chaud du pilote)
+        self.steps_done += 1
+        if self.steps_done >= self.step_length:
+            self.steps_done = 0
+            self.dir_index = (self.dir_index + 1) % 4
+            self.segments_done += 1
+            if self.segments_done == 2:
+                self.segments_done = 0
+                self.step_length += 1
+        return dx, dy
+
+    def plan(self, obs, limit, minimum):
+        # reste du côté courant de la spirale (obs ignorée juste après un retour)
+        k = min(self.step_length - self.steps_done, limit)
+        if k < minimum or self.upwind or \
+                (obs is not None and not self.retour and (obs.odor or obs.in_source)):
+            return None
+        dx, dy = _DIRECTIONS[self.dir_index]
+        return Segment(np.full(k, dx), np.full(k, dy), True, False)
+
+    def commit(self, n):
+        # n pas de SEARCH, sans dépasser la fin du côté courant
+        self.retour = False
+        self.steps_done += n
+        if self.steps_done >= self.step_length:
+            self.steps_done = 0
+            self.dir_index = (self.dir_index + 1) % 4
+            self.segments_done += 1
+            if self.segments_done == 2:
+                self.segments_done = 0
+                self.step_length += 1
+
+
+@register("mosquito",
+          batch=strategies_batch.batch_mosquito,
+          jit=strategies_jit.strategy_mosquito)
+class Mosquito(Strategy):
+    """SEARCH (marche biaisée vers l'amont) -> UPWIND -> CASTING d'amplitude croissante."""
+
+    def reset(self, obs, rng):
+        rng = as_random_source(rng)
+        self.pas = rng.flux((-1, 0, 1))
+        self.pas_search = rng.flux((-1, 0, 0, 1))
+        self.mode = SEARCH
+        self.casting_ampl = 1
+        self.casting_dir = 1
+
+    def step(self, obs):
+        if obs is not None:
+            if obs.in_source:
+                return None
+            if obs.odor:
+                self.mode = UPWIND
+            elif self.mode == UPWIND:
+                self.mode = CASTING
+                self.casting_ampl = 1
+                self.casting_dir = 1
+            elif self.mode == CASTING:
+                self.casting_ampl += 1
+
+        if self.mode == SEARCH:
+            return next(self.pas_search), next(self.pas)
+        if self.mode == UPWIND:
+            return -1, next(self.pas)
+        dy = self.casting_dir * self.casting_ampl
+        self.casting_dir = -self.casting_dir
+        return -1, dy
+
+    def plan(self, obs, limit, minimum):
+        # zigzag de casting, amplitude +1 à chaque pas sans odeur
+        # casting_ampl compte les pas de casting : tranches de longueur doublée,
+        # la première après `minimum` pas ordinaires (odeur souvent vite retrouvée)
+        k = min(limit, _SEGMENT_MAX, self.casting_ampl)
+        if k < minimum or self.mode != CASTING or obs.odor or obs.in_source:
+            return None
+        rang = np.arange(k)
+        dy = np.where(rang % 2 == 0, self.casting_dir, -self.casting_dir) * (self.casting_ampl + 1 + rang)
+        return Segment(np.full(k, -1), dy, True, False)
+
+    def commit(self, n):
+        self.casting_ampl += n
+        if n % 2:
+            self.casting_dir = -self.casting_dir
+
+
+def _dans_source(x, y, source_x, source_y, a, b):
+    return (source_x <= x < source_x + a) and (source_y <= y < source_y + b)
+
+
+def _avance_rapide(strategy, seg, concentration, source_x, source_y, a, b, x, y, bord, trajet):
+    # segment entier d'un coup ; renvoie (x, y, obs, déplacements gardés)
+    shape = concentration.shape
+    xs, ys = bord.walk(x, y, seg.dx, seg.dy, shape)
+    vu = (xs >= 0) & (xs < shape[1]) & (ys >= 0) & (ys < shape[0])
+    odeur = np.zeros(xs.size, dtype=bool)
+    odeur[vu] = np.asarray(concentration[ys[vu], xs[vu]]) == 1
+    dedans = (source_x <= xs) & (xs < source_x + a) & (source_y <= ys) & (ys < source_y + b)
+    arret = (dedans | odeur) if seg.odor else dedans
+    j = int(arret.argmax()) if arret.any() else xs.size - 1
+    prolonger(trajet, xs[:j + 1], ys[:j + 1])
+    strategy.commit(j + 1)
+    x, y = int(xs[j]), int(ys[j])
+    return x, y, Observation(x, y, bool(odeur[j]), bool(dedans[j])), j + 1
+
+
+def run_strategy(strategy, concentration, source_x, source_y, a, b, start_x, start_y,
+                 boundary="clamp", max_tot_iter=3000, rng=None, record="full", counters=None,
+                 fast_forward=True):
+    """
+    Pilote pas à pas d'une instance de Strategy. Renvoie (found, trajet, total_iter).
+    fast_forward : avance rapide sur les segments déterministes (même résultat) ;
+                   sans effet sur un champ dynamique (DynamicPlume), lu au pas
+                   t0 + total_iter par concentration.at comme dans strategies_batch.
+    """
+    bord = get_boundary(boundary)
+    shape = concentration.shape
+    # pas de départ d'un champ dynamique, None pour un champ figé
+    t0 = concentration.t if hasattr(concentration, "at") else None
+    x, y = start_x, start_y
+    trajet = nouveau_trajet(record, (x, y), strategy.capacity(max_tot_iter) + 1)
+    total_iter = 0
+
+    strategy.reset(Observation(x, y, None, _dans_source(x, y, source_x, source_y, a, b)),
+                   as_random_source(rng))
+    if counters is not None:
+        return _run_mesure(strategy, concentration, source_x, source_y, a, b, x, y,
+                           bord, max_tot_iter, trajet, counters, t0)
+    step, apply, sees, noter = strategy.step, bord.apply, bord.sees, trajet.append
+    plan = strategy.plan if fast_forward and t0 is None and strategy.may_plan(_SEGMENT_MIN) else None
+    # chemin chaud : bornage "clamp" en ligne, pas de test de visibilité si
+    # la politique garde la sonde dans le domaine, Observation sans __new__ Python
+    borne = type(bord) is Clamp
+    voit_tout = bord.inside
+    x_max, y_max = shape[1] - 1, shape[0] - 1
+    source_x2, source_y2 = source_x + a, source_y + b
+    nouvelle = tuple.__new__
+    obs = None
+    while True:
+        if plan is not None:
+            seg = plan(obs, max_tot_iter - total_iter, _SEGMENT_MIN)
+            if seg is not None:
+                x, y, obs, k = _avance_rapide(strategy, seg, concentration, source_x, source_y,
+                                              a, b, x, y, bord, trajet)
+                total_iter += k
+                continue
+        move = step(obs)
+        if move is None:
+            return obs is not None and obs.in_source, fin_trajet(trajet), total_iter
+        if move.__class__ is Jump:
+            # retour sur un point déjà visité : noté, ni pas compté ni champ lu
+            x, y = x + move[0], y + move[1]
+            noter((x, y))
+            continue
+        if total_iter >= max_tot_iter and not strategy.engaged:
+            return False, fin_trajet(trajet), total_iter
+        if borne:
+            x = min(max(x + move[0], 0), x_max)
+            y = min(max(y + move[1], 0), y_max)
+        else:
+            x, y = apply(x + move[0], y + move[1], shape)
+        noter((x, y))
+        total_iter += 1
+        odeur = (voit_tout or sees(x, y, shape)) and \
+            (concentration[y, x] if t0 is None else concentration.at(t0 + total_iter, x, y)) == 1
+        obs = nouvelle(Observation, (x, y, odeur, source_x <= x < source_x2 and source_y <= y < source_y2))
+
+
+def _run_mesure(strategy, concentration, source_x, source_y, a, b, x, y,
+                bord, max_tot_iter, trajet, counters, t0=None):
+    # même boucle que run_strategy, avec compteurs et temps par phase
+    shape = concentration.shape
+    total_iter = 0
+    precedent = None   # (mode, odeur) du déplacement précédent
+    counters.trials += 1
+    counters.start()
+    obs = None
+    while True:
+        move = strategy.step(obs)
+        counters.lap("decision")
+        if type(move) is Jump:
+            x, y = x + move[0], y + move[1]
+            trajet.append((x, y))
+            continue
+        if move is not None and total_iter >= max_tot_iter and not strategy.engaged:
+            move = None
+            obs = None    # budget épuisé : échec
+        if precedent is not None:
+            counters.record_step(precedent[0], strategy.mode if move is not None else None, precedent[1])
+        if move is None:
+            counters.spiral_resets += strategy.resets
+            return obs is not None and obs.in_source, fin_trajet(trajet), total_iter
+        if strategy.mode == CASTING:
+            counters.max_casting_ampl = max(counters.max_casting_ampl, abs(move[1]))
+        x, y = bord.apply(x + move[0], y + move[1], shape)
+        counters.lap("bounds")
+        trajet.append((x, y))
+        total_iter += 1
+        counters.lap("trajectory")
+        odeur = bord.sees(x, y, shape) and \
+            (concentration[y, x] if t0 is None else concentration.at(t0 + total_iter, x, y)) == 1
+        counters.lap("lookup")
+        obs = Observation(x, y, odeur, _dans_source(x, y, source_x, source_y, a, b))
+        counters.lap("source")
+        precedent = (strategy.mode, odeur)
+
+
+def simulate(strategy, concentration, source_x, source_y, a, b, start_x, start_y,
+             boundary="clamp", max_tot_iter=3000, rng=None, record="full",
+             backend="step", counters=None, fast_forward=True, **params):
+    """
+    Un essai de la stratégie enregistrée `strategy` (nom ou instance).
+    backend : "step" (pilote générique), "numba" / "python" (noyaux de
+              strategies_jit, si la stratégie en a un et la politique de bord un code).
+    """
+    strat = get_strategy(strategy, **params)
+    if backend == "step":
+        return run_strategy(strat, concentration, source_x, source_y, a, b, start_x, start_y,
+                            boundary, max_tot_iter, rng, record, counters, fast_forward)
+    bord = get_boundary(boundary)
+    if strat.jit is None or bord.code is None:
+        raise ValueError(f"pas de noyau JIT pour {strat.name!r} avec boundary={bord.name!r}")
+    if counters is not None:
+        raise ValueError("counters n'est pas disponible avec les noyaux JIT (backend='step')")
+    return strat.jit(concentration, source_x, source_y, a, b, start_x, start_y,
+                     max_tot_iter=max_tot_iter, rng=rng, record=record, backend=backend,
+                     boundary=bord, **strat.params)
+
+
+def simulate_batch(strategy, concentration, source_x, source_y, a, b, start_x, start_y,
+                   boundary="clamp", max_tot_iter=3000, n_probes=None, rng=None,
+                   counters=None, censor=None, labels=None, **params):
+    """
+    n essais, même signature et même retour (found, positions, total_iter)
+    que strategies_batch. Moteur vectorisé si la stratégie en a un (toutes
+    les politiques de bord), sinon une boucle du pilote pas à pas (sans
+    arrêt anticipé : censor n'y coupe aucune sonde ; une seule source).
+    """
+    strat = get_strategy(strategy, **params)
+    bord = get_boundary(boundary)
+    if strat.batch is not None:
+        return strat.batch(concentration, source_x, source_y, a, b, start_x, start_y,
+                           max_tot_iter=max_tot_iter, n_probes=n_probes, rng=rng,
+                           counters=counters, censor=censor, labels=labels, boundary=bord,
+                           **strat.params)
+    if labels is not None:
+        raise ValueError(f"plusieurs sources (labels=) : pas de moteur batch pour {strat.name!r}")
+
+    rng = as_generator(rng)
+    xs, ys = strategies_batch._departs(start_x, start_y, n_probes)
+    found, positions, total_iter = strategies_batch._resultats(xs.size)
+    if censor is not None:
+        censor.begin(concentration, strategies_batch._test_source(source_x, source_y, a, b), xs.size,
+                     boundary=bord)
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        found[i], trajet, total_iter[i] = run_strategy(
+            strat, concentration, source_x, source_y, a, b, x, y,
+            bord, max_tot_iter, rng, record="array", counters=counters)
+        positions[i] = trajet[-1]
+    return found, positions, total_iter
+
+
+def batch_function(strategy, boundary="clamp"):
+    # fonction au format du moteur batch, pour run_benchmark / optimisation.tune
+    return partial(simulate_batch, strategy, boundary=boundary)
+
+
+def _verifier(n=1000, max_tot_iter=600):
+    # moteur batch et noyaux JIT contre le pilote pas à pas, pour chaque
+    # stratégie et chaque politique de bord : mêmes lois (aléas différents)
+    from plumes import generate_poisson_plume
+
+    domain_x, domain_y, a, b = 70, 50, 10, 6
+    source = (2, (domain_y - b) // 2, a, b)
+    champ = generate_poisson_plume((domain_x, domain_y), source, 8, 0.03, 0.4, rng=0)
+    depart = (domain_x - 1, domain_y - 3)   # près d'un coin : les bords comptent
+    seuil = 1.63 * np.sqrt(2 / n)           # KS à 1 %
+    ok = True
+    for name, cls in STRATEGIES.items():
+        for bord in BOUNDARIES.values():
+            gen = np.random.default_rng(0)
+            pas = [run_strategy(cls(), champ, *source, *depart, bord, max_tot_iter, g, "none")
+                   for g in range(n)]
+            f_r = np.array([t[0] for t in pas])
+            it_r = np.sort([t[2] for t in pas])
+            autres = {}
+            if cls.batch is not None:
+                f, _, it = cls.batch(champ, *source, *depart, max_tot_iter=max_tot_iter,
+                                     n_probes=n, rng=gen, boundary=bord)
+                autres["batch"] = (f, np.sort(it))
+            if cls.jit is not None and bord.code is not None:
+                k = [cls.jit(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g,
+                             record="none", boundary=bord) for g in range(n)]
+                autres["jit"] = (np.array([t[0] for t in k]), np.sort([t[2] for t in k]))
+            for moteur, (f_k, it_k) in autres.items():
+                # écart des taux en erreurs-types, distance de Kolmogorov-Smirnov
+                p_moy = (f_r.mean() + f_k.mean()) / 2
+                z = abs(f_r.mean() - f_k.mean()) / max(np.sqrt(2 * p_moy * (1 - p_moy) / n), 1e-12)
+                grille = np.union1d(it_r, it_k)
+                ks = np.abs(np.searchsorted(it_r, grille, side="right")
+                            - np.searchsorted(it_k, grille, side="right")).max() / n
+                bon = z < 3 and ks < seuil
+                ok &= bon
+                print(f"{name:9s} {bord.name:8s} {moteur:6s} succès {100 * f_r.mean():5.1f}% / "
+                      f"{100 * f_k.mean():5.1f}% (z={z:.2f}), KS total_iter {ks:.3f} "
+                      f"(seuil {seuil:.3f}) {'ok' if bon else 'ÉCART'}")
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(0 if _verifier() else 1)
@@ -0,0 +1,418 @@
+import numpy as np
+
+from bords import get_boundary
+from random_source import as_generator
+
+
+# Moteur "batch" : N sondes avancent ensemble, une mise à jour masquée par pas.
+# Même sémantique que le pilote pas à pas de strategies_api (par défaut
+# boundary="clamp", sonde bornée au domaine comme strategies.py ; toute
+# politique de bords.py via Boundary.apply_batch / sees_batch), mais l'état de
+# chaque sonde (position, mode, spirale, casting...) est stocké dans des
+# tableaux NumPy. Les sondes qui ont trouvé la source ou atteint max_tot_iter
+# sont figées puis retirées des tableaux actifs.
+#
+# concentration peut aussi être un champ dynamique (plume_dynamique.DynamicPlume) :
+# il est alors échantillonné par field.at(t, x, y), t avançant d'un pas par tick,
+# à partir du pas courant du champ.
+#
+# counters (instrumentation.Counters, optionnel) : pas par mode, transitions,
+# odeurs détectées et temps par phase (rng, move, source, lookup, update).
+#
+# censor (ordonnancement.Censor, optionnel) : arrêt anticipé des sondes sans
+# espoir (found=False, total_iter = pas de la coupure, motif dans censor.status).
+#
+# labels (multi_sources.SourceMap, optionnel) : plusieurs sources, testées par
+# une grille d'étiquettes en O(1) par sonde ; remplace alors le rectangle
+# (source_x, source_y, a, b).
+#
+# Chaque fonction renvoie (found, positions, total_iter) :
+#   found      : tableau bool (n,)
+#   positions  : tableau (n, 2) des positions finales (x, y) de chaque sonde
+#   total_iter : tableau int (n,)
+
+
+# modes des stratégies (strategy_mosquito ; search / upwind pour les autres)
+SEARCH, UPWIND, CASTING = 0, 1, 2
+
+
+def dans_source_batch(x, y, source_x, source_y, a, b):
+    return (source_x <= x) & (x < source_x + a) & (source_y <= y) & (y < source_y + b)
+
+
+def _test_source(source_x, source_y, a, b, labels=None, bord=None):
+    # fonction (x, y) -> bool : la sonde est-elle dans une source ?
+    if labels is None:
+        return lambda x, y: dans_source_batch(x, y, source_x, source_y, a, b)
+    if bord is None or bord.inside:
+        return labels.contains
+    # sonde hors de la grille d'étiquettes : jamais dans une source
+    return lambda x, y: _vu(labels.contains, labels.shape, bord, x, y)
+
+
+def _vu(lire, shape, bord, x, y):
+    # lire(x, y) là où la politique de bord voit le champ, False ailleurs
+    vu = bord.sees_batch(x, y, shape)
+    if vu.all():
+        return lire(x, y)
+    out = np.zeros(x.shape, dtype=bool)
+    out[vu] = lire(x[vu], y[vu])
+    return out
+
+
+def _departs(start_x, start_y, n_probes=None):
+    # start_x / start_y peuvent être des scalaires ou des tableaux
+    x, y = np.broadcast_arrays(np.asarray(start_x, dtype=np.int64),
+                               np.asarray(start_y, dtype=np.int64))
+    if n_probes is not None:
+        x = np.broadcast_to(x, (n_probes,))
+        y = np.broadcast_to(y, (n_probes,))
+    return x.ravel().copy(), y.ravel().copy()
+
+
+def _compacter(keep, *arrays):
+    return tuple(arr[keep] for arr in arrays)
+
+
+# Règles de décision des stratégies, après le pas et la lecture de l'odeur,
+# sur les tableaux d'état des sondes actives (modifiés en place). Partagées
+# avec le mode continu (strategies_continues), où seul le modèle de
+# déplacement (positions réelles) diffère ; sessions.py reprend l'avancement
+# de la spirale.
+
+def _regle_simple(saut, odeur, d):
+    # odeur en marche : remontée de d pas ; la source n'est testée qu'après
+    # la remontée -> masque des sondes dont la source est testée à ce pas
+    if d > 0:
+        saut[odeur] = d
+        return ~odeur
+    return np.ones(odeur.size, dtype=bool)
+
+
+def _avancer_spirale(search, dir_index, step_length, steps_done, segments_done):
+    # un pas de spirale carrée (sondes en SEARCH) : côtés 1, 1, 2, 2, 3...
+    steps_done += search
+    tourne = search & (steps_done >= step_length)
+    steps_done[tourne] = 0
+    dir_index += tourne
+    dir_index %= 4
+    segments_done += tourne
+    grandit = tourne & (segments_done == 2)
+    segments_done[grandit] = 0
+    step_length += grandit
+
+
+def _regle_spirale(upwind, c_here, trouve, since_detection, T_loss,
+                   dir_index, step_length, steps_done, segments_done):
+    # odeur -> UPWIND ; UPWIND sans odeur pendant T_loss pas -> nouvelle
+    # spirale (reset : retour au dernier point de détection, fait par l'appelant)
+    # -> (detecte, reset, upwind)
+    detecte = c_here & ~trouve
+    since_detection[detecte] = 0
+    perdu = upwind & ~c_here & ~trouve
+    since_detection += perdu
+    reset = perdu & (since_detection >= T_loss)
+    dir_index[reset] = 0
+    step_length[reset] = 1
+    steps_done[reset] = 0
+    segments_done[reset] = 0
+    return detecte, reset, (upwind | detecte) & ~reset
+
+
+def _regle_mosquito(mode, odeur, casting, casting_ampl, casting_dir):
+    # odeur -> UPWIND ; perdue en UPWIND -> CASTING d'amplitude 1 ; chaque
+    # pas de CASTING sans odeur élargit le zigzag
+    perd = ~odeur & (mode == UPWIND)
+    casting_ampl += ~odeur & casting
+    casting_ampl[perd] = 1
+    casting_dir[perd] = 1
+    mode[perd] = CASTING
+    mode[odeur] = UPWIND
+
+
+def _horloge(concentration):
+    # pas de départ d'un champ dynamique (None pour un champ figé)
+    return concentration.t if hasattr(concentration, "at") else None
+
+
+def _odeur(concentration, t0, tick, x, y, bord=None):
+    if bord is not None and not bord.inside:
+        return _vu(lambda u, v: _odeur(concentration, t0, tick, u, v),
+                   concentration.shape, bord, x, y)
+    if t0 is None:
+        return concentration[y, x] == 1
+    return concentration.at(t0 + tick, x, y) == 1
+
+
+def _sans_mesure(phase):
+    pass
+
+
+def _resultats(n):
+    found = np.zeros(n, dtype=bool)
+    positions = np.zeros((n, 2), dtype=np.int64)
+    total_iter = np.zeros(n, dtype=np.int64)
+    return found, positions, total_iter
+
+
+def batch_simple(concentration, source_x, source_y, a, b,
+                 start_x, start_y, d=4, max_tot_iter=3000, n_probes=None, rng=None,
+                 counters=None, censor=None, labels=None, boundary="clamp"):
+    rng = as_generator(rng)
+    bord = get_boundary(boundary)
+    shape = concentration.shape
+    t0 = _horloge(concentration)
+    tick = 0
+    dedans = _test_source(source_x, source_y, a, b, labels, bord)
+
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n)
+    positions[:, 0], positions[:, 1] = x, y
+
+    # conditions d'entrée de la boucle while de strategy_simple
+    actif = (x > 0) & ~dedans(x, y) & (max_tot_iter > 0)
+    ids = np.flatnonzero(actif)
+    x, y = x[ids], y[ids]
+    it = np.zeros(ids.size, dtype=np.int64)
+    saut = np.zeros(ids.size, dtype=np.int64)  # pas de remontée restants
+
+    lap = _sans_mesure
+    if counters is not None:
+        counters.trials += n
+        lap = counters.lap
+        counters.start()
+    if censor is not None:
+        censor.begin(concentration, dedans, n, boundary=bord)
+    colle = np.zeros(ids.size, dtype=np.int64)  # pas consécutifs au bord (censor)
+
+    while ids.size:
+        m = ids.size
+        tick += 1
+        marche = saut == 0
+
+        # marche aléatoire, ou un pas de la remontée de d vers la gauche
+        dx = rng.integers(-1, 2, size=m)
+        dy = rng.integers(-1, 2, size=m)
+        lap("rng")
+        x, y = bord.apply_batch(np.where(marche, x + dx, x - 1), np.where(marche, y + dy, y), shape)
+        it += 1
+        saut -= ~marche
+        lap("move")
+
+        odeur = marche & _odeur(concentration, t0, tick, x, y, bord)
+        lap("lookup")
+        teste = _regle_simple(saut, odeur, d)
+
+        trouve = teste & dedans(x, y)
+        lap("source")
+        fin_boucle = (saut == 0) & ((x <= 0) | (it >= max_tot_iter))
+        stop = trouve | fin_boucle
+        if censor is not None:
+            colle, coupe = censor.check(ids, ~stop, x, y, colle)
+            stop |= coupe
+
+        if counters is not None:
+            # marche : SEARCH, pas de remontée : UPWIND
+            counters.record(np.where(marche, SEARCH, UPWIND),
+                            (np.where(marche, SEARCH, UPWIND)[~stop],
+                             np.where(saut[~stop] > 0, UPWIND, SEARCH)), odeur,
+                            at=(ids, x, y, it))
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            ids, x, y, it, saut, colle = _compacter(~stop, ids, x, y, it, saut, colle)
+        lap("update")
+
+    return found, positions, total_iter
+
+
+# directions de la spirale : droite, haut, gauche, bas
+_SPIRALE_DX = np.array([1, 0, -1, 0])
+_SPIRALE_DY = np.array([0, 1, 0, -1])
+
+
+def batch_spiral(concentration, source_x, source_y, a, b,
+                 start_x, start_y, T_loss=10, max_tot_iter=3000, n_probes=None, rng=None,
+                 counters=None, censor=None, labels=None, boundary="clamp"):
+    rng = as_generator(rng)
+    bord = get_boundary(boundary)
+    shape = concentration.shape
+    t0 = _horloge(concentration)
+    tick = 0
+    dedans = _test_source(source_x, source_y, a, b, labels, bord)
+
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n)
+    positions[:, 0], positions[:, 1] = x, y
+
+    ids = np.arange(n) if max_tot_iter > 0 else np.arange(0)
+    x, y = x[ids], y[ids]
+    m = ids.size
+    it = np.zeros(m, dtype=np.int64)
+    upwind = np.zeros(m, dtype=bool)  # False : SEARCH, True : UPWIND
+
+    # spirale
+    dir_index = np.zeros(m, dtype=np.int64)
+    step_length = np.ones(m, dtype=np.int64)
+    steps_done = np.zeros(m, dtype=np.int64)
+    segments_done = np.zeros(m, dtype=np.int64)
+
+    # upwind
+    since_detection = np.zeros(m, dtype=np.int64)
+    last_x, last_y = x.copy(), y.copy()
+
+    lap = _sans_mesure
+    if counters is not None:
+        counters.trials += n
+        lap = counters.lap
+        counters.start()
+    if censor is not None:
+        censor.begin(concentration, dedans, n, boundary=bord)
+    colle = np.zeros(ids.size, dtype=np.int64)  # pas consécutifs au bord (censor)
+
+    while ids.size:
+        m = ids.size
+        tick += 1
+        search = ~upwind
+
+        dy = rng.integers(-1, 2, size=m)
+        lap("rng")
+        x = np.where(search, x + _SPIRALE_DX[dir_index], x - 1)
+        y = np.where(search, y + _SPIRALE_DY[dir_index], y + dy)
+
+        _avancer_spirale(search, dir_index, step_length, steps_done, segments_done)
+
+        x, y = bord.apply_batch(x, y, shape)
+        it += 1
+        lap("move")
+
+        trouve = dedans(x, y)
+        lap("source")
+
+        c_here = _odeur(concentration, t0, tick, x, y, bord)
+        lap("lookup")
+        detecte, reset, upwind = _regle_spirale(upwind, c_here, trouve, since_detection, T_loss,
+                                                dir_index, step_length, steps_done, segments_done)
+        last_x = np.where(detecte, x, last_x)
+        last_y = np.where(detecte, y, last_y)
+        x = np.where(reset, last_x, x)
+        y = np.where(reset, last_y, y)
+        if counters is not None:
+            counters.spiral_resets += int(np.count_nonzero(reset))
+
+        stop = trouve | (it >= max_tot_iter)
+        if censor is not None:
+            colle, coupe = censor.check(ids, ~stop, x, y, colle)
+            stop |= coupe
+
+        if counters is not None:
+            # upwind -> search : retour en spirale
+            counters.record(np.where(search, SEARCH, UPWIND),
+                            (np.where(search, SEARCH, UPWIND)[~stop],
+                             np.where(upwind[~stop], UPWIND, SEARCH)), c_here,
+                            at=(ids, x, y, it))
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            (ids, x, y, it, upwind, dir_index, step_length, steps_done, segments_done,
+             since_detection, last_x, last_y, colle) = _compacter(
+                ~stop, ids, x, y, it, upwind, dir_index, step_length, steps_done,
+                segments_done, since_detection, last_x, last_y, colle)
+        lap("update")
+
+    return found, positions, total_iter
+
+
+# pas en x du mode SEARCH : un peu plus de chances de rester sur place / aller à gauche
+_MOSQUITO_DX = np.array([-1, 0, 0, 1])
+
+
+def batch_mosquito(concentration, source_x, source_y, a, b,
+                   start_x, start_y, max_tot_iter=3000, n_probes=None, rng=None,
+                   counters=None, censor=None, labels=None, boundary="clamp"):
+    rng = as_generator(rng)
+    bord = get_boundary(boundary)
+    shape = concentration.shape
+    t0 = _horloge(concentration)
+    tick = 0
+    dedans = _test_source(source_x, source_y, a, b, labels, bord)
+
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n)
+    positions[:, 0], positions[:, 1] = x, y
+
+    ids = np.arange(n) if max_tot_iter > 0 else np.arange(0)
+    x, y = x[ids], y[ids]
+    m = ids.size
+    it = np.zeros(m, dtype=np.int64)
+    mode = np.full(m, SEARCH, dtype=np.int8)
+
+    # paramètres de casting
+    casting_ampl = np.ones(m, dtype=np.int64)
+    casting_dir = np.ones(m, dtype=np.int64)
+
+    lap = _sans_mesure
+    if counters is not None:
+        counters.trials += n
+        lap = counters.lap
+        counters.start()
+    if censor is not None:
+        censor.begin(concentration, dedans, n, boundary=bord)
+    colle = np.zeros(ids.size, dtype=np.int64)  # pas consécutifs au bord (censor)
+
+    while ids.size:
+        m = ids.size
+        tick += 1
+        search = mode == SEARCH
+        casting = mode == CASTING
+
+        dx = _MOSQUITO_DX[rng.integers(0, 4, size=m)]
+        dy = rng.integers(-1, 2, size=m)
+        lap("rng")
+        x = x + np.where(search, dx, -1)
+        y = y + np.where(casting, casting_dir * casting_ampl, dy)
+        casting_dir = np.where(casting, -casting_dir, casting_dir)
+
+        x, y = bord.apply_batch(x, y, shape)
+        it += 1
+        lap("move")
+
+        trouve = dedans(x, y)
+        lap("source")
+
+        odeur = _odeur(concentration, t0, tick, x, y, bord)
+        lap("lookup")
+        mode_pas = mode.copy() if counters is not None else None
+        _regle_mosquito(mode, odeur, casting, casting_ampl, casting_dir)
+
+        stop = trouve | (it >= max_tot_iter)
+        if censor is not None:
+            colle, coupe = censor.check(ids, ~stop, x, y, colle,
+                                        mode == CASTING, casting_ampl, casting_dir)
+            stop |= coupe
+
+        if counters is not None:
+            counters.record(mode_pas, (mode_pas[~stop], mode[~stop]), odeur,
+                            at=(ids, x, y, it))
+            counters.max_casting_ampl = max(counters.max_casting_ampl,
+                                            int(casting_ampl[mode == CASTING].max(initial=0)))
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            ids, x, y, it, mode, casting_ampl, casting_dir, colle = _compacter(
+                ~stop, ids, x, y, it, mode, casting_ampl, casting_dir, colle)
+        lap("update")
+
+    return found, positions, total_iter
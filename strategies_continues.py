@@ -0,0 +1,297 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from plumes import advection_diffusion_kernel
+from random_source import as_generator
+from strategies_batch import (SEARCH, CASTING, _avancer_spirale, _regle_mosquito,
+                              _regle_simple, _regle_spirale, dans_source_batch)
+
+
+# Mode continu du moteur batch : positions et caps réels, pas de longueur
+# `speed` (en cellules), sonde bornée au domaine [0, domain) comme strategies.py.
+#
+# L'odeur n'est plus lue dans un champ binaire figé : à chaque pas, la sonde
+# détecte avec une probabilité égale à l'intensité analytique c(x, y)
+# d'odor-tracking2.py (tirage de Bernoulli renouvelé à chaque échantillon),
+# ou si c(x, y) >= threshold quand un seuil est donné.
+#
+# Les règles de décision (transitions de mode, spirale, casting) sont celles
+# du moteur batch (_regle_* de strategies_batch) ; seul le déplacement change.
+#
+# Chaque fonction renvoie (found, positions, total_iter), positions en float (n, 2).
+
+
+class IntensityField:
+    """
+    Intensité c(x, y) d'advection-diffusion, normalisée comme
+    PlumeFactory.advection_diffusion (max sur les cellules entières = 1) :
+    aux points entiers, c coïncide avec factory.proba. Entre deux, le noyau
+    peut dépasser ce max près de la source : c est écrêtée à 1 (probabilité).
+
+    exact(x, y) évalue le noyau ; field(x, y) lit une grille de pas `resolution`
+    (valeur au coin inférieur de chaque case : factory.proba pour
+    resolution=1), construite paresseusement par tuiles de
+    tile x tile cases au premier accès et gardée dans un cache LRU d'au plus
+    max_tiles tuiles (comme plume_tuilee) : la mémoire suit la surface visitée,
+    pas celle du domaine. resolution=None : toujours exact.
+    """
+
+    def __init__(self, domain, source, V=2.0, D=1.0, tau=10, center=None, gauss=2.0,
+                 resolution=1.0, tile=256, max_tiles=256):
+        self.domain_x, self.domain_y = domain
+        self.shape = (self.domain_y, self.domain_x)
+        self.source = source
+        self.params = (V, D, tau, gauss)
+        source_x, source_y, a, b = source
+        self.x0, self.y0 = (source_x, source_y) if center is None else center
+        self.resolution = resolution
+        self.tile = tile
+        self.max_tiles = max_tiles
+
+        # max du noyau : à chaque x, atteint sur la ligne la plus proche de y0
+        y_max = min(max(round(self.y0), 0), self.domain_y - 1)
+        self.norme = advection_diffusion_kernel(np.arange(self.domain_x) - self.x0,
+                                                y_max - self.y0, *self.params).max()
+        if resolution is not None:
+            self.n_cases = (int(np.ceil(self.domain_y / resolution)),
+                            int(np.ceil(self.domain_x / resolution)))
+            self.n_tiles = (-(-self.n_cases[0] // tile), -(-self.n_cases[1] // tile))
+        self._tuiles = OrderedDict()
+
+    def exact(self, x, y):
+        c = advection_diffusion_kernel(np.asarray(x) - self.x0, np.asarray(y) - self.y0,
+                                       *self.params) / self.norme
+        return np.minimum(c, 1.0)
+
+    def _tuile(self, cle):
+        tuile = self._tuiles.get(cle)
+        if tuile is not None:
+            self._tuiles.move_to_end(cle)
+            return tuile
+        ty, tx = divmod(cle, self.n_tiles[1])
+        r, t = self.resolution, self.tile
+        gx = np.arange(tx * t, min((tx + 1) * t, self.n_cases[1])) * r
+        gy = np.arange(ty * t, min((ty + 1) * t, self.n_cases[0])) * r
+        with np.errstate(under="ignore"):
+            tuile = self.exact(gx[None, :], gy[:, None]).astype(np.float32)
+        self._tuiles[cle] = tuile
+        while len(self._tuiles) > self.max_tiles:
+            self._tuiles.popitem(last=False)
+        return tuile
+
+    def __call__(self, x, y):
+        if self.resolution is None:
+            return self.exact(x, y)
+        # positions déjà bornées au domaine par les stratégies
+        t = self.tile
+        iy = (np.asarray(y) / self.resolution).astype(np.int64)
+        ix = (np.asarray(x) / self.resolution).astype(np.int64)
+        cles = (iy // t) * self.n_tiles[1] + ix // t
+        if cles.size and cles.min() == cles.max():
+            return self._tuile(int(cles.flat[0]))[iy % t, ix % t]
+        # regroupement des échantillons par tuile
+        out = np.empty(cles.shape, dtype=np.float32)
+        plat, iyf, ixf = cles.ravel(), iy.ravel(), ix.ravel()
+        ordre = np.argsort(plat, kind="stable")
+        debuts = np.flatnonzero(np.r_[True, plat[ordre][1:] != plat[ordre][:-1]])
+        fins = np.r_[debuts[1:], ordre.size]
+        sortie = out.reshape(-1)
+        for d, f in zip(debuts.tolist(), fins.tolist()):
+            k = ordre[d:f]
+            sortie[k] = self._tuile(int(plat[k[0]]))[iyf[k] % t, ixf[k] % t]
+        return out
+
+    @property
+    def nbytes(self):
+        # mémoire des tuiles en cache
+        return sum(tuile.nbytes for tuile in self._tuiles.values())
+
+
+def _detecter(intensity, x, y, threshold, rng):
+    c = intensity(x, y)
+    if threshold is not None:
+        return c >= threshold
+    return rng.random(c.shape) < c
+
+
+def _departs(start_x, start_y, n_probes=None):
+    x, y = np.broadcast_arrays(np.asarray(start_x, dtype=float), np.asarray(start_y, dtype=float))
+    if n_probes is not None:
+        x = np.broadcast_to(x, (n_probes,))
+        y = np.broadcast_to(y, (n_probes,))
+    return x.ravel().copy(), y.ravel().copy()
+
+
+def _resultats(n, x, y):
+    found = np.zeros(n, dtype=bool)
+    positions = np.stack([x, y], axis=1)
+    total_iter = np.zeros(n, dtype=np.int64)
+    return found, positions, total_iter
+
+
+def _borner(intensity, x, y):
+    # bornes du domaine continu [0, domain), comme le min(max(...)) de strategies.py
+    return (np.clip(x, 0, np.nextafter(intensity.domain_x, 0)),
+            np.clip(y, 0, np.nextafter(intensity.domain_y, 0)))
+
+
+def continuous_simple(intensity, source_x, source_y, a, b, start_x, start_y,
+                      d=4, speed=1.0, max_tot_iter=3000, threshold=None, n_probes=None, rng=None):
+    """Marche aléatoire de cap uniforme ; à la détection, d pas vers l'amont (-x)."""
+    rng = as_generator(rng)
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n, x, y)
+
+    actif = (x > 0) & ~dans_source_batch(x, y, source_x, source_y, a, b) & (max_tot_iter > 0)
+    ids = np.flatnonzero(actif)
+    x, y = x[ids], y[ids]
+    it = np.zeros(ids.size, dtype=np.int64)
+    saut = np.zeros(ids.size, dtype=np.int64)
+
+    while ids.size:
+        m = ids.size
+        marche = saut == 0
+
+        cap = rng.uniform(0, 2 * np.pi, size=m)
+        x = np.where(marche, x + speed * np.cos(cap), x - speed)
+        y = np.where(marche, y + speed * np.sin(cap), y)
+        x, y = _borner(intensity, x, y)
+        it += 1
+        saut -= ~marche
+
+        odeur = marche & _detecter(intensity, x, y, threshold, rng)
+        teste = _regle_simple(saut, odeur, d)
+
+        trouve = teste & dans_source_batch(x, y, source_x, source_y, a, b)
+        stop = trouve | ((saut == 0) & ((x <= 0) | (it >= max_tot_iter)))
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            keep = ~stop
+            ids, x, y, it, saut = ids[keep], x[keep], y[keep], it[keep], saut[keep]
+
+    return found, positions, total_iter
+
+
+# directions de la spirale : droite, haut, gauche, bas
+_SPIRALE_DX = np.array([1.0, 0.0, -1.0, 0.0])
+_SPIRALE_DY = np.array([0.0, 1.0, 0.0, -1.0])
+
+
+def continuous_spiral(intensity, source_x, source_y, a, b, start_x, start_y,
+                      T_loss=10, speed=1.0, max_tot_iter=3000, threshold=None,
+                      n_probes=None, rng=None):
+    """Spirale carrée de côtés speed, 2*speed... ; UPWIND avec écart transverse uniforme."""
+    rng = as_generator(rng)
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n, x, y)
+
+    ids = np.arange(n) if max_tot_iter > 0 else np.arange(0)
+    m = ids.size
+    it = np.zeros(m, dtype=np.int64)
+    upwind = np.zeros(m, dtype=bool)
+    dir_index = np.zeros(m, dtype=np.int64)
+    step_length = np.ones(m, dtype=np.int64)
+    steps_done = np.zeros(m, dtype=np.int64)
+    segments_done = np.zeros(m, dtype=np.int64)
+    since_detection = np.zeros(m, dtype=np.int64)
+    last_x, last_y = x.copy(), y.copy()
+
+    while ids.size:
+        m = ids.size
+        search = ~upwind
+
+        dy = rng.uniform(-1, 1, size=m)
+        x = np.where(search, x + speed * _SPIRALE_DX[dir_index], x - speed)
+        y = np.where(search, y + speed * _SPIRALE_DY[dir_index], y + speed * dy)
+
+        _avancer_spirale(search, dir_index, step_length, steps_done, segments_done)
+
+        x, y = _borner(intensity, x, y)
+        it += 1
+
+        trouve = dans_source_batch(x, y, source_x, source_y, a, b)
+
+        c_here = _detecter(intensity, x, y, threshold, rng)
+        detecte, reset, upwind = _regle_spirale(upwind, c_here, trouve, since_detection, T_loss,
+                                                dir_index, step_length, steps_done, segments_done)
+        last_x = np.where(detecte, x, last_x)
+        last_y = np.where(detecte, y, last_y)
+        x = np.where(reset, last_x, x)
+        y = np.where(reset, last_y, y)
+
+        stop = trouve | (it >= max_tot_iter)
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            keep = ~stop
+            (ids, x, y, it, upwind, dir_index, step_length, steps_done, segments_done,
+             since_detection, last_x, last_y) = (
+                arr[keep] for arr in (ids, x, y, it, upwind, dir_index, step_length, steps_done,
+                                      segments_done, since_detection, last_x, last_y))
+
+    return found, positions, total_iter
+
+
+def continuous_mosquito(intensity, source_x, source_y, a, b, start_x, start_y,
+                        speed=1.0, turn=0.5, heading_noise=0.2, max_tot_iter=3000,
+                        threshold=None, n_probes=None, rng=None):
+    """
+    SEARCH  : marche aléatoire corrélée, le cap tourne de N(0, turn) par pas
+    UPWIND  : cap vers l'amont (pi) bruité de N(0, heading_noise)
+    CASTING : zigzag transverse d'amplitude croissante, en reculant de speed en x
+    Transitions identiques à batch_mosquito.
+    """
+    rng = as_generator(rng)
+    x, y = _departs(start_x, start_y, n_probes)
+    n = x.size
+    found, positions, total_iter = _resultats(n, x, y)
+
+    ids = np.arange(n) if max_tot_iter > 0 else np.arange(0)
+    m = ids.size
+    it = np.zeros(m, dtype=np.int64)
+    mode = np.full(m, SEARCH, dtype=np.int8)
+    cap = rng.uniform(0, 2 * np.pi, size=m)
+    casting_ampl = np.ones(m, dtype=np.int64)
+    casting_dir = np.ones(m, dtype=np.int64)
+
+    while ids.size:
+        m = ids.size
+        search = mode == SEARCH
+        casting = mode == CASTING
+
+        bruit = rng.standard_normal(m)
+        cap = np.where(search, cap + turn * bruit, np.pi + heading_noise * bruit)
+        x = x + np.where(casting, -speed, speed * np.cos(cap))
+        y = y + np.where(casting, casting_dir * casting_ampl * speed, speed * np.sin(cap))
+        casting_dir = np.where(casting, -casting_dir, casting_dir)
+        x, y = _borner(intensity, x, y)
+        it += 1
+
+        trouve = dans_source_batch(x, y, source_x, source_y, a, b)
+
+        odeur = _detecter(intensity, x, y, threshold, rng)
+        _regle_mosquito(mode, odeur, casting, casting_ampl, casting_dir)
+
+        stop = trouve | (it >= max_tot_iter)
+
+        if stop.any():
+            s = ids[stop]
+            found[s] = trouve[stop]
+            positions[s, 0], positions[s, 1] = x[stop], y[stop]
+            total_iter[s] = it[stop]
+            keep = ~stop
+            ids, x, y, it, mode, cap, casting_ampl, casting_dir = (
+                ids[keep], x[keep], y[keep], it[keep], mode[keep], cap[keep],
+                casting_ampl[keep], casting_dir[keep])
+
+    return found, positions, total_iter
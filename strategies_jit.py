@@ -0,0 +1,341 @@
+import numpy as np
+
+from bords import get_boundary
+from random_source import as_generator
+from trajectoires import RECORD_MODES
+
+try:
+    from numba import njit
+except ImportError:  # numba est optionnel : repli en Python pur
+    njit = None
+
+
+# Noyaux compilés des stratégies de strategies_api, même signature que
+# strategies2.py + boundary= et backend= :
+#   boundary : politique de bord de bords.py ayant un code entier ("clamp"
+#              par défaut, comme les autres moteurs ; "open" comme
+#              strategies2.py, "reflect")
+#   backend="numba"  : boucles compilées en code machine (nopython)
+#   backend="python" : exactement le même code, interprété
+#   backend=None     : numba s'il est installé, sinon python
+#
+# L'aléa vient d'un générateur par appel, sans état global : le k-ième tirage
+# est un hachage (fmix32 de murmur3) de (graine, k). Les deux backends donnent
+# donc des résultats identiques à graine égale ; face à strategies2.py
+# (RandomSource), seules les distributions coïncident : `python -m
+# strategies_jit` le vérifie.
+#
+# Les noyaux lisent un tableau dense uint8 contigu. Un tel tableau (ou un
+# tableau bool, vu en uint8) est passé sans copie ; un autre dtype est
+# converti à chaque appel : pour de nombreux essais sur le même champ,
+# convertir une fois avec kernel_field et passer le résultat.
+# Les champs creux, compactés, tuilés ou dynamiques sont refusés.
+
+BACKENDS = ("numba", "python")
+M32 = 0xFFFFFFFF
+
+
+def _tirage(graine, k):
+    z = (graine + k * 0x9E3779B9) & M32
+    z = ((z ^ (z >> 16)) * 0x85EBCA6B) & M32
+    z = ((z ^ (z >> 13)) * 0xC2B2AE35) & M32
+    return z ^ (z >> 16)
+
+
+def _noyaux(jit):
+    tirage = jit(_tirage)
+
+    def dans_source(x, y, source_x, source_y, a, b):
+        return source_x <= x < source_x + a and source_y <= y < source_y + b
+
+    dans_source = jit(dans_source)
+
+    def odeur(conc, x, y):
+        return 0 <= x < conc.shape[1] and 0 <= y < conc.shape[0] and conc[y, x] == 1
+
+    odeur = jit(odeur)
+
+    def reflechir(v, n):
+        if n <= 1:
+            return 0
+        periode = 2 * (n - 1)
+        v %= periode
+        return periode - v if v > n - 1 else v
+
+    reflechir = jit(reflechir)
+
+    def borner(v, n, code):
+        # codes de bords.py : 0 clamp, 1 open, 2 reflect
+        if code == 0:
+            return min(max(v, 0), n - 1)
+        if code == 2:
+            return reflechir(v, n)
+        return v
+
+    borner = jit(borner)
+
+    def noter(traj, n, x, y):
+        if traj.shape[0] > 0:
+            traj[n, 0] = x
+            traj[n, 1] = y
+        return n + 1
+
+    noter = jit(noter)
+
+    def simple(conc, source_x, source_y, a, b, x, y, d, max_tot_iter, bord, graine, traj):
+        nx, ny = conc.shape[1], conc.shape[0]
+        k = 0
+        n = noter(traj, 0, x, y)
+        total_iter = 0
+        while x > 0 and not dans_source(x, y, source_x, source_y, a, b) and total_iter < max_tot_iter:
+            x = borner(x + tirage(graine, k) % 3 - 1, nx, bord)
+            y = borner(y + tirage(graine, k + 1) % 3 - 1, ny, bord)
+            k += 2
+            n = noter(traj, n, x, y)
+            total_iter += 1
+            if odeur(conc, x, y):
+                for _ in range(d):
+                    x = borner(x - 1, nx, bord)
+                    n = noter(traj, n, x, y)
+                    total_iter += 1
+                    if dans_source(x, y, source_x, source_y, a, b):
+                        return True, total_iter, n
+            if dans_source(x, y, source_x, source_y, a, b):
+                return True, total_iter, n
+        return False, total_iter, n
+
+    def spiral(conc, source_x, source_y, a, b, x, y, T_loss, max_tot_iter, bord, graine, traj):
+        nx, ny = conc.shape[1], conc.shape[0]
+        k = 0
+        n = noter(traj, 0, x, y)
+        total_iter = 0
+        upwind = False
+        dir_index = 0
+        step_length = 1
+        steps_done = 0
+        segments_done = 0
+        since_detection = 0
+        last_x, last_y = x, y
+
+        while total_iter < max_tot_iter:
+            if not upwind:
+                # droite, haut, gauche, bas
+                if dir_index == 0:
+                    x += 1
+                elif dir_index == 1:
+                    y += 1
+                elif dir_index == 2:
+                    x -= 1
+                else:
+                    y -= 1
+                steps_done += 1
+                if steps_done >= step_length:
+                    steps_done = 0
+                    dir_index = (dir_index + 1) % 4
+                    segments_done += 1
+                    if segments_done == 2:
+                        segments_done = 0
+                        step_length += 1
+            else:
+                x -= 1
+                y += tirage(graine, k) % 3 - 1
+                k += 1
+            x = borner(x, nx, bord)
+            y = borner(y, ny, bord)
+
+            n = noter(traj, n, x, y)
+            total_iter += 1
+
+            if dans_source(x, y, source_x, source_y, a, b):
+                return True, total_iter, n
+
+            if odeur(conc, x, y):
+                upwind = True
+                last_x, last_y = x, y
+                since_detection = 0
+            elif upwind:
+                since_detection += 1
+                if since_detection >= T_loss:
+                    upwind = False
+                    x, y = last_x, last_y
+                    n = noter(traj, n, x, y)
+                    dir_index = 0
+                    step_length = 1
+                    steps_done = 0
+                    segments_done = 0
+        return False, total_iter, n
+
+    def mosquito(conc, source_x, source_y, a, b, x, y, max_tot_iter, bord, graine, traj):
+        # modes : 0 search, 1 upwind, 2 casting
+        nx, ny = conc.shape[1], conc.shape[0]
+        k = 0
+        n = noter(traj, 0, x, y)
+        total_iter = 0
+        mode = 0
+        casting_ampl = 1
+        casting_dir = 1
+
+        while total_iter < max_tot_iter:
+            if mode == 0:
+                r = tirage(graine, k) & 3      # pas en x dans (-1, 0, 0, 1)
+                x += -1 if r == 0 else (1 if r == 3 else 0)
+                y += tirage(graine, k + 1) % 3 - 1
+                k += 2
+            elif mode == 1:
+                x -= 1
+                y += tirage(graine, k) % 3 - 1
+                k += 1
+            else:
+                y += casting_dir * casting_ampl
+                x -= 1
+                casting_dir = -casting_dir
+            x = borner(x, nx, bord)
+            y = borner(y, ny, bord)
+
+            n = noter(traj, n, x, y)
+            total_iter += 1
+
+            if dans_source(x, y, source_x, source_y, a, b):
+                return True, total_iter, n
+
+            if odeur(conc, x, y):
+                mode = 1
+            elif mode == 1:
+                mode = 2
+                casting_ampl = 1
+                casting_dir = 1
+            elif mode == 2:
+                casting_ampl += 1
+        return False, total_iter, n
+
+    return {"simple": jit(simple), "spiral": jit(spiral), "mosquito": jit(mosquito)}
+
+
+_PYTHON = _noyaux(lambda f: f)
+_NUMBA = None
+
+
+def _kernel(name, backend):
+    global _NUMBA
+    if backend is None:
+        backend = "numba" if njit is not None else "python"
+    if backend == "python":
+        return _PYTHON[name]
+    if backend != "numba":
+        raise ValueError(f"backend doit être dans {BACKENDS}, pas {backend!r}")
+    if njit is None:
+        raise ImportError("backend='numba' demandé mais numba n'est pas installé")
+    if _NUMBA is None:
+        _NUMBA = _noyaux(njit)
+    return _NUMBA[name]
+
+
+def kernel_field(concentration):
+    """Champ au format des noyaux : ndarray uint8 contigu (copie seulement si besoin)."""
+    if not isinstance(concentration, np.ndarray):
+        raise TypeError(f"les noyaux JIT veulent un champ dense (numpy.ndarray), pas "
+                        f"{type(concentration).__name__} : to_dense(), ou le moteur batch")
+    if concentration.ndim != 2:
+        raise ValueError(f"champ 2D (domain_y, domain_x) attendu, pas de forme {concentration.shape}")
+    if concentration.dtype == np.bool_:
+        concentration = concentration.view(np.uint8)
+    if concentration.dtype == np.uint8 and concentration.flags.c_contiguous:
+        return concentration
+    return np.ascontiguousarray(concentration, dtype=np.uint8)
+
+
+def _lancer(name, backend, concentration, args, capacity, rng, record, boundary):
+    if record not in RECORD_MODES:
+        raise ValueError(f"record doit être dans {RECORD_MODES}, pas {record!r}")
+    bord = get_boundary(boundary)
+    if bord.code is None:
+        raise ValueError(f"pas de noyau JIT pour boundary={bord.name!r} (politique sans code)")
+    if isinstance(rng, (int, np.integer)):
+        graine = int(rng) & M32   # graine entière : pas de Generator à construire
+    else:
+        graine = int(as_generator(rng).integers(2**32))
+    traj = np.empty((capacity if record != "none" else 0, 2), dtype=np.int64)
+    conc = kernel_field(concentration)
+    found, total_iter, n = _kernel(name, backend)(conc, *args, bord.code, graine, traj)
+    if record == "none":
+        trajet = None
+    elif record == "array":
+        trajet = traj[:n].astype(np.int16)
+    else:
+        trajet = list(map(tuple, traj[:n].tolist()))
+    return bool(found), trajet, int(total_iter)
+
+
+def strategy_simple(concentration, source_x, source_y, a, b,
+                    start_x, start_y, d=4, max_tot_iter=3000, rng=None,
+                    record="full", backend=None, boundary="clamp"):
+    return _lancer("simple", backend, concentration,
+                   (source_x, source_y, a, b, start_x, start_y, d, max_tot_iter),
+                   max(max_tot_iter + d, 1) + 1, rng, record, boundary)
+
+
+def strategy_spiral(concentration, source_x, source_y, a, b,
+                    start_x, start_y, T_loss=10, max_tot_iter=3000, rng=None,
+                    record="full", backend=None, boundary="clamp"):
+    return _lancer("spiral", backend, concentration,
+                   (source_x, source_y, a, b, start_x, start_y, T_loss, max_tot_iter),
+                   max_tot_iter + 1 + max_tot_iter // max(T_loss, 1) + 1, rng, record, boundary)
+
+
+def strategy_mosquito(concentration, source_x, source_y, a, b,
+                      start_x, start_y, max_tot_iter=3000, rng=None,
+                      record="full", backend=None, boundary="clamp"):
+    return _lancer("mosquito", backend, concentration,
+                   (source_x, source_y, a, b, start_x, start_y, max_tot_iter),
+                   max_tot_iter + 1, rng, record, boundary)
+
+
+def _verifier(n=2000, max_tot_iter=600):
+    # noyaux (backend python, et numba s'il est là) contre strategies2.py,
+    # graines 0..n-1 : même taux de succès et même loi de total_iter
+    # (boundary="open", la politique de strategies2.py)
+    import strategies2
+    from plumes import generate_poisson_plume
+
+    domain_x, domain_y, a, b = 70, 50, 10, 6
+    source = (2, (domain_y - b) // 2, a, b)
+    champ = generate_poisson_plume((domain_x, domain_y), source, 8, 0.03, 0.4, rng=0)
+    depart = (domain_x - 1, (domain_y - b) // 2)
+    backend = "numba" if njit is not None else "python"
+    ok = True
+    for name in ("simple", "spiral", "mosquito"):
+        ref = getattr(strategies2, f"strategy_{name}")
+        noyau = globals()[f"strategy_{name}"]
+        r = [ref(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g, record="none")
+             for g in range(n)]
+        k = [noyau(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g, record="none",
+                   backend=backend, boundary="open") for g in range(n)]
+        if backend == "numba":
+            # mêmes résultats que le backend python, graine par graine
+            p = [noyau(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g, record="full",
+                       backend="python", boundary="open") for g in range(100)]
+            q = [noyau(champ, *source, *depart, max_tot_iter=max_tot_iter, rng=g, record="full",
+                       backend="numba", boundary="open") for g in range(100)]
+            ok &= p == q
+        f_r = np.array([t[0] for t in r])
+        f_k = np.array([t[0] for t in k])
+        it_r = np.sort([t[2] for t in r])
+        it_k = np.sort([t[2] for t in k])
+        # écart des taux en erreurs-types, distance de Kolmogorov-Smirnov
+        p_moy = (f_r.mean() + f_k.mean()) / 2
+        z = abs(f_r.mean() - f_k.mean()) / max(np.sqrt(2 * p_moy * (1 - p_moy) / n), 1e-12)
+        grille = np.union1d(it_r, it_k)
+        ks = np.abs(np.searchsorted(it_r, grille, side="right")
+                    - np.searchsorted(it_k, grille, side="right")).max() / n
+        seuil = 1.63 * np.sqrt(2 / n)          # KS à 1 %
+        bon = z < 3 and ks < seuil
+        ok &= bon
+        print(f"{name:9s} succès {100 * f_r.mean():5.1f}% / {100 * f_k.mean():5.1f}% (z={z:.2f}), "
+              f"KS total_iter {ks:.3f} (seuil {seuil:.3f}) {'ok' if bon else 'ÉCART'}")
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(0 if _verifier() else 1)
@@ -0,0 +1,228 @@
+import math
+
+import numpy as np
+
+from benchmark import wilson_interval
+from random_source import as_generator
+
+
+# Agrégation en flux des résultats de simulation : on consomme des
+# enregistrements (strategy, params, found, total_iter) un par un (ou par
+# paquets) sans jamais garder la liste des résultats. Mémoire constante quel
+# que soit le nombre d'essais, résumé affiché tous les K essais et arrêt
+# anticipé quand l'intervalle de confiance est assez serré.
+
+
+class Welford:
+    """Moyenne et variance courantes (Welford, fusion de Chan pour les paquets)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def update_batch(self, values):
+        values = np.asarray(values, dtype=float)
+        n_b = values.size
+        if n_b == 0:
+            return
+        mean_b = values.mean()
+        m2_b = ((values - mean_b)**2).sum()
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta**2 * self.n * n_b / n
+        self.n = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.n > 1 else np.nan
+
+
+class P2Quantile:
+    """Quantile p estimé en flux par l'algorithme P² (Jain & Chlamtac), 5 marqueurs."""
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []                       # hauteurs des marqueurs
+        self.n = [0, 1, 2, 3, 4]          # positions des marqueurs
+        self.n_desired = [0, 2*p, 4*p, 2 + 2*p, 4]
+        self.dn = [0, p/2, p, (1 + p)/2, 1]
+
+    def update(self, x):
+        q = self.q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.n_desired[i] += self.dn[i]
+
+        # ajustement des marqueurs intermédiaires
+        for i in (1, 2, 3):
+            d = self.n_desired[i] - n[i]
+            if (d >= 1 and n[i+1] - n[i] > 1) or (d <= -1 and n[i-1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i+1] - n[i-1]) * (
+                    (n[i] - n[i-1] + d) * (q[i+1] - q[i]) / (n[i+1] - n[i])
+                    + (n[i+1] - n[i] - d) * (q[i] - q[i-1]) / (n[i] - n[i-1]))
+                if not q[i-1] < qp < q[i+1]:
+                    # parabole hors bornes : interpolation linéaire
+                    qp = q[i] + d * (q[i+d] - q[i]) / (n[i+d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self):
+        if not self.q:
+            return np.nan
+        if len(self.q) < 5:
+            # peu d'observations : quantile exact
+            return float(np.quantile(self.q, self.p))
+        return float(self.q[2])
+
+
+class StreamingAggregator:
+    """
+    Statistiques courantes par (strategy, params) :
+    essais, succès (intervalle de Wilson), moyenne / écart-type des itérations
+    jusqu'au succès, quantiles P² de ces itérations.
+    """
+
+    def __init__(self, quantiles=(0.5, 0.9), z=1.96):
+        self.quantiles = quantiles
+        self.z = z
+        self.groupes = {}
+        self.n_records = 0
+
+    def _groupe(self, strategy, params):
+        key = (strategy, tuple(sorted((params or {}).items())))
+        g = self.groupes.get(key)
+        if g is None:
+            g = self.groupes[key] = {
+                "n": 0, "success": 0, "iter": Welford(),
+                "quantiles": [P2Quantile(p) for p in self.quantiles],
+            }
+        return g
+
+    def add(self, strategy, params, found, total_iter):
+        g = self._groupe(strategy, params)
+        g["n"] += 1
+        self.n_records += 1
+        if found:
+            g["success"] += 1
+            g["iter"].update(total_iter)
+            for est in g["quantiles"]:
+                est.update(total_iter)
+
+    def add_batch(self, strategy, params, found, total_iter):
+        # un paquet d'essais d'un même groupe (sortie du moteur batch)
+        found = np.asarray(found, dtype=bool)
+        iters = np.asarray(total_iter)[found]
+        g = self._groupe(strategy, params)
+        g["n"] += found.size
+        self.n_records += found.size
+        g["success"] += int(found.sum())
+        g["iter"].update_batch(iters)
+        for x in iters.tolist():
+            for est in g["quantiles"]:
+                est.update(x)
+
+    def summary(self):
+        lignes = []
+        for (strategy, params), g in self.groupes.items():
+            low, high = wilson_interval(g["success"], g["n"], self.z)
+            it = g["iter"]
+            lignes.append({
+                "strategy": strategy,
+                "params": dict(params),
+                "n": g["n"],
+                "success_count": g["success"],
+                "success_rate": 100 * g["success"] / g["n"] if g["n"] else np.nan,
+                "success_ci": (100 * low, 100 * high),
+                "avg_iter_success": it.mean if it.n else np.nan,
+                "std_iter_success": it.std,
+                "quantiles_iter_success": {p: est.value for p, est in zip(self.quantiles, g["quantiles"])},
+            })
+        return lignes
+
+    def ci_halfwidth(self):
+        # plus grande demi-largeur (en %) des intervalles de succès
+        if not self.groupes:
+            return np.inf
+        return max((r["success_ci"][1] - r["success_ci"][0]) / 2 for r in self.summary())
+
+    def run(self, records, every=1000, report=None, stop_ci=None):
+        """
+        Consomme un itérable de records (strategy, params, found, total_iter),
+        ou de paquets (strategy, params, found[], total_iter[]).
+        Appelle report(summary) tous les `every` essais (print_summary par défaut),
+        et s'arrête dès que toutes les demi-largeurs d'IC de succès (en %)
+        sont sous stop_ci.
+        """
+        report = print_summary if report is None else report
+        prochain = every
+        for strategy, params, found, total_iter in records:
+            if np.ndim(found):
+                self.add_batch(strategy, params, found, total_iter)
+            else:
+                self.add(strategy, params, found, total_iter)
+            if self.n_records >= prochain:
+                prochain = self.n_records + every
+                report(self.summary())
+                if stop_ci is not None and self.ci_halfwidth() < stop_ci:
+                    break
+        return self.summary()
+
+
+def print_summary(lignes):
+    print("-" * 75)
+    for r in lignes:
+        low, high = r["success_ci"]
+        qs = " ".join(f"P{int(100*p)}={v:.0f}" for p, v in r["quantiles_iter_success"].items())
+        print(f"| {r['strategy']:<20} | n={r['n']:<8} | Taux Succès: {r['success_rate']:.1f}% "
+              f"[{low:.1f}-{high:.1f}] | Iter. Moy.: {r['avg_iter_success']:.0f} | {qs}")
+
+
+def batch_records(strategies, concentration, source, start_x, start_y,
+                  max_tot_iter=3000, chunk_size=1000, n_trials=None, rng=None):
+    """
+    Générateur de paquets (strategy, params, found[], total_iter[]) joués par
+    le moteur batch, à tour de rôle pour chaque stratégie. Infini si
+    n_trials est None : c'est StreamingAggregator.run qui décide de l'arrêt.
+    """
+    rng = as_generator(rng)
+    joues = 0
+    while n_trials is None or joues < n_trials:
+        n = chunk_size if n_trials is None else min(chunk_size, n_trials - joues)
+        for name, func, params in strategies:
+            ys = rng.integers(start_y[0], start_y[1], size=n) if isinstance(start_y, tuple) else start_y
+            found, _, total_iter = func(concentration, *source, start_x, ys,
+                                        max_tot_iter=max_tot_iter, n_probes=n, rng=rng, **params)
+            yield name, params, found, total_iter
+        joues += n
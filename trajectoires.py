@@ -0,0 +1,60 @@
+import numpy as np
+
+
+# Stockage du trajet des stratégies, choisi par record= :
+#   "full"  : liste de tuples (x, y), comportement historique
+#   "array" : tableau int16 (capacity, 2) préalloué, renvoyé tronqué (vue)
+#   "none"  : aucun point stocké, seuls les compteurs sont renvoyés (trajet = None)
+# Les trois exposent .append((x, y)) : le code des stratégies ne change pas.
+
+RECORD_MODES = ("full", "array", "none")
+
+
+class TrajetTableau:
+    __slots__ = ("points", "n")
+
+    def __init__(self, capacity):
+        self.points = np.empty((capacity, 2), dtype=np.int16)
+        self.n = 0
+
+    def append(self, point):
+        self.points[self.n] = point
+        self.n += 1
+
+
+class SansTrajet:
+    __slots__ = ()
+
+    def append(self, point):
+        pass
+
+
+def nouveau_trajet(record, start, capacity):
+    if record == "full":
+        return [start]
+    if record == "array":
+        trajet = TrajetTableau(capacity)
+        trajet.append(start)
+        return trajet
+    if record == "none":
+        return SansTrajet()
+    raise ValueError(f"record doit être dans {RECORD_MODES}, pas {record!r}")
+
+
+def prolonger(trajet, xs, ys):
+    # ajout de plusieurs points d'un coup (avance rapide de strategies_api)
+    if isinstance(trajet, TrajetTableau):
+        k = len(xs)
+        trajet.points[trajet.n:trajet.n + k, 0] = xs
+        trajet.points[trajet.n:trajet.n + k, 1] = ys
+        trajet.n += k
+    elif isinstance(trajet, list):
+        trajet.extend(zip(xs.tolist(), ys.tolist()))
+
+
+def fin_trajet(trajet):
+    if isinstance(trajet, TrajetTableau):
+        return trajet.points[:trajet.n]
+    if isinstance(trajet, SansTrajet):
+        return None
+    return trajet